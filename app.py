@@ -6,6 +6,8 @@ ARCHITECTURE:
 - This app ONLY loads preprocessed data from data/processed/
 - Heavy computations happen in preprocess.py (run once locally)
 - This app is lightweight and Streamlit Cloud compatible
+- Each page loads only the tables it uses (PAGE_TABLES), read from one
+  bundle file (dashboard.bundle)
 - All data is cached for instant page navigation
 
 Run with: streamlit run app.py
@@ -22,6 +24,11 @@ import sys
 
 warnings.filterwarnings('ignore')
 
+sys.path.append(str(Path(__file__).parent / 'src'))
+from processed_store import BUNDLE_FILE, TableBundle, read_table
+from prefix_sums import PrefixSums, prefix_table_name
+from state_models import MODELS_FILE, fit_state_models, load_state_models
+
 # ============================================================================
 # PAGE CONFIGURATION
 # ============================================================================
@@ -61,96 +68,118 @@ def get_processed_data_path():
     """Get the path to processed data directory"""
     return Path(__file__).parent / 'data' / 'processed'
 
-@st.cache_data
-def load_state_compliance():
-    """Load state-level biometric compliance data"""
+@st.cache_resource
+def open_processed_bundle():
+    """Open dashboard.bundle once per process (None if the processed output predates it)"""
     try:
-        data_dir = get_processed_data_path()
-        path = data_dir / 'state_compliance.csv'
-        
-        if not path.exists():
-            st.error(f"❌ File not found: {path}")
-            st.info("Please run: python preprocess.py")
-            st.stop()
-        
-        try:
-            return pd.read_csv(path)
-        except UnicodeDecodeError:
-            return pd.read_csv(path, compression='gzip')
-    except Exception as e:
-        st.error(f"❌ Error loading compliance data: {str(e)}")
-        st.stop()
+        return TableBundle(get_processed_data_path() / BUNDLE_FILE)
+    except (FileNotFoundError, ValueError):
+        return None
 
-@st.cache_data
-def load_state_geography():
-    """Load state-level enrollment geography data"""
-    try:
-        data_dir = get_processed_data_path()
-        path = data_dir / 'state_geography.csv'
-        
-        try:
-            return pd.read_csv(path)
-        except UnicodeDecodeError:
-            return pd.read_csv(path, compression='gzip')
-    except Exception as e:
-        st.error(f"❌ Error loading geography data: {str(e)}")
-        st.stop()
+def read_processed_table(name, columns=None):
+    """Read a processed table from the bundle, or from its own file if not bundled"""
+    bundle = open_processed_bundle()
+    if bundle is not None and name in bundle:
+        return bundle.read(name, columns)
+    return read_table(get_processed_data_path(), name, columns)
 
 @st.cache_data
-def load_district_volumes():
-    """Load district-level enrollment data"""
+def load_table(name, columns=None):
+    """Load one processed table (only `columns` when given), stopping the page if it is missing"""
     try:
-        data_dir = get_processed_data_path()
-        path = data_dir / 'district_volumes.csv'
-        
-        try:
-            return pd.read_csv(path)
-        except UnicodeDecodeError:
-            return pd.read_csv(path, compression='gzip')
-    except Exception as e:
-        st.error(f"❌ Error loading district data: {str(e)}")
+        return read_processed_table(name, columns)
+    except FileNotFoundError as e:
+        st.error(f"❌ {str(e)}")
+        st.info("Please run: python preprocess.py")
         st.stop()
-
-@st.cache_data
-def load_state_urban_rural():
-    """Load state-level urban-rural split data"""
-    try:
-        data_dir = get_processed_data_path()
-        path = data_dir / 'state_urban_rural.csv'
-        
-        try:
-            return pd.read_csv(path)
-        except UnicodeDecodeError:
-            return pd.read_csv(path, compression='gzip')
     except Exception as e:
-        st.error(f"❌ Error loading urban-rural data: {str(e)}")
+        st.error(f"❌ Error loading {name}: {str(e)}")
         st.stop()
 
-@st.cache_data
-def load_state_metrics_full():
-    """Load complete state metrics for advanced analytics"""
+@st.cache_resource
+def load_prefix_sums(level):
+    """Load the running daily totals of one level ('state' or 'district'), or None if missing"""
     try:
-        data_dir = get_processed_data_path()
-        path = data_dir / 'state_metrics_full.csv'
-        
-        try:
-            return pd.read_csv(path)
-        except UnicodeDecodeError:
-            return pd.read_csv(path, compression='gzip')
-    except Exception as e:
-        st.error(f"❌ Error loading full metrics: {str(e)}")
-        st.stop()
+        return PrefixSums(read_processed_table(prefix_table_name(level)), level)
+    except FileNotFoundError:
+        return None
 
-# Load all data
-try:
-    state_compliance_df = load_state_compliance()
-    state_geography_df = load_state_geography()
-    district_volumes_df = load_district_volumes()
-    state_urban_rural_df = load_state_urban_rural()
-    state_metrics_df = load_state_metrics_full()
-except Exception as e:
-    st.error(f"❌ Fatal error loading data: {str(e)}")
-    st.stop()
+@st.cache_data
+def load_analytics_models(data_version):
+    """Load the clustering and regression results fitted by preprocess.py
+    
+    `data_version` (the results file's mtime) keys the cache, so a new
+    preprocessing run is picked up without restarting the app.
+    """
+    return load_state_models(get_processed_data_path())
+
+def analytics_models_version():
+    """Modification time of the stored model results, or None if missing"""
+    path = get_processed_data_path() / MODELS_FILE
+    return path.stat().st_mtime_ns if path.exists() else None
+
+@st.cache_resource
+def fit_analytics_models(data_version):
+    """Fit the clustering and regressions in the app, for processed output without stored models
+    
+    Runs once per process and `data_version` (metadata.json's mtime), so a
+    new preprocessing run is refitted. Returns None if there are too few states.
+    """
+    return fit_state_models(read_processed_table('state_metrics_full'))
+
+def processed_data_version():
+    """Modification time of the processed output's metadata.json, or None if missing"""
+    path = get_processed_data_path() / 'metadata.json'
+    return path.stat().st_mtime_ns if path.exists() else None
+
+def date_range_filter(prefix):
+    """
+    Date-range slider for a Problem page.
+    
+    Returns the selected (start, end) dates, or None when the full range is
+    selected or no prefix-sum table is available (older processed output).
+    Range totals come from the cube, which leaves out rows with a missing
+    state, district, pincode or date; the page says so under the slider.
+    """
+    if prefix is None:
+        st.caption("📅 Re-run `python preprocess.py` to enable date-range filtering")
+        return None
+    first, last = prefix.dates[0].date(), prefix.dates[-1].date()
+    if first == last:
+        return None
+    start, end = st.slider(
+        "📅 Date range",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="DD MMM YYYY"
+    )
+    st.caption("Totals for a narrowed range leave out rows with a missing state, district, "
+               "pincode or date, so they can add up to less than the all-time figures.")
+    if (start, end) == (first, last):
+        return None
+    return start, end
+
+# Tables each page reads, with the columns it uses; pages not listed
+# (Overview, Synthesis, Team) load no data at all
+PAGE_TABLES = {
+    "🔴 Problem #1: Biometric Compliance": {
+        'state_compliance': ('state', 'children_enroll', 'child_bio_updates', 'compliance_ratio'),
+    },
+    "🔴 Problem #2: Geographic Divide": {
+        'state_geography': ('state', 'total_enroll', 'num_districts', 'per_capita_district'),
+    },
+    "🔴 Problem #3: Urban-Rural Gap": {
+        'district_volumes': ('district', 'total_enroll'),
+    },
+}
+
+def load_page_tables(page):
+    """Load only the tables the selected page declares in PAGE_TABLES"""
+    return {
+        name: load_table(name, columns)
+        for name, columns in PAGE_TABLES.get(page, {}).items()
+    }
 
 # ============================================================================
 # SIDEBAR NAVIGATION
@@ -170,6 +199,8 @@ page = st.sidebar.radio(
     ]
 )
 
+tables = load_page_tables(page)
+
 # ============================================================================
 # PAGE 1: OVERVIEW
 # ============================================================================
@@ -246,6 +277,20 @@ elif page == "🔴 Problem #1: Biometric Compliance":
     have excellent tracking infrastructure, others have nearly zero compliance.
     """)
     
+    state_compliance_df = tables['state_compliance']
+    state_prefix = load_prefix_sums('state')
+    window = date_range_filter(state_prefix)
+    if window is not None:
+        # Window totals are two array lookups per state; no rows are rescanned
+        totals = state_prefix.window(*window, measures=['children_enroll', 'bio_child'])
+        totals = totals[totals['state'].isin(state_compliance_df['state'].astype(str))]
+        state_compliance_df = pd.DataFrame({
+            'state': totals['state'],
+            'children_enroll': totals['children_enroll'],
+            'child_bio_updates': totals['bio_child'],
+            'compliance_ratio': totals['bio_child'] / (totals['children_enroll'] + 1),
+        })
+    
     state_compliance_sorted = state_compliance_df.sort_values('compliance_ratio', ascending=False)
     
     col1, col2, col3, col4 = st.columns(4)
@@ -308,6 +353,23 @@ elif page == "🔴 Problem #2: Geographic Divide":
     severely underserved.
     """)
     
+    state_geography_df = tables['state_geography']
+    state_prefix = load_prefix_sums('state')
+    window = date_range_filter(state_prefix)
+    if window is not None:
+        totals = state_prefix.window(*window, measures=['total_enroll'])
+        num_districts = state_geography_df.set_index(state_geography_df['state'].astype(str))['num_districts']
+        totals = totals[totals['state'].isin(num_districts.index)]
+        state_geography_df = pd.DataFrame({
+            'state': totals['state'],
+            'total_enroll': totals['total_enroll'],
+            'num_districts': totals['state'].map(num_districts),
+            'per_capita_district': totals['total_enroll'] / (totals['state'].map(num_districts) + 1),
+        })
+        if state_geography_df['total_enroll'].sum() == 0:
+            st.warning("No enrollments in the selected date range")
+            st.stop()
+    
     state_volumes_sorted = state_geography_df.sort_values('total_enroll', ascending=False)
     
     col1, col2, col3 = st.columns(3)
@@ -378,6 +440,18 @@ elif page == "🔴 Problem #3: Urban-Rural Gap":
     second tier of inequality.
     """)
     
+    district_volumes_df = tables['district_volumes']
+    district_prefix = load_prefix_sums('district')
+    window = date_range_filter(district_prefix)
+    if window is not None:
+        # District names are rolled up across states, as in district_volumes
+        totals = district_prefix.window(*window, measures=['total_enroll'])
+        totals = totals[totals['district'].isin(district_volumes_df['district'].astype(str))]
+        district_volumes_df = totals.groupby('district', as_index=False)['total_enroll'].sum()
+        if district_volumes_df['total_enroll'].sum() == 0:
+            st.warning("No enrollments in the selected date range")
+            st.stop()
+    
     district_volumes_sorted = district_volumes_df.sort_values('total_enroll', ascending=False)
     top_50_volume = district_volumes_sorted.head(50)['total_enroll'].sum()
     rest_volume = district_volumes_sorted[50:]['total_enroll'].sum()
@@ -451,20 +525,23 @@ elif page == "🔬 Advanced Analytics":
     by enrollment scale, compliance, and urbanization patterns.
     """)
 
+    data_version = analytics_models_version()
+    
     try:
-        # Prepare data for clustering
-        cluster_data = state_metrics_df[['total_enroll', 'compliance_ratio', 'urban_pct']].copy()
+        if data_version is not None:
+            # Models are fitted in preprocess.py; this page only reads the results
+            state_clusters_df, models = load_analytics_models(data_version)
+        else:
+            # Older processed output has the state metrics but no stored models
+            fitted = fit_analytics_models(processed_data_version())
+            if fitted is None:
+                st.info("Not enough states in the processed data for Advanced Analytics")
+                st.stop()
+            state_clusters_df, models = fitted
         
-        if len(cluster_data) > 3:
-            from sklearn.preprocessing import StandardScaler
-            from sklearn.cluster import KMeans
-            
-            cluster_data_scaled = StandardScaler().fit_transform(cluster_data)
-            kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
-            state_metrics_df['cluster'] = kmeans.fit_predict(cluster_data_scaled)
-            
+        if len(state_clusters_df) > 3:
             st.subheader("📊 Correlation: Predictors of Compliance")
-            corr_matrix = cluster_data.corr()
+            corr_matrix = pd.DataFrame(models['correlation'])
             fig = px.imshow(
                 corr_matrix,
                 text_auto=True,
@@ -485,7 +562,7 @@ elif page == "🔬 Advanced Analytics":
             st.subheader("🧭 Clustering: State Groupings")
             
             fig = px.scatter_3d(
-                state_metrics_df,
+                state_clusters_df,
                 x='total_enroll', y='compliance_ratio', z='urban_pct', color='cluster',
                 hover_name='state',
                 labels={'total_enroll': 'Total Enrollment','compliance_ratio': 'Compliance Ratio','urban_pct': 'Urban %'},
@@ -510,40 +587,22 @@ elif page == "🔬 Advanced Analytics":
             """)
             
             st.subheader("📍 States by Cluster")
-            for cluster_id in range(4):
-                cluster_states = state_metrics_df[state_metrics_df['cluster'] == cluster_id].sort_values('total_enroll', ascending=False)
+            for cluster_id in range(models['n_clusters']):
+                cluster_states = state_clusters_df[state_clusters_df['cluster'] == cluster_id].sort_values('total_enroll', ascending=False)
                 if len(cluster_states) > 0:
-                    states_list = ', '.join(cluster_states['state'].tolist())
+                    states_list = ', '.join(cluster_states['state'].astype(str).tolist())
                     st.write(f"**Cluster {cluster_id}** ({len(cluster_states)} states): {states_list}")
-        
-        st.divider()
-        st.subheader("📊 Regression Summary: Predicting Compliance")
-        
-        from sklearn.linear_model import LinearRegression
-        from sklearn.ensemble import RandomForestRegressor
-        
-        X = state_metrics_df[['total_enroll', 'num_districts', 'urban_pct']].values
-        y = state_metrics_df['compliance_ratio'].values
-        
-        if len(X) > 3:
-            lr_model = LinearRegression().fit(X, y)
-            rf_model = RandomForestRegressor(n_estimators=100, random_state=42).fit(X, y)
+            
+            st.divider()
+            st.subheader("📊 Regression Summary: Predicting Compliance")
             
             col1, col2 = st.columns(2)
             with col1:
-                st.markdown(f"**Linear Regression R²:** {lr_model.score(X, y):.4f}")
-                st.write({
-                    'total_enroll': float(lr_model.coef_[0]),
-                    'num_districts': float(lr_model.coef_[1]),
-                    'urban_pct': float(lr_model.coef_[2])
-                })
+                st.markdown(f"**Linear Regression R²:** {models['linear_regression']['r2']:.4f}")
+                st.write(models['linear_regression']['coefficients'])
             with col2:
-                st.markdown(f"**Random Forest R²:** {rf_model.score(X, y):.4f}")
-                st.write({
-                    'total_enroll': float(rf_model.feature_importances_[0]),
-                    'num_districts': float(rf_model.feature_importances_[1]),
-                    'urban_pct': float(rf_model.feature_importances_[2])
-                })
+                st.markdown(f"**Random Forest R²:** {models['random_forest']['r2']:.4f}")
+                st.write(models['random_forest']['feature_importances'])
     
     except Exception as e:
         st.error(f"❌ Error in Advanced Analytics: {str(e)}")
@@ -0,0 +1,103 @@
+"""
+Benchmark - fused aggregation engine vs. the original per-table groupbys
+
+Builds a synthetic enrolment/biometric frame and times:
+  legacy : four enrolment groupbys (two with Python lambda aggregators),
+           one biometric groupby and an is_urban column over every row
+  engine : one grouping pass per dataset + rollups (preprocess.summarize_partials)
+
+Usage:
+    python benchmarks/bench_aggregation.py --rows 2000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import preprocess
+from aggregation import aggregate_frame
+
+
+def make_frames(rows, seed=42):
+    """Synthetic cleaned enrolment and biometric frames (categorical state/district)"""
+    rng = np.random.default_rng(seed)
+    states = [f"State {i:02d}" for i in range(36)]
+    districts = [f"District {i:04d}" for i in range(1000)]
+    district_state = rng.integers(0, len(states), len(districts))
+
+    def frame(cols):
+        district_codes = rng.zipf(1.3, rows) % len(districts)
+        df = pd.DataFrame({
+            'state': pd.Categorical.from_codes(district_state[district_codes], states),
+            'district': pd.Categorical.from_codes(district_codes, districts),
+        })
+        for col in cols:
+            df[col] = rng.poisson(3, rows).astype('int32')
+        return df
+
+    enrolment = frame(['age_0_5', 'age_5_17', 'age_18_greater'])
+    enrolment['total_enroll'] = enrolment[['age_0_5', 'age_5_17', 'age_18_greater']].sum(axis=1)
+    biometric = frame(['bio_age_5_17', 'bio_age_17_'])
+    biometric['bio_child'] = biometric['bio_age_5_17']
+    return enrolment, biometric
+
+
+def legacy_tables(enrolment, biometric):
+    """The original table code from preprocess_all_data (before the engine)"""
+    state_enroll = enrolment.groupby('state', observed=True)[['age_0_5', 'age_5_17']].sum().reset_index()
+    state_bio = biometric.groupby('state', observed=True)['bio_child'].sum().reset_index()
+    state_volumes = enrolment.groupby('state', observed=True).agg({
+        'total_enroll': 'sum', 'district': 'nunique'
+    }).reset_index()
+    district_volumes = enrolment.groupby('district', observed=True)['total_enroll'].sum().reset_index()
+    district_volumes = district_volumes.sort_values('total_enroll', ascending=False)
+    urban_districts = set(district_volumes.head(50)['district'])
+    enrolment['is_urban'] = enrolment['district'].isin(urban_districts).astype('int8')
+    state_urban_rural = enrolment.groupby('state', observed=True).agg({
+        'total_enroll': 'sum', 'is_urban': lambda x: (x == 1).sum()
+    }).reset_index()
+    state_metrics = enrolment.groupby('state', observed=True).agg({
+        'total_enroll': 'sum', 'district': 'nunique', 'is_urban': lambda x: (x == 1).sum()
+    }).reset_index()
+    return state_enroll, state_bio, state_volumes, district_volumes, state_urban_rural, state_metrics
+
+
+def engine_tables(enrolment, biometric):
+    district_parts = aggregate_frame(enrolment, *preprocess.DATASET_PARTIALS['enrolment'])
+    state_bio = aggregate_frame(biometric, *preprocess.DATASET_PARTIALS['biometric'])
+    return preprocess.summarize_partials(district_parts, state_bio)
+
+
+def best_of(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    enrolment, biometric = make_frames(args.rows)
+    legacy = best_of(legacy_tables, args.repeat, enrolment.copy(), biometric)
+    engine = best_of(engine_tables, args.repeat, enrolment, biometric)
+
+    print(f"rows per dataset: {args.rows:,}")
+    print(f"legacy groupbys : {legacy * 1000:8.1f} ms")
+    print(f"fused engine    : {engine * 1000:8.1f} ms  ({legacy / engine:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
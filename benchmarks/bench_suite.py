@@ -0,0 +1,190 @@
+"""
+Benchmark Suite - preprocessing stages and loaders at several data scales
+
+For each scale, synthetic raw files are generated (benchmarks/generate_data.py)
+and these stages are timed, best of --repeat runs:
+  load_dataset[<dataset>]        preprocess.load_dataset (parse, clean, dedup)
+  clean_state_name               normalization of the raw enrolment state column
+  optimize_dtypes                on the enrolment frame with derived columns
+  aggregate[enrolment|biometric] base aggregates for the summary tables
+  summarize_partials             the five summary tables
+  drilldown_tables               cube rollups and prefix-sum arrays
+  DataLoader.load_all_data       the notebook / automated_eda loader
+  run_full_eda[<dataset>]        EDAAnalyzer.run_full_eda
+
+Results are written as JSON (one file per run) so runs can be compared; with
+--baseline the per-stage change against an earlier result file is printed.
+
+Usage:
+    python benchmarks/bench_suite.py --scales 1000000 10000000
+    python benchmarks/bench_suite.py --scales 1000000 --baseline benchmarks/results/<earlier>.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / 'src'))
+
+import preprocess
+from aggregation import aggregate_frame
+from data_loader import DATASETS, DataLoader
+from eda_utils import EDAAnalyzer
+from generate_data import generate_all
+from ingestion import list_raw_files
+from normalization import clean_state_name, normalize_column
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def measure(func, repeat, *args):
+    """Best wall time of `repeat` calls (output silenced) and the last result"""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func(*args)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_scale(raw_dir, rows, repeat):
+    """Time every stage on one generated data set; returns dict of stage -> timing"""
+    stages = {}
+
+    def record(stage, func, *args, rows_in=None):
+        seconds, result = measure(func, repeat, *args)
+        stages[stage] = {'seconds': round(seconds, 4)}
+        if rows_in:
+            stages[stage].update(rows=rows_in, rows_per_sec=round(rows_in / seconds))
+        print(f"   {stage:34s} {seconds * 1000:10.1f} ms")
+        return result
+
+    frames = {}
+    for name, spec in DATASETS.items():
+        frames[name] = record(
+            f"load_dataset[{name}]", preprocess.load_dataset,
+            raw_dir / spec['folder'], spec['label'], None, name, rows_in=rows,
+        )
+
+    raw_states = pd.concat(
+        [pd.read_csv(f, usecols=['state'], dtype=str)['state']
+         for f in list_raw_files(raw_dir / DATASETS['enrolment']['folder'])],
+        ignore_index=True,
+    )
+    record('clean_state_name', normalize_column, raw_states, clean_state_name, rows_in=len(raw_states))
+
+    enrolment = preprocess.prepare_chunk('enrolment', frames['enrolment'].copy())
+    enrolment['children_enroll'] = enrolment[['age_0_5', 'age_5_17']].sum(axis=1)
+    enrolment = record('optimize_dtypes', preprocess.optimize_dtypes, enrolment, rows_in=len(enrolment))
+    biometric = preprocess.prepare_chunk('biometric', frames['biometric'].copy())
+
+    district_parts = record(
+        'aggregate[enrolment]', aggregate_frame, enrolment,
+        *preprocess.DATASET_PARTIALS['enrolment'], rows_in=len(enrolment),
+    )
+    state_bio = record(
+        'aggregate[biometric]', aggregate_frame, biometric,
+        *preprocess.DATASET_PARTIALS['biometric'], rows_in=len(biometric),
+    )
+    record('summarize_partials', preprocess.summarize_partials, district_parts, state_bio)
+
+    cube_parts = {
+        name: aggregate_frame(preprocess.prepare_chunk(name, df), preprocess.CUBE_KEYS,
+                              preprocess.CUBE_MEASURES[name])
+        for name, df in frames.items()
+    }
+    record('drilldown_tables', preprocess.drilldown_tables, cube_parts)
+
+    record('DataLoader.load_all_data', DataLoader(raw_dir).load_all_data, rows_in=rows * len(DATASETS))
+
+    for name, df in frames.items():
+        record(f"run_full_eda[{name}]", EDAAnalyzer(df, name).run_full_eda, rows_in=len(df))
+
+    return stages
+
+
+def environment():
+    import pyarrow
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pyarrow.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path):
+    """Print the per-stage time ratio against an earlier result file"""
+    with open(baseline_path) as f:
+        baseline = {run['rows_per_dataset']: run['stages'] for run in json.load(f)['runs']}
+    for run in results['runs']:
+        before = baseline.get(run['rows_per_dataset'])
+        if before is None:
+            continue
+        print(f"\n{run['rows_per_dataset']:,} rows vs {baseline_path}:")
+        for stage, timing in run['stages'].items():
+            if stage in before:
+                ratio = timing['seconds'] / before[stage]['seconds']
+                flag = '  <-- slower' if ratio > 1.2 else ''
+                print(f"   {stage:34s} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1_000_000],
+                        help="rows per dataset, one run per value (e.g. 1000000 10000000 100000000)")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--data-dir', type=Path, default=None,
+                        help="keep generated data here (reused when present) instead of a temp folder")
+    parser.add_argument('--out', type=Path, default=RESULTS_DIR)
+    parser.add_argument('--baseline', type=Path, default=None, help="earlier result file to compare with")
+    args = parser.parse_args()
+
+    results = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'repeat': args.repeat,
+        'runs': [],
+    }
+
+    for rows in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = (args.data_dir or Path(tmp)) / f"rows_{rows}"
+            if not raw_dir.exists():
+                print(f"\nGenerating {rows:,} rows per dataset in {raw_dir}...")
+                generate_all(rows, raw_dir)
+            raw_bytes = sum(f.stat().st_size for f in raw_dir.rglob('*.csv'))
+
+            print(f"\nScale: {rows:,} rows per dataset ({raw_bytes / 1024**2:.1f} MB raw)")
+            stages = run_scale(raw_dir, rows, args.repeat)
+            results['runs'].append({'rows_per_dataset': rows, 'raw_bytes': raw_bytes, 'stages': stages})
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    path = args.out / f"bench_suite_{pd.Timestamp.now():%Y%m%d_%H%M%S}.json"
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {path}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
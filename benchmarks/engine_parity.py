@@ -0,0 +1,126 @@
+"""
+Engine Parity Check - every preprocessing mode must write identical tables
+
+Runs preprocess.py's pandas reference pipeline, `--stream`, `--incremental`
+and `--engine duckdb` on the same raw folder, each into its own output
+folder, and compares every processed file of each mode with the reference
+byte for byte (gzip CSV copies after decompression, since the gzip header
+holds a timestamp), so values, column types and category types must all
+agree. metadata.json, the stage trace and the incremental manifest hold
+timings or run state and are skipped. Exits non-zero on any difference.
+
+Usage:
+    python benchmarks/engine_parity.py                      (data/raw)
+    python benchmarks/engine_parity.py --raw-dir data/synthetic/1M
+    python benchmarks/engine_parity.py --rows 1000000       (generated data)
+    python benchmarks/engine_parity.py --modes stream       (one mode only)
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / 'src'))
+
+import preprocess
+from generate_data import generate_all
+
+
+# Files that differ between any two runs (timings, run state)
+SKIPPED_FILES = {'metadata.json', preprocess.TRACE_FILE, preprocess.MANIFEST_PATH.name}
+
+# Small enough that each raw file is folded from several chunks
+PARITY_CHUNKSIZE = 20_000
+
+REFERENCE = 'pandas'
+ENGINE_RUNS = {
+    'pandas': lambda: preprocess.preprocess_all_data(csv=True),
+    'stream': lambda: preprocess.preprocess_streaming(chunksize=PARITY_CHUNKSIZE, csv=True),
+    'incremental': lambda: preprocess.preprocess_incremental(chunksize=PARITY_CHUNKSIZE, csv=True),
+    'duckdb': lambda: preprocess.preprocess_duckdb(csv=True),
+}
+
+
+def run_engine(engine, raw_dir, out_dir):
+    """Run one engine on `raw_dir` into `out_dir`; returns wall seconds"""
+    preprocess.RAW_DATA_DIR = Path(raw_dir)
+    preprocess.PROCESSED_DATA_DIR = Path(out_dir)
+    preprocess.MANIFEST_PATH = Path(out_dir) / preprocess.MANIFEST_PATH.name
+    preprocess.PARTIALS_DIR = Path(out_dir) / preprocess.PARTIALS_DIR.name
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not ENGINE_RUNS[engine]():
+            raise RuntimeError(f"{engine} engine failed on {raw_dir}")
+    return time.perf_counter() - start
+
+
+def file_bytes(path):
+    """Contents of a processed file (gzip CSVs decompressed)"""
+    if path.suffix == '.csv':
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+    return path.read_bytes()
+
+
+def compare_outputs(reference_dir, other_dir):
+    """Return a list of (file name, problem) for every differing output file"""
+    reference = {p.name for p in Path(reference_dir).iterdir() if p.is_file()} - SKIPPED_FILES
+    other = {p.name for p in Path(other_dir).iterdir() if p.is_file()} - SKIPPED_FILES
+    problems = [(name, 'missing') for name in sorted(reference - other)]
+    problems += [(name, 'unexpected') for name in sorted(other - reference)]
+    for name in sorted(reference & other):
+        if file_bytes(Path(reference_dir) / name) != file_bytes(Path(other_dir) / name):
+            problems.append((name, 'differs'))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--raw-dir', type=Path, default=preprocess.RAW_DATA_DIR,
+                        help="raw data folder (data/raw layout)")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="generate this many synthetic rows per dataset instead of using --raw-dir")
+    parser.add_argument('--modes', nargs='+', choices=[m for m in ENGINE_RUNS if m != REFERENCE],
+                        default=[m for m in ENGINE_RUNS if m != REFERENCE],
+                        help="modes to compare with the pandas reference (default: all)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir = args.raw_dir
+        if args.rows:
+            raw_dir = Path(tmp) / 'raw'
+            print(f"Generating {args.rows:,} rows per dataset...")
+            generate_all(args.rows, raw_dir)
+
+        outputs = {}
+        for engine in [REFERENCE] + args.modes:
+            outputs[engine] = Path(tmp) / engine
+            seconds = run_engine(engine, raw_dir, outputs[engine])
+            print(f"   {engine:12s} {seconds:8.2f}s")
+
+        reference = outputs[REFERENCE]
+        checked = len([p for p in reference.iterdir() if p.is_file() and p.name not in SKIPPED_FILES])
+        failed = False
+        for engine in args.modes:
+            problems = compare_outputs(reference, outputs[engine])
+            for name, problem in problems:
+                print(f"   ❌ {engine}: {name}: {problem}")
+            if problems:
+                print(f"Parity FAILED for {engine}: {len(problems)} of {checked} files")
+                failed = True
+
+    if failed:
+        sys.exit(1)
+    print(f"\nParity OK: {checked} files identical in {', '.join(args.modes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Synthetic Data Generator - realistic api_data_aadhar_*.csv files at any scale
+
+Writes enrolment, demographic and biometric files with the real raw schemas
+(src/schema.py) into the data/raw folder layout, so preprocess.py, the
+DataLoader and the benchmarks run on them unchanged:
+  - state, district and pincode volumes are heavily skewed (Zipf-like)
+  - a fraction of rows repeat earlier rows, within and across files
+  - a fraction of state names are misspelled the ways the real data is
+    (case, spacing, '&', old names) plus a few numeric junk values
+
+Rows are generated and written in blocks, so memory stays flat at 100M rows.
+
+Usage:
+    python benchmarks/generate_data.py --rows 1000000 --out data/synthetic/1M
+    python preprocess.py ...   (with RAW_DATA_DIR pointed at the output)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT / 'src'))
+
+from schema import DATE_FORMAT, RAW_SCHEMAS
+from normalization import STATE_REPLACEMENTS
+from data_loader import DATASETS
+
+
+STATES = [
+    'Uttar Pradesh', 'Maharashtra', 'Bihar', 'West Bengal', 'Madhya Pradesh',
+    'Tamil Nadu', 'Rajasthan', 'Karnataka', 'Gujarat', 'Andhra Pradesh',
+    'Odisha', 'Telangana', 'Kerala', 'Jharkhand', 'Assam', 'Punjab',
+    'Chhattisgarh', 'Haryana', 'Delhi', 'Jammu And Kashmir', 'Uttarakhand',
+    'Himachal Pradesh', 'Tripura', 'Meghalaya', 'Manipur', 'Nagaland', 'Goa',
+    'Arunachal Pradesh', 'Puducherry', 'Mizoram', 'Chandigarh', 'Sikkim',
+    'Dadra And Nagar Haveli And Daman And Diu', 'Andaman And Nicobar Islands',
+    'Ladakh', 'Lakshadweep',
+]
+
+# Mean counts per row, per dataset column (drawn from a Poisson, with a
+# heavy tail for the occasional mass-enrolment camp)
+COUNT_MEANS = {
+    'age_0_5': 2.0, 'age_5_17': 1.2, 'age_18_greater': 0.3,
+    'demo_age_5_17': 2.5, 'demo_age_17_': 12.0,
+    'bio_age_5_17': 10.0, 'bio_age_17_': 18.0,
+}
+
+DEFAULT_START = '2025-03-01'
+DEFAULT_END = '2025-12-31'
+BLOCK_ROWS = 1_000_000
+
+
+class Geography:
+    """Synthetic state -> district -> pincode tree with skewed row weights"""
+
+    def __init__(self, rng, districts_per_state=(3, 75), pincodes_per_district=(5, 80)):
+        # STATES is ordered by population, so the state skew is not shuffled
+        state_weights = 1.0 / np.arange(1, len(STATES) + 1) ** 1.1
+        states, districts, pincodes, weights = [], [], [], []
+        district_names = []
+        for s, state in enumerate(STATES):
+            n_districts = int(rng.integers(*districts_per_state))
+            district_weights = _zipf_weights(n_districts, 1.0, rng)
+            for d in range(n_districts):
+                district_names.append(f"{state.split()[0]} District {d + 1:02d}")
+                n_pincodes = int(rng.integers(*pincodes_per_district))
+                base = 110000 + s * 24000 + d * 300
+                pincode_weights = _zipf_weights(n_pincodes, 1.2, rng)
+                states.append(np.full(n_pincodes, s))
+                districts.append(np.full(n_pincodes, len(district_names) - 1))
+                pincodes.append(base + np.arange(n_pincodes))
+                weights.append(state_weights[s] * district_weights[d] * pincode_weights)
+
+        self.district_names = district_names
+        self.state = np.concatenate(states)
+        self.district = np.concatenate(districts)
+        self.pincode = np.concatenate(pincodes).astype('uint32')
+        weights = np.concatenate(weights)
+        self.cumulative = np.cumsum(weights / weights.sum())
+
+    def sample(self, rng, n):
+        """Indices of `n` pincodes drawn by weight"""
+        return np.minimum(np.searchsorted(self.cumulative, rng.random(n)), len(self.pincode) - 1)
+
+
+def _zipf_weights(n, exponent, rng):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights[rng.permutation(n)]
+
+
+def state_spellings():
+    """Messy spellings per canonical state, all of which clean_state_name maps back"""
+    variants = {state: [state.upper(), state.lower(), f" {state}  ", state.replace(' And ', ' & ')]
+                for state in STATES}
+    for messy, canonical in STATE_REPLACEMENTS.items():
+        if canonical in variants and messy != canonical:
+            variants[canonical].append(messy)
+    return {state: sorted(set(names) - {state}) for state, names in variants.items()}
+
+
+def generate_block(name, n, geography, rng, dates, spellings, messy_rate=0.02, junk_rate=0.0005):
+    """One block of raw rows for dataset `name`, in raw CSV form (string dates and states)"""
+    idx = geography.sample(rng, n)
+    state_codes = geography.state[idx]
+
+    states = np.array(STATES, dtype=object)[state_codes]
+    messy = rng.random(n) < messy_rate
+    for code in np.unique(state_codes[messy]):
+        options = np.array(spellings[STATES[code]], dtype=object)
+        rows = np.flatnonzero(messy & (state_codes == code))
+        if len(options):
+            states[rows] = options[rng.integers(len(options), size=len(rows))]
+    junk = np.flatnonzero(rng.random(n) < junk_rate)
+    states[junk] = geography.pincode[idx[junk]].astype(str)
+
+    block = {
+        'date': dates[rng.integers(len(dates), size=n)],
+        'state': states,
+        'district': np.array(geography.district_names, dtype=object)[geography.district[idx]],
+        'pincode': geography.pincode[idx],
+    }
+    for col in list(RAW_SCHEMAS[name])[4:]:
+        counts = rng.poisson(COUNT_MEANS[col], n)
+        camps = rng.random(n) < 0.001
+        counts[camps] *= rng.integers(10, 200, camps.sum())
+        block[col] = counts.astype('uint32')
+    return pd.DataFrame(block)
+
+
+def add_duplicates(block, previous, rng, dup_rate):
+    """Overwrite a `dup_rate` share of rows with copies of earlier rows (this block or the last one)"""
+    n_dups = int(len(block) * dup_rate)
+    if n_dups == 0:
+        return block
+    targets = rng.choice(len(block), n_dups, replace=False)
+    source = previous if previous is not None and rng.random() < 0.5 else block
+    picks = rng.integers(len(source), size=n_dups)
+    for col in block.columns:
+        values = block[col].to_numpy().copy()
+        values[targets] = source[col].to_numpy()[picks]
+        block[col] = values
+    return block
+
+
+def generate_dataset(name, rows, out_dir, rows_per_file=BLOCK_ROWS, seed=42,
+                     dup_rate=0.01, messy_rate=0.02, start=DEFAULT_START, end=DEFAULT_END):
+    """
+    Write `rows` raw rows of one dataset as api_data_aadhar_<name>_<first>_<last>.csv files.
+
+    Returns:
+        list of written files
+    """
+    rng = np.random.default_rng([seed, list(DATASETS).index(name)])
+    geography = Geography(np.random.default_rng(seed))
+    dates = pd.date_range(start, end, freq='D').strftime(DATE_FORMAT).to_numpy(dtype=object)
+    spellings = state_spellings()
+
+    folder = Path(out_dir) / DATASETS[name]['folder']
+    folder.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    previous = None
+    for first in range(0, rows, rows_per_file):
+        last = min(first + rows_per_file, rows)
+        path = folder / f"api_data_aadhar_{name}_{first}_{last}.csv"
+        for block_start in range(first, last, BLOCK_ROWS):
+            n = min(BLOCK_ROWS, last - block_start)
+            block = generate_block(name, n, geography, rng, dates, spellings, messy_rate)
+            block = add_duplicates(block, previous, rng, dup_rate)
+            block.to_csv(path, index=False, mode='w' if block_start == first else 'a',
+                         header=block_start == first)
+            previous = block.sample(min(n, 10_000), random_state=int(rng.integers(2**31)))
+        written.append(path)
+    return written
+
+
+def generate_all(rows, out_dir, **options):
+    """Write all registered datasets with `rows` rows each; returns dict of name -> files"""
+    return {name: generate_dataset(name, rows, out_dir, **options) for name in DATASETS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows per dataset")
+    parser.add_argument('--out', type=Path, required=True, help="output folder (data/raw layout)")
+    parser.add_argument('--rows-per-file', type=int, default=BLOCK_ROWS)
+    parser.add_argument('--dup-rate', type=float, default=0.01, help="share of repeated rows")
+    parser.add_argument('--messy-rate', type=float, default=0.02, help="share of misspelled states")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    files = generate_all(
+        args.rows, args.out, rows_per_file=args.rows_per_file, seed=args.seed,
+        dup_rate=args.dup_rate, messy_rate=args.messy_rate,
+    )
+    size = sum(f.stat().st_size for paths in files.values() for f in paths)
+    print(f"wrote {sum(map(len, files.values()))} files, {args.rows:,} rows per dataset, "
+          f"{size / 1024**2:.1f} MB in {time.perf_counter() - started:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
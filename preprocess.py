@@ -6,28 +6,44 @@ This script:
 1. Loads all raw CSV files from data/raw/ (~209MB)
 2. Performs heavy pandas operations (cleaning, merging, aggregations)
 3. Generates processed summary tables
-4. Saves compressed files to data/processed/ (~15-20MB)
+4. Saves typed Parquet tables to data/processed/ (gzip CSV optional)
 
 This preprocessing is done ONCE locally before deployment.
 The app.py only loads these small processed files.
 
 Usage:
     python preprocess.py
+    python preprocess.py --workers 0      (parse raw files on all cores)
+    python preprocess.py --stream         (chunked, bounded-memory mode)
+    python preprocess.py --incremental    (only parse raw files added since last run)
+    python preprocess.py --csv            (also export gzip CSV copies)
+    python preprocess.py --engine duckdb  (out-of-core, multithreaded; needs `pip install duckdb`)
 
 Output:
     data/processed/
-    ├── state_compliance.csv          (Biometric compliance by state)
-    ├── state_geography.csv           (Enrollment concentration by state)
-    ├── state_urban_rural.csv         (Urban-rural split by state)
-    ├── district_volumes.csv          (Enrollment by district)
-    ├── state_metrics_full.csv        (Complete metrics for analytics)
-    └── metadata.json                 (Processing metadata)
+    ├── state_compliance.parquet      (Biometric compliance by state)
+    ├── state_geography.parquet       (Enrollment concentration by state)
+    ├── state_urban_rural.parquet     (Urban-rural split by state)
+    ├── district_volumes.parquet      (Enrollment by district)
+    ├── state_metrics_full.parquet    (Complete metrics for analytics)
+    ├── cube_*.parquet                (Daily counts by state/district/pincode, see src/cube.py)
+    ├── prefix_state.parquet          (Running daily totals per state, see src/prefix_sums.py)
+    ├── prefix_district.parquet       (Running daily totals per district)
+    ├── coverage_*.parquet            (Reporting days and gaps per state/district/pincode, see src/coverage.py)
+    ├── state_clusters.parquet        (KMeans state clusters for Advanced Analytics)
+    ├── state_models.json             (Regression scores, coefficients, importances)
+    ├── dashboard.bundle              (The tables app.py reads, in one indexed file)
+    ├── preprocess_trace.json         (Stage timings, chrome://tracing format)
+    └── metadata.json                 (Processing metadata and stage timings)
+
+    With --csv, a gzip-compressed <table>.csv copy is written next to each table.
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
+import shutil
 import warnings
 import sys
 
@@ -41,77 +57,116 @@ PROJECT_ROOT = Path(__file__).parent
 RAW_DATA_DIR = PROJECT_ROOT / 'data' / 'raw'
 PROCESSED_DATA_DIR = PROJECT_ROOT / 'data' / 'processed'
 
+# Shared cleaning/loading utilities live in src/
+sys.path.append(str(PROJECT_ROOT / 'src'))
+
+from normalization import clean_state_name, normalize_locations
+from schema import RAW_SCHEMAS, read_raw_csv
+from ingestion import list_raw_files, read_dataset_files, combine_frames
+from instrumentation import StageTracer
+from manifest import load_manifest, save_manifest, plan_dataset
+from processed_store import write_table, write_bundle
+from dedup import RowDeduplicator
+from aggregation import PartialAggregate, aggregate_frame, rollup
+from streaming import DEFAULT_CHUNKSIZE, iter_clean_chunks
+from cube import CUBE_KEYS, CUBE_MEASURES, build_cube, cube_rollups
+from prefix_sums import PREFIX_LEVELS, build_prefix_table, prefix_table_name
+from coverage import coverage_tables
+from state_models import fit_state_models, save_state_models
+from duckdb_engine import ENGINES, DuckDBEngine
+
 # Ensure processed directory exists
 PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Raw dataset folders, in the order they are loaded
+DATASET_DIRS = {
+    'enrolment': 'enrolment',
+    'demographic': 'demographic_update',
+    'biometric': 'biometric_update',
+}
+
+# Base aggregate per dataset: group keys and summed columns. Raw rows are
+# grouped once into these; every summary table is a rollup of them.
+DATASET_PARTIALS = {
+    'enrolment': (['state', 'district'], ['age_0_5', 'age_5_17', 'age_18_greater', 'total_enroll']),
+    'demographic': (['state'], []),
+    'biometric': (['state'], ['bio_child']),
+}
+
+# Declarative rollups: (output name, base column, reduction)
+DISTRICT_METRICS = [
+    ('total_enroll', 'total_enroll', 'sum'),
+]
+STATE_METRICS = [
+    ('age_0_5', 'age_0_5', 'sum'),
+    ('age_5_17', 'age_5_17', 'sum'),
+    ('total_enroll', 'total_enroll', 'sum'),
+    ('num_districts', 'district', 'count'),  # one base row per distinct district
+    ('urban_count', 'urban_rows', 'sum'),    # enrolment rows in a top-50 district
+]
+STATE_BIO_METRICS = [
+    ('child_bio_updates', 'bio_child', 'sum'),
+]
+
+# Tables the dashboard reads, also written together as one bundle file
+DASHBOARD_TABLES = [
+    'state_compliance', 'state_geography', 'district_volumes',
+    'state_urban_rural', 'state_metrics_full', 'prefix_state', 'prefix_district',
+]
+
+# Incremental mode: processed raw-file manifest and per-file partial aggregates
+MANIFEST_PATH = PROCESSED_DATA_DIR / 'manifest.json'
+PARTIALS_DIR = PROCESSED_DATA_DIR / 'partials'
+
+# Per-stage timings of the last run (also summarized in metadata.json)
+TRACE_FILE = 'preprocess_trace.json'
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def clean_state_name(state):
-    """Standardize state/UT names to handle variations in formatting"""
-    if pd.isna(state):
-        return state
-    state = str(state).strip()
-    state = state.lower().title()
-    state = ' '.join(state.split())
-    state = state.replace('&', 'And').replace(' & ', ' And ')
-    
-    replacements = {
-        'Orissa': 'Odisha',
-        'Pondicherry': 'Puducherry',
-        'West  Bengal': 'West Bengal',
-        'West Bangal': 'West Bengal',
-        'Westbengal': 'West Bengal',
-        'Andaman And Nicobar Islands': 'Andaman And Nicobar Islands',
-        'Andaman & Nicobar Islands': 'Andaman And Nicobar Islands',
-        'Dadra And Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Dadra & Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Dadra & Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Daman & Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Jammu And Kashmir': 'Jammu And Kashmir',
-        'Jammu & Kashmir': 'Jammu And Kashmir',
-    }
-    return replacements.get(state, state)
+def load_dataset(folder_path, dataset_name, frames=None, dataset=None, tracer=None):
+    """Load and combine all CSV files from a folder
 
-def load_dataset(folder_path, dataset_name):
-    """Load and combine all CSV files from a folder"""
+    If `frames` is given (already parsed in a worker pool, one per file in
+    sorted file order), they are combined instead of reading the files again.
+    `dataset` names the raw schema (see src/schema.py) the files must match.
+    Parse, normalize, dedup and combine are timed as stages on `tracer`.
+    """
+    tracer = tracer or StageTracer()
     print(f"\n📂 Loading {dataset_name}...")
-    csv_files = list(folder_path.glob('*.csv'))
+    csv_files = list_raw_files(folder_path)
     
     if not csv_files:
         print(f"   ⚠️ No CSV files found!")
         return None
     
     print(f"   Found {len(csv_files)} files")
-    dfs = []
     
+    if frames is None:
+        # Typed parse, dates and state/district names cleaned per file
+        frames = []
+        for file in csv_files:
+            with tracer.stage(f"parse:{dataset}:{file.name}", bytes_read=file.stat().st_size) as record:
+                df = read_raw_csv(file, dataset)
+                record['rows'] = len(df)
+            with tracer.stage(f"normalize:{dataset}:{file.name}", rows=len(df)):
+                frames.append(normalize_locations(df))
+    
+    # Drop duplicates within and across files as the frames stream in
+    with tracer.stage(f"dedup:{dataset}", rows=sum(len(df) for df in frames)):
+        dedup = RowDeduplicator()
+        frames = [dedup.drop_duplicates(df, file) for file, df in zip(csv_files, frames)]
     for file in csv_files:
-        print(f"   → {file.name}", end="")
-        df = pd.read_csv(file)
-        print(f" ({len(df):,} rows)")
-        dfs.append(df)
-    
-    combined = pd.concat(dfs, ignore_index=True)
-    print(f"   Total: {len(combined):,} rows")
-    
-    # Convert date
-    if 'date' in combined.columns:
-        combined['date'] = pd.to_datetime(combined['date'], errors='coerce')
+        print(f"   → {file.name} ({dedup.rows_by_source[file]:,} rows, "
+              f"{dedup.duplicates_by_source[file]:,} duplicates)")
     
-    # Clean state names
-    if 'state' in combined.columns:
-        combined['state'] = combined['state'].apply(clean_state_name)
-        combined = combined[~combined['state'].str.match(r'^\d+$', na=False)]
-    
-    # Remove duplicates
-    before = len(combined)
-    combined = combined.drop_duplicates()
-    after = len(combined)
-    print(f"   After dedup: {after:,} rows (removed {before-after:,} duplicates)")
+    before = sum(dedup.rows_by_source.values())
+    with tracer.stage(f"combine:{dataset}") as record:
+        combined = combine_frames(frames)
+        record['rows'] = len(combined)
+    print(f"   Total: {before:,} rows")
+    print(f"   After dedup: {len(combined):,} rows (removed {dedup.total_duplicates:,} duplicates)")
     
     return combined
 
@@ -131,21 +186,140 @@ def optimize_dtypes(df):
                 df[col] = df[col].astype('category')
     return df
 
+def raw_input_size():
+    """Total size in bytes of the raw CSV files of all datasets"""
+    return sum(
+        f.stat().st_size
+        for folder in DATASET_DIRS.values()
+        for f in list_raw_files(RAW_DATA_DIR / folder)
+    )
+
+def save_outputs(files_to_save, datasets_info, csv=False, tracer=None):
+    """Write the summary tables and metadata.json, then print the run summary
+
+    Args:
+        files_to_save: list of (table name, DataFrame)
+        datasets_info: dict of dataset name -> {'rows', 'columns'} for metadata
+        csv: also export gzip CSV copies next to the Parquet tables
+        tracer: StageTracer of the run; its stages go into metadata.json and
+            preprocess_trace.json
+    """
+    tracer = tracer or StageTracer()
+    # ========== SAVE PROCESSED FILES ==========
+    print("\n" + "-"*70)
+    print("💾 SAVING PROCESSED FILES")
+    print("-"*70)
+    
+    total_size = 0
+    saved_files = {}
+    for name, df in files_to_save:
+        with tracer.stage(f"save:{name}", rows=len(df)):
+            written = write_table(df, PROCESSED_DATA_DIR, name, csv=csv)
+        for filepath in written:
+            size_mb = filepath.stat().st_size / 1024**2
+            total_size += size_mb
+            saved_files[filepath.name] = len(df)
+            print(f"   ✅ {filepath.name:30s} → {size_mb:6.2f} MB ({len(df):,} rows)")
+    
+    # One file, one open for a dashboard cold start
+    with tracer.stage("save:bundle"):
+        bundle_path = write_bundle(
+            [(name, df) for name, df in files_to_save if name in DASHBOARD_TABLES],
+            PROCESSED_DATA_DIR,
+        )
+    size_mb = bundle_path.stat().st_size / 1024**2
+    total_size += size_mb
+    saved_files[bundle_path.name] = len(DASHBOARD_TABLES)
+    print(f"   ✅ {bundle_path.name:30s} → {size_mb:6.2f} MB ({len(DASHBOARD_TABLES)} tables)")
+    
+    # ========== ADVANCED ANALYTICS MODELS ==========
+    # Fitted once here so the dashboard only loads the results
+    try:
+        with tracer.stage("fit:state_models"):
+            models = fit_state_models(dict(files_to_save)['state_metrics_full'])
+    except ImportError:
+        models = None
+        print("   ⚠️ scikit-learn not installed, skipping Advanced Analytics models")
+    if models is not None:
+        for filepath in save_state_models(PROCESSED_DATA_DIR, *models):
+            size_mb = filepath.stat().st_size / 1024**2
+            total_size += size_mb
+            saved_files[filepath.name] = len(models[0])
+            print(f"   ✅ {filepath.name:30s} → {size_mb:6.2f} MB ({len(models[0]):,} states)")
+    
+    raw_size = raw_input_size() / 1024**2
+    print(f"\n   📊 Total processed size: {total_size:.2f} MB")
+    print(f"   📉 Compression ratio: {(raw_size / total_size):.1f}x ({raw_size:.2f} MB raw)")
+    
+    # ========== SAVE METADATA ==========
+    tracer.print_report()
+    timings = tracer.summary()
+    metadata = {
+        'preprocessing_date': pd.Timestamp.now().isoformat(),
+        'raw_size_mb': round(raw_size, 2),
+        'processed_size_mb': round(total_size, 2),
+        'compression_ratio': round(raw_size / total_size, 2),
+        'datasets': datasets_info,
+        'processed_files': saved_files,
+        'timings': timings,
+    }
+    
+    metadata_path = PROCESSED_DATA_DIR / 'metadata.json'
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    tracer.write_trace(PROCESSED_DATA_DIR / TRACE_FILE)
+    
+    print(f"\n   📝 Metadata saved to metadata.json (stage trace: {TRACE_FILE})")
+    
+    # ========== FINAL SUMMARY ==========
+    print("\n" + "="*70)
+    print("✅ PREPROCESSING COMPLETE!")
+    print("="*70)
+    print(f"\n📍 Processed files location: {PROCESSED_DATA_DIR}")
+    print(f"\n🚀 Next step: Deploy app.py to Streamlit Cloud")
+    print(f"   - Raw data (data/raw/) is NOT needed for deployment")
+    print(f"   - Only data/processed/ files are needed")
+    print("\n💡 To run the dashboard locally:")
+    print(f"   streamlit run app.py")
+    print("\n" + "="*70)
+
 # ============================================================================
 # PREPROCESSING FUNCTIONS
 # ============================================================================
 
-def preprocess_all_data():
-    """Main preprocessing function"""
+def preprocess_all_data(workers=1, csv=False):
+    """Main preprocessing function
+
+    Args:
+        workers: processes used to parse raw files (1 = serial, 0 = all cores).
+            With more than one worker the files of all three datasets are
+            parsed concurrently in a single process pool.
+        csv: also export gzip CSV copies of the summary tables
+    """
     
     print("\n" + "="*70)
     print("🚀 UIDAI DATA PREPROCESSING - STARTED")
     print("="*70)
     
+    tracer = StageTracer()
+    
+    # Parse every raw file of every dataset in one pool (parallel mode only)
+    frames = {}
+    if workers != 1:
+        file_lists = {
+            name: list_raw_files(RAW_DATA_DIR / folder)
+            for name, folder in DATASET_DIRS.items()
+        }
+        print(f"\n⚡ Parsing {sum(map(len, file_lists.values()))} raw files in parallel...")
+        raw_bytes = sum(f.stat().st_size for files in file_lists.values() for f in files)
+        with tracer.stage("parse+normalize:parallel", bytes_read=raw_bytes, workers=workers) as record:
+            frames = read_dataset_files(file_lists, workers)
+            record['rows'] = sum(len(df) for dfs in frames.values() for df in dfs)
+    
     # Load all raw datasets
-    enrolment = load_dataset(RAW_DATA_DIR / 'enrolment', 'Enrolment Data')
-    demographic = load_dataset(RAW_DATA_DIR / 'demographic_update', 'Demographic Data')
-    biometric = load_dataset(RAW_DATA_DIR / 'biometric_update', 'Biometric Data')
+    enrolment = load_dataset(RAW_DATA_DIR / 'enrolment', 'Enrolment Data', frames.get('enrolment'), 'enrolment', tracer)
+    demographic = load_dataset(RAW_DATA_DIR / 'demographic_update', 'Demographic Data', frames.get('demographic'), 'demographic', tracer)
+    biometric = load_dataset(RAW_DATA_DIR / 'biometric_update', 'Biometric Data', frames.get('biometric'), 'biometric', tracer)
     
     if enrolment is None or demographic is None or biometric is None:
         print("❌ ERROR: Could not load all datasets!")
@@ -158,18 +332,20 @@ def preprocess_all_data():
     # ========== ENROLMENT PROCESSING ==========
     print("\n1️⃣ Processing Enrolment Data...")
     
-    # Fill NaN values in age columns
-    age_cols = ['age_0_5', 'age_5_17', 'age_18_greater']
-    for col in age_cols:
-        if col in enrolment.columns:
-            enrolment[col] = enrolment[col].fillna(0)
-    
-    # Create derived columns
-    enrolment['total_enroll'] = enrolment[age_cols].sum(axis=1)
-    enrolment['children_enroll'] = enrolment[['age_0_5', 'age_5_17']].sum(axis=1)
+    with tracer.stage("derive:enrolment", rows=len(enrolment)):
+        # Fill NaN values in age columns
+        age_cols = ['age_0_5', 'age_5_17', 'age_18_greater']
+        for col in age_cols:
+            if col in enrolment.columns:
+                enrolment[col] = enrolment[col].fillna(0)
+        
+        # Create derived columns
+        enrolment['total_enroll'] = enrolment[age_cols].sum(axis=1)
+        enrolment['children_enroll'] = enrolment[['age_0_5', 'age_5_17']].sum(axis=1)
     
     # Optimize data types
-    enrolment = optimize_dtypes(enrolment)
+    with tracer.stage("optimize_dtypes:enrolment", rows=len(enrolment)):
+        enrolment = optimize_dtypes(enrolment)
     
     print(f"   Enrolment shape: {enrolment.shape}")
     print(f"   Memory: {enrolment.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
@@ -177,12 +353,14 @@ def preprocess_all_data():
     # ========== BIOMETRIC PROCESSING ==========
     print("\n2️⃣ Processing Biometric Data...")
     
-    # Fill NaN values
-    biometric = biometric.fillna(0)
-    biometric['bio_child'] = biometric.get('bio_age_5_17', 0)
+    with tracer.stage("derive:biometric", rows=len(biometric)):
+        # Fill NaN values (counts only; state/district are categoricals)
+        biometric = biometric.fillna({col: 0 for col in biometric.select_dtypes('number').columns})
+        biometric['bio_child'] = biometric.get('bio_age_5_17', 0)
     
     # Optimize data types
-    biometric = optimize_dtypes(biometric)
+    with tracer.stage("optimize_dtypes:biometric", rows=len(biometric)):
+        biometric = optimize_dtypes(biometric)
     
     print(f"   Biometric shape: {biometric.shape}")
     print(f"   Memory: {biometric.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
@@ -190,7 +368,8 @@ def preprocess_all_data():
     # ========== DEMOGRAPHIC PROCESSING ==========
     print("\n3️⃣ Processing Demographic Data...")
     
-    demographic = optimize_dtypes(demographic)
+    with tracer.stage("optimize_dtypes:demographic", rows=len(demographic)):
+        demographic = optimize_dtypes(demographic)
     
     print(f"   Demographic shape: {demographic.shape}")
     print(f"   Memory: {demographic.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
@@ -198,127 +377,365 @@ def preprocess_all_data():
     # ========== AGGREGATED TABLES ==========
     print("\n4️⃣ Creating aggregated tables...")
     
-    # TABLE 1: STATE COMPLIANCE (for Problem 1)
-    print("   → state_compliance.csv")
-    state_enroll = enrolment.groupby('state')[['age_0_5', 'age_5_17']].sum().reset_index()
-    state_enroll['children_enroll'] = state_enroll['age_0_5'] + state_enroll['age_5_17']
+    # One grouping pass per dataset; every table is a rollup of these
+    with tracer.stage("aggregate:enrolment", rows=len(enrolment)):
+        district_parts = aggregate_frame(enrolment, *DATASET_PARTIALS['enrolment'])
+    with tracer.stage("aggregate:biometric", rows=len(biometric)):
+        state_bio = aggregate_frame(biometric, *DATASET_PARTIALS['biometric'])
+    files_to_save = summarize_partials(district_parts, state_bio, tracer)
+    
+    # Drill-down cube: one more grouping pass per dataset at the finest grain
+    cube_parts = {}
+    for name, df in [('enrolment', enrolment), ('demographic', demographic), ('biometric', biometric)]:
+        with tracer.stage(f"aggregate:cube:{name}", rows=len(df)):
+            cube_parts[name] = aggregate_frame(df, CUBE_KEYS, CUBE_MEASURES[name])
+    files_to_save += drilldown_tables(cube_parts, tracer)
+    for name, _ in files_to_save:
+        print(f"   → {name}")
+    
+    datasets_info = {
+        'enrolment': {'rows': len(enrolment), 'columns': list(enrolment.columns)},
+        'biometric': {'rows': len(biometric), 'columns': list(biometric.columns)},
+        'demographic': {'rows': len(demographic), 'columns': list(demographic.columns)},
+    }
+    save_outputs(files_to_save, datasets_info, csv=csv, tracer=tracer)
+    
+    return True
+
+def summarize_partials(district_parts, state_bio, tracer=None):
+    """Build the five summary tables from base aggregates
+
+    Every table is a rollup of two small frames, so the raw rows are grouped
+    exactly once per dataset (see src/aggregation.py).
+
+    Args:
+        district_parts: enrolment sums per (state, district) with a 'rows'
+            count; missing state/district keys are kept as NaN
+        state_bio: biometric 'bio_child' sums per state
+        tracer: StageTracer timing each table (optional)
+
+    Returns:
+        list of (table name, DataFrame)
+    """
+    tracer = tracer or StageTracer()
+    
+    # District rollup first: it decides which districts count as urban
+    with tracer.stage("table:district_volumes"):
+        district_volumes = rollup(district_parts, 'district', DISTRICT_METRICS)
+        district_volumes = district_volumes.sort_values('total_enroll', ascending=False)
+        district_volumes = optimize_dtypes(district_volumes)
+    
+        urban_districts = set(district_volumes.head(50)['district'])
+        district_parts = district_parts.assign(
+            urban_rows=district_parts['rows'].where(district_parts['district'].isin(urban_districts), 0)
+        )
+    
+    # One state-level rollup feeds all four state tables
+    with tracer.stage("rollup:state"):
+        state = rollup(district_parts, 'state', STATE_METRICS)
+        state_bio = rollup(state_bio, 'state', STATE_BIO_METRICS)
+    
+    # TABLE 1: STATE COMPLIANCE
+    with tracer.stage("table:state_compliance"):
+        state_compliance = state[['state', 'age_0_5', 'age_5_17']].copy()
+        state_compliance['children_enroll'] = state_compliance['age_0_5'] + state_compliance['age_5_17']
+        state_compliance = state_compliance.merge(state_bio, on='state', how='left')
+        state_compliance['child_bio_updates'] = state_compliance['child_bio_updates'].fillna(0)
+        state_compliance['compliance_ratio'] = (
+            state_compliance['child_bio_updates'] / 
+            (state_compliance['children_enroll'] + 1)  # Avoid division by zero
+        )
+        state_compliance = optimize_dtypes(state_compliance)
+    
+    # TABLE 2: STATE GEOGRAPHY
+    with tracer.stage("table:state_geography"):
+        state_volumes = state[['state', 'total_enroll', 'num_districts']].copy()
+        state_volumes['per_capita_district'] = state_volumes['total_enroll'] / (state_volumes['num_districts'] + 1)
+        state_volumes = state_volumes.sort_values('total_enroll', ascending=False)
+        state_volumes = optimize_dtypes(state_volumes)
+    
+    # TABLE 4: STATE URBAN-RURAL SPLIT
+    with tracer.stage("table:state_urban_rural"):
+        state_urban_rural = state[['state', 'total_enroll', 'urban_count']].rename(
+            columns={'urban_count': 'urban_districts'}
+        )
+        state_urban_rural['urban_pct'] = (
+            state_urban_rural['urban_districts'] / (state_urban_rural['total_enroll'] + 1)
+        )
+        state_urban_rural = optimize_dtypes(state_urban_rural)
+    
+    # TABLE 5: FULL STATE METRICS
+    with tracer.stage("table:state_metrics_full"):
+        state_metrics = state[['state', 'total_enroll', 'num_districts', 'urban_count']].copy()
+        state_metrics['urban_pct'] = (
+            state_metrics['urban_count'] / (state_metrics['num_districts'] + 1)
+        )
+        state_metrics = state_metrics.merge(
+            state_compliance[['state', 'compliance_ratio']], 
+            on='state', 
+            how='left'
+        ).dropna()
+        state_metrics = optimize_dtypes(state_metrics)
+    
+    return [
+        ('state_compliance', state_compliance),
+        ('state_geography', state_volumes),
+        ('district_volumes', district_volumes),
+        ('state_urban_rural', state_urban_rural),
+        ('state_metrics_full', state_metrics),
+    ]
+
+def drilldown_tables(cube_parts, tracer=None):
+    """Cube rollups, prefix-sum time arrays and reporting coverage from the
+    per-dataset cube aggregates
+
+    Returns:
+        list of (table name, DataFrame)
+    """
+    tracer = tracer or StageTracer()
+    with tracer.stage("table:cube") as record:
+        fact = build_cube(cube_parts)
+        tables = cube_rollups(fact)
+        record['rows'] = len(fact)
+    for level in PREFIX_LEVELS:
+        with tracer.stage(f"table:{prefix_table_name(level)}"):
+            tables.append((prefix_table_name(level), build_prefix_table(fact, level)))
+    with tracer.stage("table:coverage"):
+        tables += coverage_tables(cube_parts)
+    return tables
+
+def prepare_chunk(name, chunk):
+    """Add the derived columns a dataset's running aggregate needs to a deduplicated chunk"""
+    if name == 'enrolment':
+        age_cols = ['age_0_5', 'age_5_17', 'age_18_greater']
+        chunk = chunk.fillna({col: 0 for col in age_cols})
+        chunk['total_enroll'] = chunk[age_cols].sum(axis=1)
+    elif name == 'biometric':
+        chunk = chunk.fillna({col: 0 for col in chunk.select_dtypes('number').columns})
+        chunk['bio_child'] = chunk.get('bio_age_5_17', 0)
+    return chunk
+
+def stream_dataset(name, files, dedup, chunksize=DEFAULT_CHUNKSIZE):
+    """Fold raw files of one dataset into its running aggregate
+
+    Args:
+        name: dataset key in DATASET_PARTIALS
+        files: raw CSV files to read
+        dedup: RowDeduplicator shared by all files of the dataset
+        chunksize: rows per chunk
+
+    Returns:
+        (aggregate, cube_aggregate, rows_read, raw_columns) - the summary-table
+        base aggregate and the dataset's share of the drill-down cube
+    """
+    aggregate = PartialAggregate(*DATASET_PARTIALS[name])
+    cube = PartialAggregate(CUBE_KEYS, CUBE_MEASURES[name])
+    rows_read = 0
+    columns = None
+    for file, chunk in iter_clean_chunks(files, chunksize, dataset=name):
+        rows_read += len(chunk)
+        columns = columns or list(chunk.columns)
+        chunk = prepare_chunk(name, dedup.drop_duplicates(chunk, file))
+        aggregate.update(chunk)
+        cube.update(chunk)
+    return aggregate, cube, rows_read, columns
+
+def dataset_info(name, rows, raw_columns):
+    """Rows/columns entry for metadata.json, listing the derived columns too"""
+    derived = {
+        'enrolment': ['total_enroll', 'children_enroll'],
+        'biometric': ['bio_child'],
+    }.get(name, [])
+    return {'rows': rows, 'columns': list(raw_columns) + derived}
+
+def preprocess_streaming(chunksize=DEFAULT_CHUNKSIZE, csv=False):
+    """Streaming preprocessing with memory bounded by the chunk size
+
+    Each raw CSV is read `chunksize` rows at a time. A chunk is cleaned,
+    deduplicated against a compact seen-set of 64-bit row fingerprints and
+    folded into per-(state, district) running sums; no full dataset is ever
+    held in memory. Produces the same tables as `preprocess_all_data`.
+    """
+    
+    print("\n" + "="*70)
+    print(f"🚀 UIDAI DATA PREPROCESSING (STREAMING, {chunksize:,} rows/chunk) - STARTED")
+    print("="*70)
     
-    state_bio = biometric.groupby('state')['bio_child'].sum().reset_index()
-    state_bio.columns = ['state', 'child_bio_updates']
+    tracer = StageTracer()
+    partials = {}
+    cube_parts = {}
+    datasets_info = {}
+    
+    for name, folder in DATASET_DIRS.items():
+        csv_files = list_raw_files(RAW_DATA_DIR / folder)
+        print(f"\n📂 Streaming {name} ({len(csv_files)} files)...")
+        if not csv_files:
+            print("❌ ERROR: Could not load all datasets!")
+            return False
+        
+        dedup = RowDeduplicator()
+        raw_bytes = sum(f.stat().st_size for f in csv_files)
+        with tracer.stage(f"stream:{name}", bytes_read=raw_bytes) as record:
+            aggregate, cube, rows_read, columns = stream_dataset(name, csv_files, dedup, chunksize)
+            partials[name] = aggregate.result()
+            cube_parts[name] = cube.result()
+            record['rows'] = rows_read
+        
+        dedup.print_report()
+        print(f"   Total: {rows_read:,} rows")
+        print(f"   After dedup: {len(dedup):,} rows (removed {dedup.total_duplicates:,} duplicates)")
+        datasets_info[name] = dataset_info(name, len(dedup), columns)
     
-    state_compliance = state_enroll.merge(state_bio, on='state', how='left')
-    state_compliance['child_bio_updates'] = state_compliance['child_bio_updates'].fillna(0)
-    state_compliance['compliance_ratio'] = (
-        state_compliance['child_bio_updates'] / 
-        (state_compliance['children_enroll'] + 1)  # Avoid division by zero
-    )
-    state_compliance = optimize_dtypes(state_compliance)
-    
-    # TABLE 2: STATE GEOGRAPHY (for Problem 2)
-    print("   → state_geography.csv")
-    state_volumes = enrolment.groupby('state').agg({
-        'total_enroll': 'sum',
-        'district': 'nunique'
-    }).reset_index()
-    state_volumes.columns = ['state', 'total_enroll', 'num_districts']
-    state_volumes['per_capita_district'] = state_volumes['total_enroll'] / (state_volumes['num_districts'] + 1)
-    state_volumes = state_volumes.sort_values('total_enroll', ascending=False)
-    state_volumes = optimize_dtypes(state_volumes)
-    
-    # TABLE 3: DISTRICT VOLUMES (for Problem 3)
-    print("   → district_volumes.csv")
-    district_volumes = enrolment.groupby('district')['total_enroll'].sum().reset_index()
-    district_volumes = district_volumes.sort_values('total_enroll', ascending=False)
-    district_volumes = optimize_dtypes(district_volumes)
-    
-    # TABLE 4: STATE URBAN-RURAL SPLIT (for Problem 3)
-    print("   → state_urban_rural.csv")
-    urban_districts = set(district_volumes.head(50)['district'])
-    enrolment['is_urban'] = enrolment['district'].isin(urban_districts).astype('int8')
-    
-    state_urban_rural = enrolment.groupby('state').agg({
-        'total_enroll': 'sum',
-        'is_urban': lambda x: (x == 1).sum()
-    }).reset_index()
-    state_urban_rural.columns = ['state', 'total_enroll', 'urban_districts']
-    state_urban_rural['urban_pct'] = (
-        state_urban_rural['urban_districts'] / (state_urban_rural['total_enroll'] + 1)
-    )
-    state_urban_rural = optimize_dtypes(state_urban_rural)
-    
-    # TABLE 5: FULL STATE METRICS (for Advanced Analytics)
-    print("   → state_metrics_full.csv")
-    state_metrics = enrolment.groupby('state').agg({
-        'total_enroll': 'sum',
-        'district': 'nunique',
-        'is_urban': lambda x: (x == 1).sum()
-    }).reset_index()
-    state_metrics.columns = ['state', 'total_enroll', 'num_districts', 'urban_count']
-    state_metrics['urban_pct'] = (
-        state_metrics['urban_count'] / (state_metrics['num_districts'] + 1)
-    )
-    state_metrics = state_metrics.merge(
-        state_compliance[['state', 'compliance_ratio']], 
-        on='state', 
-        how='left'
-    ).dropna()
-    state_metrics = optimize_dtypes(state_metrics)
+    print("\n4️⃣ Creating aggregated tables...")
+    files_to_save = summarize_partials(partials['enrolment'], partials['biometric'], tracer)
+    files_to_save += drilldown_tables(cube_parts, tracer)
     
-    # ========== SAVE PROCESSED FILES ==========
-    print("\n" + "-"*70)
-    print("💾 SAVING PROCESSED FILES")
-    print("-"*70)
+    datasets_info = {key: datasets_info[key] for key in ['enrolment', 'biometric', 'demographic']}
+    save_outputs(files_to_save, datasets_info, csv=csv, tracer=tracer)
     
-    files_to_save = [
-        ('state_compliance.csv', state_compliance),
-        ('state_geography.csv', state_volumes),
-        ('district_volumes.csv', district_volumes),
-        ('state_urban_rural.csv', state_urban_rural),
-        ('state_metrics_full.csv', state_metrics),
-    ]
+    return True
+
+def preprocess_incremental(chunksize=DEFAULT_CHUNKSIZE, csv=False):
+    """Incremental preprocessing driven by the raw-file manifest
+
+    manifest.json (next to metadata.json) records size, mtime and content
+    hash of every processed raw file. Each file's running aggregate is kept
+    under data/processed/partials/<dataset>/ together with the dataset's
+    row-fingerprint seen-set, so a rerun only parses new files, deduplicates
+    them against everything processed before and merges their partials into
+    the summary tables. If a processed file changed or was removed, that
+    dataset is rebuilt from scratch, since earlier deduplication decisions
+    may no longer hold.
+    """
     
-    total_size = 0
-    for filename, df in files_to_save:
-        filepath = PROCESSED_DATA_DIR / filename
-        df.to_csv(filepath, index=False, compression='gzip')
-        size_mb = filepath.stat().st_size / 1024**2
-        total_size += size_mb
-        print(f"   ✅ {filename:30s} → {size_mb:6.2f} MB ({len(df):,} rows)")
+    print("\n" + "="*70)
+    print("🚀 UIDAI DATA PREPROCESSING (INCREMENTAL) - STARTED")
+    print("="*70)
     
-    print(f"\n   📊 Total processed size: {total_size:.2f} MB")
-    print(f"   📉 Compression ratio: {(209 / total_size):.1f}x")
+    tracer = StageTracer()
+    manifest = load_manifest(MANIFEST_PATH)
+    partials = {}
+    cube_parts = {}
+    datasets_info = {}
+    
+    for name, folder in DATASET_DIRS.items():
+        csv_files = list_raw_files(RAW_DATA_DIR / folder)
+        if not csv_files:
+            print("❌ ERROR: Could not load all datasets!")
+            return False
+        
+        entries = manifest['datasets'].get(name, {})
+        new_files, rebuild, signatures = plan_dataset(csv_files, entries)
+        
+        part_dir = PARTIALS_DIR / name
+        seen_path = part_dir / 'seen.npy'
+        # Partials from before the cube existed cannot be topped up either
+        missing_cube = any(
+            not (part_dir / f"{Path(file_name).stem}.cube.parquet").exists() for file_name in entries
+        )
+        if rebuild or missing_cube or not seen_path.exists():
+            if entries:
+                print(f"\n♻️  {name}: processed files changed, rebuilding")
+            shutil.rmtree(part_dir, ignore_errors=True)
+            entries = {}
+            new_files = csv_files
+            dedup = RowDeduplicator()
+        else:
+            dedup = RowDeduplicator(np.load(seen_path))
+        part_dir.mkdir(parents=True, exist_ok=True)
+        
+        print(f"\n📂 {name}: {len(new_files)} new of {len(csv_files)} files")
+        for file in new_files:
+            with tracer.stage(f"stream:{name}:{file.name}", bytes_read=file.stat().st_size) as record:
+                aggregate, cube, rows_read, columns = stream_dataset(name, [file], dedup, chunksize)
+                record['rows'] = rows_read
+            aggregate.result().to_parquet(part_dir / f"{file.stem}.parquet", index=False)
+            cube.result().to_parquet(part_dir / f"{file.stem}.cube.parquet", index=False)
+            duplicates = dedup.duplicates_by_source.get(file, 0)
+            entries[file.name] = {
+                **signatures[file.name],
+                'rows_read': rows_read,
+                'rows_kept': rows_read - duplicates,
+                'duplicates': duplicates,
+                'columns': columns,
+            }
+            print(f"   → {file.name} ({rows_read:,} rows, {duplicates:,} duplicates)")
+        np.save(seen_path, dedup.fingerprints)
+        
+        # Refresh mtimes of files whose content was unchanged
+        for file_name, signature in signatures.items():
+            entries[file_name].update(signature)
+        manifest['datasets'][name] = entries
+        
+        merged = PartialAggregate(*DATASET_PARTIALS[name])
+        merged_cube = PartialAggregate(CUBE_KEYS, CUBE_MEASURES[name])
+        for file in csv_files:
+            merged.add_partial(pd.read_parquet(part_dir / f"{file.stem}.parquet"))
+            merged_cube.add_partial(pd.read_parquet(part_dir / f"{file.stem}.cube.parquet"))
+        partials[name] = merged.result()
+        cube_parts[name] = merged_cube.result()
+        
+        rows = sum(entry['rows_kept'] for entry in entries.values())
+        datasets_info[name] = dataset_info(name, rows, entries[csv_files[0].name]['columns'])
     
-    # ========== SAVE METADATA ==========
-    metadata = {
-        'preprocessing_date': pd.Timestamp.now().isoformat(),
-        'raw_size_mb': 209,
-        'processed_size_mb': round(total_size, 2),
-        'compression_ratio': round(209 / total_size, 2),
-        'datasets': {
-            'enrolment': {'rows': len(enrolment), 'columns': list(enrolment.columns)},
-            'biometric': {'rows': len(biometric), 'columns': list(biometric.columns)},
-            'demographic': {'rows': len(demographic), 'columns': list(demographic.columns)},
-        },
-        'processed_files': {name: len(df) for name, df in files_to_save}
-    }
+    print("\n4️⃣ Creating aggregated tables...")
+    files_to_save = summarize_partials(partials['enrolment'], partials['biometric'], tracer)
+    files_to_save += drilldown_tables(cube_parts, tracer)
     
-    metadata_path = PROCESSED_DATA_DIR / 'metadata.json'
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    datasets_info = {key: datasets_info[key] for key in ['enrolment', 'biometric', 'demographic']}
+    save_outputs(files_to_save, datasets_info, csv=csv, tracer=tracer)
+    save_manifest(MANIFEST_PATH, manifest)
     
-    print(f"\n   📝 Metadata saved to metadata.json")
+    return True
+
+def preprocess_duckdb(csv=False, memory_limit=None, threads=None):
+    """Out-of-core preprocessing on the DuckDB engine
+
+    DuckDB parses, cleans and deduplicates each dataset on all cores and
+    computes the base aggregates, spilling to disk past `memory_limit`
+    (e.g. '4GB'); only the small aggregates come back to pandas. The tables
+    are built from them by the same code as the pandas engine and are
+    byte-identical to its output (see src/duckdb_engine.py and
+    benchmarks/engine_parity.py).
+    """
     
-    # ========== FINAL SUMMARY ==========
     print("\n" + "="*70)
-    print("✅ PREPROCESSING COMPLETE!")
+    print("🚀 UIDAI DATA PREPROCESSING (DUCKDB ENGINE) - STARTED")
     print("="*70)
-    print(f"\n📍 Processed files location: {PROCESSED_DATA_DIR}")
-    print(f"\n🚀 Next step: Deploy app.py to Streamlit Cloud")
-    print(f"   - Raw data (data/raw/) is NOT needed for deployment")
-    print(f"   - Only data/processed/ files are needed")
-    print("\n💡 To run the dashboard locally:")
-    print(f"   streamlit run app.py")
-    print("\n" + "="*70)
+    
+    tracer = StageTracer()
+    engine = DuckDBEngine(memory_limit=memory_limit, threads=threads)
+    partials = {}
+    cube_parts = {}
+    datasets_info = {}
+    
+    for name, folder in DATASET_DIRS.items():
+        csv_files = list_raw_files(RAW_DATA_DIR / folder)
+        print(f"\n📂 Loading {name} ({len(csv_files)} files)...")
+        if not csv_files:
+            print("❌ ERROR: Could not load all datasets!")
+            return False
+        
+        raw_bytes = sum(f.stat().st_size for f in csv_files)
+        with tracer.stage(f"duckdb:load:{name}", bytes_read=raw_bytes) as record:
+            counts = engine.load(name, csv_files)
+            record['rows'] = counts['rows_read']
+        with tracer.stage(f"duckdb:aggregate:{name}", rows=counts['rows_kept']):
+            partials[name] = engine.aggregate(name, *DATASET_PARTIALS[name])
+            cube_parts[name] = engine.aggregate(name, CUBE_KEYS, CUBE_MEASURES[name])
+        
+        duplicates = counts['rows_read'] - counts['rows_kept']
+        print(f"   Total: {counts['rows_read']:,} rows")
+        print(f"   After dedup: {counts['rows_kept']:,} rows (removed {duplicates:,} duplicates)")
+        datasets_info[name] = dataset_info(name, counts['rows_kept'], RAW_SCHEMAS[name])
+    engine.close()
+    
+    print("\n4️⃣ Creating aggregated tables...")
+    files_to_save = summarize_partials(partials['enrolment'], partials['biometric'], tracer)
+    files_to_save += drilldown_tables(cube_parts, tracer)
+    
+    datasets_info = {key: datasets_info[key] for key in ['enrolment', 'biometric', 'demographic']}
+    save_outputs(files_to_save, datasets_info, csv=csv, tracer=tracer)
     
     return True
 
@@ -326,9 +743,56 @@ def preprocess_all_data():
 # MAIN
 # ============================================================================
 
+def parse_args():
+    """Command-line options for the preprocessing run"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Preprocess raw UIDAI data into summary tables")
+    parser.add_argument(
+        '--engine', choices=ENGINES, default='pandas',
+        help="pandas (reference, in memory) or duckdb (out-of-core on all cores, same tables)"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help="processes used to parse raw files (default 1 = serial, 0 = all cores); "
+             "with --engine duckdb, DuckDB threads (default all cores)"
+    )
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="read raw files in chunks with bounded memory"
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="only process raw files that are new since the last run (see manifest.json)"
+    )
+    parser.add_argument(
+        '--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+        help="rows per chunk in --stream/--incremental mode"
+    )
+    parser.add_argument(
+        '--csv', action='store_true',
+        help="also export gzip CSV copies of the Parquet tables"
+    )
+    parser.add_argument(
+        '--memory-limit', default=None,
+        help="with --engine duckdb, memory DuckDB may use before spilling to disk (e.g. 4GB)"
+    )
+    args = parser.parse_args()
+    if args.engine != 'pandas' and (args.stream or args.incremental):
+        parser.error("--stream/--incremental are pandas engine modes")
+    return args
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        success = preprocess_all_data()
+        if args.engine == 'duckdb':
+            success = preprocess_duckdb(csv=args.csv, memory_limit=args.memory_limit, threads=args.workers)
+        elif args.incremental:
+            success = preprocess_incremental(chunksize=args.chunksize, csv=args.csv)
+        elif args.stream:
+            success = preprocess_streaming(chunksize=args.chunksize, csv=args.csv)
+        else:
+            workers = 1 if args.workers is None else args.workers
+            success = preprocess_all_data(workers=workers, csv=args.csv)
         sys.exit(0 if success else 1)
     except Exception as e:
         print(f"\n❌ ERROR: {str(e)}")
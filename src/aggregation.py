@@ -0,0 +1,109 @@
+"""
+Aggregation Engine for UIDAI Hackathon
+Computes all grouped metrics from one vectorized grouping pass per dataset
+
+Rows are grouped once at the finest level needed (e.g. state x district)
+into sums plus a row count. Coarser tables (state, district) are rollups of
+that small base table, described declaratively as
+(output name, base column, reduction) metrics using built-in reductions only.
+"""
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+# Reductions that can be applied to a base aggregate. 'count' counts non-null
+# values, which on a key column of the base table is a distinct count.
+ROLLUP_REDUCTIONS = ('sum', 'count', 'min', 'max')
+
+
+class PartialAggregate:
+    """
+    Base aggregate: group-by sums and row counts over one frame or a stream of chunks.
+
+    Each chunk is reduced to one row per group in a single grouping pass;
+    partials are folded together once enough of them pile up, so memory is
+    bounded by the number of groups, not the number of rows. Group keys keep
+    missing values so rollups match grouping the full frame.
+    """
+
+    def __init__(self, keys, value_cols, compact_every=16):
+        self.keys = list(keys)
+        self.value_cols = list(value_cols)
+        self.compact_every = compact_every
+        self.parts = []
+
+    def update(self, chunk):
+        """Fold one chunk (or a whole frame) into the aggregate"""
+        if len(chunk) == 0:
+            return
+        grouped = chunk.groupby(self.keys, dropna=False, observed=True)
+        part = grouped[self.value_cols].sum()
+        part['rows'] = grouped.size()
+        self._append(part)
+
+    def add_partial(self, partial):
+        """Fold in a partial previously returned by `result()` (e.g. loaded from disk)"""
+        self._append(partial.set_index(self.keys))
+
+    def _append(self, part):
+        self.parts.append(part)
+        if len(self.parts) >= self.compact_every:
+            self.parts = [self._fold(self.parts)]
+
+    def _fold(self, parts):
+        if len(parts) == 1:
+            return parts[0]
+        combined = pd.concat(parts)
+        folded = combined.groupby(level=self.keys, dropna=False, sort=True).sum()
+
+        # Categorical keys with different category sets concat to plain
+        # strings; put them back on the union of the parts' categories, as
+        # ingestion.combine_frames does for per-file frames
+        levels = {}
+        for key in self.keys:
+            values = [part.index.get_level_values(key) for part in parts]
+            if all(isinstance(v.dtype, pd.CategoricalDtype) for v in values):
+                categories = union_categoricals(values, sort_categories=True).categories
+                levels[key] = pd.Categorical(folded.index.get_level_values(key), categories=categories)
+        if not levels:
+            return folded
+        index = folded.index.to_frame(index=False).assign(**levels)
+        folded.index = pd.MultiIndex.from_frame(index) if len(self.keys) > 1 else pd.Index(index[self.keys[0]])
+        return folded
+
+    def result(self):
+        """Return the aggregate as a flat frame (keys as columns, plus 'rows')"""
+        if not self.parts:
+            return pd.DataFrame(columns=self.keys + self.value_cols + ['rows'])
+        return self._fold(self.parts).reset_index()
+
+
+def aggregate_frame(df, keys, value_cols):
+    """Base aggregate of an in-memory frame (one grouping pass)"""
+    aggregate = PartialAggregate(keys, value_cols)
+    aggregate.update(df)
+    return aggregate.result()
+
+
+def rollup(base, by, metrics):
+    """
+    Re-group a base aggregate to a coarser level.
+
+    Args:
+        base: frame returned by PartialAggregate.result() / aggregate_frame()
+        by: key column(s) to group by (rows with a missing key are dropped,
+            as in a plain groupby on the raw rows)
+        metrics: list of (output name, base column, reduction) with reduction
+            in ROLLUP_REDUCTIONS
+
+    Returns:
+        flat frame with the `by` columns followed by one column per metric
+    """
+    for name, column, reduction in metrics:
+        if reduction not in ROLLUP_REDUCTIONS:
+            raise ValueError(f"Unsupported reduction '{reduction}' for metric '{name}'")
+
+    return base.groupby(by, observed=True).agg(
+        **{name: (column, reduction) for name, column, reduction in metrics}
+    ).reset_index()
@@ -2,10 +2,22 @@
 Automated EDA Script - Run this to get comprehensive analysis of all datasets
 Generates reports and visualizations automatically
 
-Usage: python automated_eda.py
+The per-dataset EDA runs and chart builds are independent jobs and run in
+one process pool, so the whole run takes about as long as the slowest
+dataset. Each job captures its own printout, and the sections are printed
+in dataset order however the jobs finish.
+
+Usage:
+    python automated_eda.py              (all cores)
+    python automated_eda.py --workers 1  (serially, in this process)
+    python automated_eda.py --cache-dir ../data/cache  (reuse cleaned datasets)
 """
 
+import argparse
+import contextlib
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
@@ -15,10 +27,94 @@ sys.path.append(str(Path(__file__).parent))
 
 from data_loader import DataLoader
 from eda_utils import EDAAnalyzer
-from visualization_utils import VisualizationTools, save_figure
+from visualization_utils import FigureExporter, VisualizationTools
+from chart_data import ChartData
+from ingestion import resolve_workers
+
+
+def eda_job(name, df):
+    """Full EDA of one dataset
+
+    Returns:
+        (printed report, list of insights)
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        print(f"\n{'='*80}")
+        print(f"Analyzing: {name.upper()}")
+        print(f"{'='*80}")
+        analyzer = EDAAnalyzer(df, name)
+        analyzer.run_full_eda()
+    return output.getvalue(), analyzer.insights
+
+
+def chart_job(name, data):
+    """Build and save the charts of one dataset; returns the printed progress
+
+    `data` is the dataset's ChartData, so a worker process receives the
+    small base aggregate rather than the raw rows. HTML files share one
+    plotly.js bundle and the PNGs are rendered in one batch when the
+    exporter closes; unchanged charts are not written again.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), FigureExporter(shared_plotlyjs=True) as exporter:
+        print(f"\nGenerating charts for {name}...")
+        viz = VisualizationTools()
+        
+        # Time series plot
+        daily_totals = data.table('date')
+        fig = viz.plot_time_series(daily_totals, 'date', ['total'], 
+                                   title=f'{name.title()} - Daily Trend')
+        exporter.add(fig, f'{name}_daily_trend')
+        print(f"   Daily trend chart saved")
+        
+        # State comparison
+        if 'state' in data.keys:
+            fig = viz.plot_state_comparison(data.table('state'), 'state', 'total')
+            exporter.add(fig, f'{name}_state_comparison')
+            print(f"   State comparison chart saved")
+        
+        # Age distribution
+        age_cols = data.columns_like('age')
+        if age_cols:
+            fig = viz.plot_age_distribution(data.table(), age_cols, 
+                                           title=f'{name.title()} - Age Distribution')
+            exporter.add(fig, f'{name}_age_distribution')
+            print(f"   Age distribution chart saved")
+        
+        if exporter.skipped:
+            print(f"   {len(exporter.skipped)} unchanged chart(s) not rewritten")
+    return output.getvalue()
+
+
+def run_jobs(jobs, workers=1):
+    """
+    Run (function, *args) jobs, in a process pool when workers != 1.
+
+    Args:
+        jobs: dict of key -> (function, *args)
+        workers: number of processes (1 = serially in this process, 0 = all cores)
 
-def main():
-    """Main execution function"""
+    Returns:
+        dict of key -> result, in the order of `jobs`
+    """
+    workers = resolve_workers(workers)
+    if workers == 1 or len(jobs) <= 1:
+        return {key: function(*args) for key, (function, *args) in jobs.items()}
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {key: pool.submit(function, *args) for key, (function, *args) in jobs.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+
+def main(workers=0, cache_dir=None):
+    """Main execution function
+
+    Args:
+        workers: processes for the EDA and chart jobs (1 = serial, 0 = all cores)
+        cache_dir: folder caching the cleaned datasets (default: the
+            UIDAI_CACHE_DIR environment variable, or no cache)
+    """
     
     print("\n" + "="*80)
     print(" UIDAI HACKATHON - AUTOMATED EDA")
@@ -28,7 +124,7 @@ def main():
     # Step 1: Load all data
     print("STEP 1: Loading Data...")
     print("-"*80)
-    loader = DataLoader()
+    loader = DataLoader(workers=workers, cache_dir=cache_dir)
     datasets = loader.load_all_data()
     
     if all(df is None for df in datasets.values()):
@@ -41,55 +137,35 @@ def main():
     
     loader.get_summary_stats(datasets)
     
-    # Step 2: Run EDA on each dataset
+    # Steps 2 and 3: EDA and charts of every dataset, all jobs at once
+    jobs = {}
+    for name, df in datasets.items():
+        if df is not None:
+            jobs[('eda', name)] = (eda_job, name, df)
+    for name, df in datasets.items():
+        if df is not None and 'date' in df.columns:
+            # One grouping pass over the rows: total enrollments/updates by
+            # state, district and day; every chart plots a rollup of it. Only
+            # this aggregate is sent to the chart job, the raw frame goes to
+            # the EDA job alone
+            jobs[('charts', name)] = (chart_job, name, ChartData.from_frame(df))
+    results = run_jobs(jobs, workers)
+    
     print("\n\nSTEP 2: Running Exploratory Data Analysis...")
     print("-"*80)
     
-    analyzers = {}
+    insights = {}
+    for (step, name), result in results.items():
+        if step == 'eda':
+            report, insights[name] = result
+            print(report, end='')
     
-    for name, df in datasets.items():
-        if df is not None:
-            print(f"\n{'='*80}")
-            print(f"Analyzing: {name.upper()}")
-            print(f"{'='*80}")
-            analyzer = EDAAnalyzer(df, name)
-            analyzer.run_full_eda()
-            analyzers[name] = analyzer
-    
-    # Step 3: Generate visualizations
     print("\n\nSTEP 3: Generating Visualizations...")
     print("-"*80)
     
-    viz = VisualizationTools()
-    
-    for name, df in datasets.items():
-        if df is not None and 'date' in df.columns:
-            print(f"\nGenerating charts for {name}...")
-            
-            # Calculate total enrollments/updates per day
-            numeric_cols = [col for col in df.columns if col not in ['date', 'state', 'district', 'pincode']]
-            df['total'] = df[numeric_cols].sum(axis=1)
-            
-            # Time series plot
-            daily_totals = df.groupby('date')['total'].sum().reset_index()
-            fig = viz.plot_time_series(daily_totals, 'date', ['total'], 
-                                       title=f'{name.title()} - Daily Trend')
-            save_figure(fig, f'{name}_daily_trend')
-            print(f"   Daily trend chart saved")
-            
-            # State comparison
-            if 'state' in df.columns:
-                fig = viz.plot_state_comparison(df, 'state', 'total')
-                save_figure(fig, f'{name}_state_comparison')
-                print(f"   State comparison chart saved")
-            
-            # Age distribution
-            age_cols = [col for col in df.columns if 'age' in col.lower()]
-            if age_cols:
-                fig = viz.plot_age_distribution(df, age_cols, 
-                                               title=f'{name.title()} - Age Distribution')
-                save_figure(fig, f'{name}_age_distribution')
-                print(f"   Age distribution chart saved")
+    for (step, name), result in results.items():
+        if step == 'charts':
+            print(result, end='')
     
     # Step 4: Generate summary report
     print("\n\nSTEP 4: Generating Summary Report...")
@@ -117,9 +193,9 @@ def main():
                 f.write(f"Unique Districts: {df['district'].nunique()}\n")
                 f.write(f"Unique Pincodes: {df['pincode'].nunique()}\n")
                 
-                if name in analyzers:
+                if name in insights:
                     f.write(f"\nKey Insights:\n")
-                    for i, insight in enumerate(analyzers[name].insights, 1):
+                    for i, insight in enumerate(insights[name], 1):
                         f.write(f"  {i}. {insight}\n")
     
     print(f"\n Report saved: {report_file}")
@@ -162,4 +238,14 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Automated EDA of all UIDAI datasets")
+    parser.add_argument(
+        '--workers', type=int, default=0,
+        help="processes for the per-dataset EDA and chart jobs (1 = serial, 0 = all cores)",
+    )
+    parser.add_argument(
+        '--cache-dir', type=Path, default=None,
+        help="cache the cleaned datasets in this folder (default: $UIDAI_CACHE_DIR, or no cache)",
+    )
+    args = parser.parse_args()
+    main(workers=args.workers, cache_dir=args.cache_dir)
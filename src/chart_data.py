@@ -0,0 +1,85 @@
+"""
+Chart Data Layer for UIDAI Hackathon
+Every aggregate the EDA charts need, from one grouping pass per dataset
+
+ChartData groups the raw rows once by state x district x date into sums of
+the count columns, a 'total' (their sum) and a row count (see
+aggregation.PartialAggregate). The per-date, per-state, per-district and
+state x date tables the charts plot are rollups of that base table, built
+on first use and cached, so building charts costs time in the number of
+groups rather than the number of rows.
+
+    data = ChartData.from_frame(df)
+    viz.plot_time_series(data.table('date'), 'date', ['total'])
+    viz.plot_state_comparison(data.table('state'), 'state', 'total')
+    viz.plot_heatmap(data.table('state', 'date'), 'date', 'state', 'total')
+"""
+
+import numpy as np
+
+from aggregation import aggregate_frame, rollup
+
+
+CHART_KEYS = ['state', 'district', 'date']
+NON_MEASURES = CHART_KEYS + ['pincode']
+
+
+class ChartData:
+    """
+    Base aggregate of one dataset plus cached rollups of it.
+
+    Attributes:
+        keys: grouping columns of the base table (CHART_KEYS present in the data)
+        measures: summed count columns, followed by 'total'
+        base: the base aggregate (missing keys kept), with a 'rows' count
+    """
+
+    def __init__(self, base, keys, measures):
+        self.base = base
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self._tables = {}
+
+    @classmethod
+    def from_frame(cls, df, measures=None):
+        """
+        Aggregate a raw frame in one grouping pass.
+
+        Args:
+            measures: count columns to sum (default: every numeric column
+                other than the keys and pincode)
+        """
+        if measures is None:
+            measures = [
+                col for col in df.select_dtypes(include=[np.number]).columns
+                if col not in NON_MEASURES
+            ]
+        measures = list(measures)
+        keys = [key for key in CHART_KEYS if key in df.columns]
+        base = aggregate_frame(df, keys, measures)
+        # Per-group sums are exact, so 'total' is taken on the small table
+        base['total'] = base[measures].sum(axis=1)
+        return cls(base, keys, measures + ['total'])
+
+    def table(self, *by):
+        """
+        Sums of every measure (and 'rows') per combination of `by`, cached.
+
+        Rows with a missing `by` key are left out, as in a groupby on the raw
+        rows; with no `by` the result is one row of grand totals over all rows.
+        """
+        missing = [key for key in by if key not in self.keys]
+        if missing:
+            raise ValueError(f"Chart data is grouped by {self.keys}, not {missing}")
+        if by not in self._tables:
+            columns = self.measures + ['rows']
+            if by:
+                metrics = [(col, col, 'sum') for col in columns]
+                self._tables[by] = rollup(self.base, list(by), metrics)
+            else:
+                self._tables[by] = self.base[columns].sum().to_frame().T
+        return self._tables[by]
+
+    def columns_like(self, text):
+        """Measures whose name contains `text` (e.g. 'age'), in order"""
+        return [col for col in self.measures if col != 'total' and text in col.lower()]
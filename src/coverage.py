@@ -0,0 +1,140 @@
+"""
+Temporal Coverage for UIDAI Hackathon
+Reporting coverage per state, district and pincode: first and last reporting
+day, days reported, missing days and the longest silent streak
+
+Dates are turned into integer day offsets once. Every (entity, day) pair is
+then one int64 (entity code * span + day), and a single np.unique sorts them
+entity by entity, so the gaps of all entities come from one np.diff and
+their per-entity extremes from np.*.reduceat, with no per-entity set or
+date_range.
+
+preprocess.py writes one table per level (coverage_state, coverage_district,
+coverage_pincode) with one row per (entity, dataset) that reported at all.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cube import CUBE_LEVELS
+from ingestion import combine_frames
+
+
+COVERAGE_LEVELS = CUBE_LEVELS
+COVERAGE_COLUMNS = [
+    'first_date', 'last_date', 'reporting_days', 'span_days',
+    'missing_days', 'gaps', 'longest_gap_days',
+]
+
+
+def coverage_table_name(level):
+    """Processed table holding the coverage of one level, e.g. 'coverage_district'"""
+    if level not in COVERAGE_LEVELS:
+        raise ValueError(f"Unknown coverage level '{level}' (expected one of {COVERAGE_LEVELS})")
+    return f"coverage_{level}"
+
+
+def day_offsets(dates):
+    """
+    Integer day numbers of a date column (days since 1970-01-01).
+
+    Strings are parsed into a local copy; the caller's column is not changed.
+
+    Returns:
+        (days, valid) - int64 day numbers and a mask that is False for missing dates
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors='coerce')
+    valid = dates.notna().to_numpy().copy()
+    days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype('int64')
+    return days, valid
+
+
+def reporting_coverage(df, keys=None, date_col='date'):
+    """
+    Reporting coverage of every entity (combination of `keys`) in one pass.
+
+    An entity reports on a day if it has at least one row that day; rows
+    with a missing key or date are ignored. With no keys the whole frame is
+    one entity.
+
+    Returns:
+        frame with the keys followed by
+            first_date, last_date   first and last reporting day
+            reporting_days          distinct days with data
+            span_days               days from first to last, inclusive
+            missing_days            span_days - reporting_days
+            gaps                    silent streaks between reporting days
+            longest_gap_days        length of the longest one (0 if none)
+    """
+    keys = list(keys or [])
+    days, valid = day_offsets(df[date_col])
+    for key in keys:
+        valid &= df[key].notna().to_numpy()
+    days = days[valid]
+
+    if keys:
+        grouped = df.loc[valid, keys].groupby(keys, observed=True, sort=True)
+        codes = grouped.ngroup().to_numpy(dtype='int64')
+        entities = grouped.size().index.to_frame(index=False)
+    else:
+        codes = np.zeros(len(days), dtype='int64')
+        entities = pd.DataFrame(index=range(1 if len(days) else 0))
+
+    if len(days) == 0:
+        return entities.assign(**{col: pd.Series(dtype='int64') for col in COVERAGE_COLUMNS})
+
+    # One sorted array of distinct (entity, day) pairs
+    origin = days.min()
+    width = int(days.max() - origin) + 1
+    pairs = np.unique(codes * width + (days - origin))
+    entity, day = pairs // width, pairs % width
+
+    starts = np.flatnonzero(np.r_[True, entity[1:] != entity[:-1]])
+    ends = np.r_[starts[1:], len(pairs)] - 1
+
+    # Silent days after each reporting day, up to the entity's next one
+    silent = np.r_[np.diff(day) - 1, 0]
+    silent[ends] = 0
+
+    first, last = day[starts], day[ends]
+    reporting = np.diff(np.r_[starts, len(pairs)])
+    span = last - first + 1
+
+    coverage = entities.iloc[entity[starts]].reset_index(drop=True)
+    coverage['first_date'] = (first + origin).astype('datetime64[D]').astype('datetime64[us]')
+    coverage['last_date'] = (last + origin).astype('datetime64[D]').astype('datetime64[us]')
+    coverage['reporting_days'] = reporting.astype('int32')
+    coverage['span_days'] = span.astype('int32')
+    coverage['missing_days'] = (span - reporting).astype('int32')
+    coverage['gaps'] = np.add.reduceat(silent > 0, starts).astype('int32')
+    coverage['longest_gap_days'] = np.maximum.reduceat(silent, starts).astype('int32')
+    return coverage
+
+
+def coverage_tables(partials):
+    """
+    Per-level coverage tables from the per-dataset cube aggregates.
+
+    Args:
+        partials: dict of dataset name -> aggregate grouped by CUBE_KEYS
+            (the same input as cube.build_cube)
+
+    Returns:
+        list of (table name, DataFrame), one per COVERAGE_LEVELS entry, with
+        the level keys, 'dataset' and the coverage columns. Rows with a
+        missing state, district or pincode are left out of every level keyed
+        on it; a missing key is never reported as an entity of its own.
+    """
+    frames = [part[CUBE_LEVELS + ['date']].assign(dataset=name) for name, part in partials.items()]
+    # Missing state/district keys stay missing (reporting_coverage drops them)
+    combined = combine_frames(frames)
+    combined['dataset'] = pd.Categorical(combined['dataset'])
+
+    tables = []
+    for depth, level in enumerate(COVERAGE_LEVELS, start=1):
+        coverage = reporting_coverage(combined, CUBE_LEVELS[:depth] + ['dataset'])
+        if 'pincode' in coverage.columns:
+            coverage['pincode'] = coverage['pincode'].astype('uint32')
+        tables.append((coverage_table_name(level), coverage))
+    return tables
@@ -0,0 +1,188 @@
+"""
+OLAP Cube for UIDAI Hackathon
+Daily enrolment and update counts by state -> district -> pincode, with
+every hierarchy level rolled up ahead of time and a small query API
+
+The base fact table holds one row per (state, district, pincode, date) with
+the raw count columns of all three datasets. preprocess.py writes it together
+with its rollups as processed tables:
+
+    cube_pincode_daily   (base grain)
+    cube_district_daily, cube_state_daily, cube_daily (all-India by date)
+    cube_pincode, cube_district, cube_state           (all-time totals)
+
+OLAPCube answers a rollup or slice from the smallest table that can serve it,
+so drill-downs never touch data/raw.
+"""
+
+import pandas as pd
+
+from packing import check_fits
+from processed_store import read_table
+
+
+# Hierarchy, coarsest first; the cube grain is all levels plus the day
+CUBE_LEVELS = ['state', 'district', 'pincode']
+CUBE_KEYS = CUBE_LEVELS + ['date']
+
+# Raw count columns carried into the cube, per dataset
+CUBE_MEASURES = {
+    'enrolment': ['age_0_5', 'age_5_17', 'age_18_greater'],
+    'demographic': ['demo_age_5_17', 'demo_age_17_'],
+    'biometric': ['bio_age_5_17', 'bio_age_17_'],
+}
+MEASURES = [col for cols in CUBE_MEASURES.values() for col in cols]
+
+
+def cube_table_name(level=None, daily=False):
+    """Processed table holding a rollup, e.g. ('district', True) -> 'cube_district_daily'"""
+    if level is None:
+        if not daily:
+            raise ValueError("The all-India total has no table; sum cube_state instead")
+        return 'cube_daily'
+    if level not in CUBE_LEVELS:
+        raise ValueError(f"Unknown cube level '{level}' (expected one of {CUBE_LEVELS})")
+    return f"cube_{level}_daily" if daily else f"cube_{level}"
+
+
+def build_cube(partials):
+    """
+    Merge per-dataset base aggregates into the cube fact table.
+
+    Args:
+        partials: dict of dataset name -> PartialAggregate result grouped by
+            CUBE_KEYS with that dataset's CUBE_MEASURES
+
+    Returns:
+        fact table sorted by CUBE_KEYS; rows with a missing key are dropped
+        and a measure absent from a dataset's rows is 0. Pincodes and
+        measures are stored as uint32; a value outside it raises OverflowError
+    """
+    frames = [
+        partials[name][CUBE_KEYS + measures]
+        for name, measures in CUBE_MEASURES.items() if name in partials
+    ]
+    # Categorical keys with different category sets concat to object dtype,
+    # so the keys are re-typed after the single grouping pass
+    combined = pd.concat(frames, ignore_index=True)
+    fact = combined.groupby(CUBE_KEYS, sort=True)[MEASURES].sum().reset_index()
+
+    fact['state'] = pd.Categorical(fact['state'])
+    fact['district'] = pd.Categorical(fact['district'])
+    for col in ['pincode'] + MEASURES:
+        check_fits(fact[col], 'uint32', col)
+        fact[col] = fact[col].astype('uint32')
+    return fact
+
+
+def cube_rollups(fact):
+    """
+    Precompute the rollup of the fact table at every hierarchy level.
+
+    Returns:
+        list of (table name, DataFrame), finest first, ready for write_table
+    """
+    tables = [(cube_table_name('pincode', daily=True), fact)]
+    for depth in range(len(CUBE_LEVELS), 0, -1):
+        keys = CUBE_LEVELS[:depth]
+        if depth < len(CUBE_LEVELS):
+            tables.append((cube_table_name(keys[-1], daily=True), _group(fact, keys + ['date'])))
+        tables.append((cube_table_name(keys[-1]), _group(fact, keys)))
+    tables.append((cube_table_name(daily=True), _group(fact, ['date'])))
+    return tables
+
+
+def _group(df, keys):
+    # int64 sums: no overflow at coarse levels, and windows can be differenced
+    return df.groupby(keys, observed=True, sort=True)[MEASURES].sum().astype('int64').reset_index()
+
+
+class OLAPCube:
+    """
+    Query the precomputed cube tables in data/processed.
+
+    Tables are read on first use and kept in memory. A query picks the
+    coarsest table that holds the requested level and every filtered level,
+    and the all-time table unless a date range or daily breakdown is asked
+    for, so typical slices scan a few thousand rows.
+
+    Example:
+        cube = OLAPCube('data/processed')
+        cube.query('district', state='Bihar')                  # districts of Bihar
+        cube.query('state', start='2025-11-01', end='2025-11-30')
+        cube.query(None, daily=True, measures=['age_0_5'])     # all-India daily series
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._tables = {}
+
+    def table(self, level=None, daily=False):
+        """One precomputed rollup table (see cube_table_name)"""
+        name = cube_table_name(level, daily)
+        if name not in self._tables:
+            self._tables[name] = read_table(self.data_dir, name)
+        return self._tables[name]
+
+    def query(self, level='state', measures=None, start=None, end=None, daily=False, **members):
+        """
+        Totals at one hierarchy level for a slice of the cube.
+
+        Args:
+            level: 'state', 'district', 'pincode', or None for all-India
+            measures: count columns to return (default: all of MEASURES)
+            start, end: inclusive date range (default: all days)
+            daily: keep one row per day instead of totals over the range
+            **members: hierarchy filters, e.g. state='Bihar' or
+                district=['Patna', 'Gaya']; a list keeps any of its values
+
+        Returns:
+            DataFrame with the level keys (and 'date' if daily) followed by
+            the measures, sorted by the keys
+        """
+        measures = list(MEASURES if measures is None else measures)
+        unknown = [col for col in measures if col not in MEASURES]
+        if unknown:
+            raise ValueError(f"Unknown cube measures: {unknown}")
+        for key in members:
+            if key not in CUBE_LEVELS:
+                raise ValueError(f"Unknown cube level '{key}' (expected one of {CUBE_LEVELS})")
+
+        keys = CUBE_LEVELS[:CUBE_LEVELS.index(level) + 1] if level is not None else []
+        depth = max([len(keys)] + [CUBE_LEVELS.index(key) + 1 for key in members])
+        use_dates = daily or start is not None or end is not None
+
+        if depth == 0:
+            source = self.table(None, daily=True)
+        else:
+            source = self.table(CUBE_LEVELS[depth - 1], daily=use_dates)
+
+        keep = pd.Series(True, index=source.index)
+        for key, value in members.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            keep &= source[key].isin(values)
+        if start is not None:
+            keep &= source['date'] >= pd.Timestamp(start)
+        if end is not None:
+            keep &= source['date'] <= pd.Timestamp(end)
+        sliced = source[keep] if not keep.all() else source
+
+        group_keys = keys + (['date'] if daily else [])
+        if not group_keys:
+            return sliced[measures].sum().to_frame().T
+        if depth == len(keys) and use_dates == daily:
+            # The source table is already at the requested grain
+            return sliced[group_keys + measures].reset_index(drop=True)
+        return sliced.groupby(group_keys, observed=True, sort=True)[measures].sum().reset_index()
+
+    def drill_down(self, measures=None, start=None, end=None, **members):
+        """
+        Children of one node of the hierarchy.
+
+        drill_down() lists states, drill_down(state='Bihar') its districts,
+        drill_down(state='Bihar', district='Patna') that district's pincodes.
+        """
+        depth = len(members)
+        if depth >= len(CUBE_LEVELS) or list(members) != CUBE_LEVELS[:depth]:
+            raise ValueError(f"drill_down takes a path of {CUBE_LEVELS[:-1]}, got {list(members)}")
+        return self.query(CUBE_LEVELS[depth], measures, start, end, **members)
@@ -3,211 +3,384 @@ Data Loading Utilities for UIDAI Hackathon
 Automatically loads and combines all CSV files from the three datasets
 """
 
+import os
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from normalization import clean_state_name
+from ingestion import (
+    list_raw_files, scan_dataset_files, pack_dataset_files, sketch_dataset_files,
+    count_dataset_outliers, combine_frames,
+)
+from dedup import RowDeduplicator
+from schema import RAW_SCHEMAS
+from sketches import DEFAULT_K
+from profiling import with_exact_outliers
+from streaming import DEFAULT_CHUNKSIZE
+from dataset_cache import CACHE_DIR_ENV, DEFAULT_CACHE_BYTES, DatasetCache
+from packing import PackedTable, concat_packed, packing_report
 
-def clean_state_name(state):
-    """Standardize state/UT names to handle variations in formatting"""
-    if pd.isna(state):
-        return state
-    state = str(state).strip()
-    # First, convert to lowercase and then title case for consistency
-    state = state.lower().title()
-    # Fix multiple spaces
-    state = ' '.join(state.split())
-    # Replace ampersand with "And"
-    state = state.replace('&', 'And').replace(' & ', ' And ')
-    # Standardize common variations
-    replacements = {
-        'Orissa': 'Odisha',
-        'Pondicherry': 'Puducherry',
-        'West  Bengal': 'West Bengal',
-        'West Bangal': 'West Bengal',
-        'Westbengal': 'West Bengal',
-        'West Bengal': 'West Bengal',
-        'Andaman And Nicobar Islands': 'Andaman And Nicobar Islands',
-        'Andaman & Nicobar Islands': 'Andaman And Nicobar Islands',
-        # Merge Dadra And Nagar Haveli (old UT) with new merged UT
-        'Dadra And Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Dadra & Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Dadra & Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Daman & Diu': 'Dadra And Nagar Haveli And Daman And Diu',
-        'Jammu And Kashmir': 'Jammu And Kashmir',
-        'Jammu & Kashmir': 'Jammu And Kashmir',
-    }
-    return replacements.get(state, state)
+
+# Registered datasets: name (a key of schema.RAW_SCHEMAS) -> raw folder and
+# display label. A new dataset is one entry here plus its schema.
+DATASETS = {
+    'enrolment': {'folder': 'enrolment', 'label': 'Enrolment Data'},
+    'demographic': {'folder': 'demographic_update', 'label': 'Demographic Update Data'},
+    'biometric': {'folder': 'biometric_update', 'label': 'Biometric Update Data'},
+}
+
+
+def scan_options(name, columns=None, states=None, start=None, end=None, dedup=True):
+    """
+    Validate the scan options of a dataset read.
+    
+    Raises ValueError for an unknown dataset or column. State names are cleaned
+    the same way as the data, so 'Orissa' selects 'Odisha'.
+    """
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset '{name}' (expected one of {list(DATASETS)})")
+    if columns is not None:
+        columns = list(columns)
+        unknown = [col for col in columns if col not in RAW_SCHEMAS[name]]
+        if unknown:
+            raise ValueError(f"Unknown columns for dataset '{name}': {unknown}")
+    if states is not None:
+        states = sorted({clean_state_name(state) for state in states})
+    return {'columns': columns, 'states': states, 'start': start, 'end': end, 'dedup': bool(dedup)}
+
+
+class LazyDataset:
+    """
+    Deferred handle on one registered dataset.
+
+    Holds the scan options (columns, states, date range, dedup) and reads the raw
+    files only when the data is first accessed; the loaded frame is kept.
+    Column access, attribute access and len() go to the loaded DataFrame, so
+    a handle can stand in for one in most analysis code.
+    """
+    
+    def __init__(self, loader, name, columns=None, states=None, start=None, end=None, dedup=True):
+        self.name = name
+        self._loader = loader
+        self._scan = scan_options(name, columns, states, start, end, dedup)
+        self._frame = None
+        self._loaded = False
+    
+    def select(self, *columns):
+        """New handle reading only `columns`"""
+        return LazyDataset(self._loader, self.name, **{**self._scan, 'columns': columns})
+    
+    def where(self, states=None, start=None, end=None):
+        """New handle keeping only rows of `states` dated within [`start`, `end`]"""
+        scan = dict(self._scan)
+        if states is not None:
+            scan['states'] = states
+        if start is not None:
+            scan['start'] = start
+        if end is not None:
+            scan['end'] = end
+        return LazyDataset(self._loader, self.name, **scan)
+    
+    @property
+    def loaded(self):
+        return self._loaded
+    
+    def collect(self):
+        """Load the dataset (once) and return it as a DataFrame, or None if it has no files"""
+        if not self._loaded:
+            self._frame = self._loader.load_dataset(self.name, **self._scan)
+            self._loaded = True
+        return self._frame
+    
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.collect(), attr)
+    
+    def __getitem__(self, key):
+        return self.collect()[key]
+    
+    def __len__(self):
+        return len(self.collect())
+    
+    def __repr__(self):
+        if self._loaded:
+            return f"LazyDataset({self.name!r}, loaded, rows={len(self._frame) if self._frame is not None else 0:,})"
+        scan = ', '.join(
+            f"{key}={value!r}" for key, value in self._scan.items()
+            if value is not None and (key, value) != ('dedup', True)
+        )
+        return f"LazyDataset({self.name!r}{', ' + scan if scan else ''}, not loaded)"
 
 
 class DataLoader:
     """Load and preprocess UIDAI datasets"""
     
-    def __init__(self, data_dir='../data/raw'):
+    def __init__(self, data_dir='../data/raw', workers=1, cache_dir=None, cache_bytes=DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            data_dir: folder holding the enrolment/demographic_update/biometric_update folders
+            workers: processes used to parse CSV files (1 = serial, 0 = all cores)
+            cache_dir: folder for cleaned datasets (see dataset_cache.py);
+                default: the UIDAI_CACHE_DIR environment variable, or no
+                cache when it is unset; False disables the cache either way
+            cache_bytes: size cap of the cache, least recently used entries go first
+        """
         self.data_dir = Path(data_dir)
-        self.enrolment_dir = self.data_dir / 'enrolment'
-        self.demographic_dir = self.data_dir / 'demographic_update'
-        self.biometric_dir = self.data_dir / 'biometric_update'
-        
-    def load_enrolment_data(self):
-        """Load all enrolment CSV files and combine them"""
-        print("Loading Enrolment Data...")
-        
-        csv_files = list(self.enrolment_dir.glob('*.csv'))
-        print(f"   Found {len(csv_files)} CSV files")
-        
-        if not csv_files:
-            print("    No CSV files found in enrolment folder!")
+        self.workers = workers
+        if cache_dir is None:
+            cache_dir = os.environ.get(CACHE_DIR_ENV) or False
+        self.cache = DatasetCache(cache_dir, cache_bytes) if cache_dir is not False else None
+        self.enrolment_dir = self.data_dir / DATASETS['enrolment']['folder']
+        self.demographic_dir = self.data_dir / DATASETS['demographic']['folder']
+        self.biometric_dir = self.data_dir / DATASETS['biometric']['folder']
+    
+    def dataset_files(self, name):
+        """Raw CSV files of a registered dataset, sorted"""
+        return list_raw_files(self.data_dir / DATASETS[name]['folder'])
+    
+    def dataset(self, name, columns=None, states=None, start=None, end=None, dedup=True):
+        """
+        Lazy handle on one dataset; nothing is read until the data is accessed.
+        
+        Args:
+            name: registered dataset name (see DATASETS)
+            columns: raw columns to keep (default: all)
+            states: state names to keep (cleaned the same way as the data)
+            start, end: inclusive date range to keep
+            dedup: drop duplicate raw rows; this needs every column parsed,
+                so with False only `columns` (plus the filter and location
+                columns) are read from the files
+        """
+        return LazyDataset(self, name, columns, states, start, end, dedup)
+    
+    def datasets(self, names=None, **scan):
+        """Lazy handles for several datasets (default: all registered), sharing one scan"""
+        return {name: self.dataset(name, **scan) for name in (names or DATASETS)}
+    
+    def cache_key(self, name, csv_files, scan):
+        """Cache key of a dataset read, or None without a cache or files"""
+        if self.cache is None or not csv_files:
             return None
-        
-        dfs = []
-        for file in csv_files:
-            print(f"   Loading {file.name}...")
-            df = pd.read_csv(file)
-            dfs.append(df)
-        
-        combined = pd.concat(dfs, ignore_index=True)
-        records_before_dedup = len(combined)
-        
-        # Convert date column to datetime
-        combined['date'] = pd.to_datetime(combined['date'], errors='coerce')
-        
-        # Clean state names
-        if 'state' in combined.columns:
-            combined['state'] = combined['state'].apply(clean_state_name)
-        
-        # Remove bad data (numeric state values)
-        if 'state' in combined.columns:
-            combined = combined[~combined['state'].str.match(r'^\d+$', na=False)]
-        
-        # Basic cleaning - track duplicates
-        duplicates_found = combined.duplicated().sum()
-        combined = combined.drop_duplicates()
-        records_after_dedup = len(combined)
-        
-        print(f"   Records before dedup: {records_before_dedup:,}")
-        print(f"   Duplicates found: {duplicates_found:,}")
-        print(f"   Records after dedup: {records_after_dedup:,}")
-        print(f"   Dedup loss: {(duplicates_found/records_before_dedup)*100:.2f}%")
-        print(f"Loaded {len(combined):,} records")
-        print(f"Date range: {combined['date'].min()} to {combined['date'].max()}")
-        
-        return combined
+        return self.cache.key(name, csv_files, scan)
     
-    def load_demographic_update_data(self):
-        """Load all demographic update CSV files and combine them"""
-        print("\n Loading Demographic Update Data...")
-        
-        csv_files = list(self.demographic_dir.glob('*.csv'))
+    def load_dataset(self, name, columns=None, states=None, start=None, end=None, dedup=True, scans=None):
+        """
+        Load one dataset, combining its files.
+        
+        Filters and the column projection are applied chunk by chunk inside
+        each file's scan, so only the requested rows and columns are ever
+        combined. Duplicates are dropped on the full raw rows, within and
+        across files, before the projection (unless `dedup` is False). With a cache (see `__init__`) the result is stored on
+        disk, and a later load of the same files with the same options reads
+        it back instead.
+        
+        Args:
+            name: registered dataset name (see DATASETS)
+            columns, states, start, end, dedup: see `dataset`
+            scans: already scanned (frame, fingerprints) pairs, one per file
+        
+        Returns:
+            DataFrame, or None when the dataset folder has no CSV files
+        """
+        scan = scan_options(name, columns, states, start, end, dedup)
+        label = DATASETS[name]['label']
+        print(f"\n Loading {label}...")
+        
+        csv_files = self.dataset_files(name)
         print(f"   Found {len(csv_files)} CSV files")
         
         if not csv_files:
-            print("    No CSV files found in demographic_update folder!")
+            print(f"    No CSV files found in {DATASETS[name]['folder']} folder!")
             return None
         
-        dfs = []
-        for file in csv_files:
-            print(f"   Loading {file.name}...")
-            df = pd.read_csv(file)
-            dfs.append(df)
-        
-        combined = pd.concat(dfs, ignore_index=True)
-        records_before_dedup = len(combined)
-        
-        # Convert date column to datetime
-        combined['date'] = pd.to_datetime(combined['date'], errors='coerce')
-        
-        # Clean state names
-        if 'state' in combined.columns:
-            combined['state'] = combined['state'].apply(clean_state_name)
-        
-        # Remove bad data (numeric state values)
-        if 'state' in combined.columns:
-            combined = combined[~combined['state'].str.match(r'^\d+$', na=False)]
-        
-        # Basic cleaning - track duplicates
-        duplicates_found = combined.duplicated().sum()
-        combined = combined.drop_duplicates()
-        records_after_dedup = len(combined)
-        
-        print(f"   Records before dedup: {records_before_dedup:,}")
-        print(f"   Duplicates found: {duplicates_found:,}")
-        print(f"   Records after dedup: {records_after_dedup:,}")
-        print(f"   Dedup loss: {(duplicates_found/records_before_dedup)*100:.2f}%")
+        cache_key = self.cache_key(name, csv_files, scan)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"   Loaded {len(cached):,} records from cache")
+                return cached
+        
+        if scans is None:
+            # Typed parse, dates and state/district names cleaned per file
+            scans = scan_dataset_files({name: csv_files}, self.workers, **scan)[name]
+        
+        if scan['dedup']:
+            # Basic cleaning - drop duplicates within and across files in one hash pass
+            deduplicator = RowDeduplicator()
+            frames = [
+                deduplicator.drop_duplicates(df, file, fingerprints)
+                for file, (df, fingerprints) in zip(csv_files, scans)
+            ]
+            deduplicator.print_report()
+            
+            combined = combine_frames(frames)
+            records_before_dedup = sum(deduplicator.rows_by_source.values())
+            duplicates_found = deduplicator.total_duplicates
+            records_after_dedup = len(combined)
+            
+            print(f"   Records before dedup: {records_before_dedup:,}")
+            print(f"   Duplicates found: {duplicates_found:,}")
+            print(f"   Records after dedup: {records_after_dedup:,}")
+            if records_before_dedup:
+                print(f"   Dedup loss: {(duplicates_found/records_before_dedup)*100:.2f}%")
+        else:
+            combined = combine_frames([df for df, _ in scans])
         print(f"   Loaded {len(combined):,} records")
-        print(f"   Date range: {combined['date'].min()} to {combined['date'].max()}")
+        if 'date' in combined.columns:
+            print(f"   Date range: {combined['date'].min()} to {combined['date'].max()}")
+        
+        if cache_key is not None:
+            self.cache.put(cache_key, combined)
         
         return combined
     
-    def load_biometric_update_data(self):
-        """Load all biometric update CSV files and combine them"""
-        print("\n Loading Biometric Update Data...")
-        
-        csv_files = list(self.biometric_dir.glob('*.csv'))
-        print(f"   Found {len(csv_files)} CSV files")
-        
+    def load_packed(self, name, columns=None, states=None, start=None, end=None, dedup=True):
+        """
+        Load one dataset into the compact packed form (see packing.py):
+        day offsets, category codes and the narrowest count types.
+        
+        Each file is packed as soon as it is scanned (in the worker, with
+        `workers`) and deduplicated against the files before it in packed
+        form, so the dataset is never held unpacked; peak memory is the
+        packed dataset plus one unpacked file per process. With a cache the
+        packed form is what is stored.
+        
+        Prints the memory of every column before and after packing;
+        `.unpack()` on the result gives back what `load_dataset` returns.
+        
+        Returns:
+            PackedTable, or None when the dataset folder has no CSV files
+        """
+        scan = scan_options(name, columns, states, start, end, dedup)
+        csv_files = self.dataset_files(name)
         if not csv_files:
-            print("    No CSV files found in biometric_update folder!")
+            print(f"    No CSV files found in {DATASETS[name]['folder']} folder!")
             return None
         
-        dfs = []
-        for file in csv_files:
-            print(f"   Loading {file.name}...")
-            df = pd.read_csv(file)
-            dfs.append(df)
-        
-        combined = pd.concat(dfs, ignore_index=True)
-        records_before_dedup = len(combined)
-        
-        # Convert date column to datetime
-        combined['date'] = pd.to_datetime(combined['date'], errors='coerce')
-        
-        # Clean state names
-        if 'state' in combined.columns:
-            combined['state'] = combined['state'].apply(clean_state_name)
-        
-        # Remove bad data (numeric state values)
-        if 'state' in combined.columns:
-            combined = combined[~combined['state'].str.match(r'^\d+$', na=False)]
-        
-        # Basic cleaning - track duplicates
-        duplicates_found = combined.duplicated().sum()
-        combined = combined.drop_duplicates()
-        records_after_dedup = len(combined)
-        
-        print(f"   Records before dedup: {records_before_dedup:,}")
-        print(f"   Duplicates found: {duplicates_found:,}")
-        print(f"   Records after dedup: {records_after_dedup:,}")
-        print(f"   Dedup loss: {(duplicates_found/records_before_dedup)*100:.2f}%")
-        print(f"   Loaded {len(combined):,} records")
-        print(f"   Date range: {combined['date'].min()} to {combined['date'].max()}")
-        
-        return combined
+        cache_key = self.cache_key(name, csv_files, {**scan, 'packed': True})
+        packed = self.cache.get_packed(cache_key) if cache_key is not None else None
+        if packed is not None:
+            print(f"   Loaded {len(packed):,} packed records from cache")
+            return packed
+        
+        scans = pack_dataset_files({name: csv_files}, self.workers, **scan)[name]
+        if scan['dedup']:
+            deduplicator = RowDeduplicator()
+            scans = [
+                (PackedTable(deduplicator.drop_duplicates(table.frame, file, fingerprints),
+                             table.dtypes, table.packed_types), None)
+                for file, (table, fingerprints) in zip(csv_files, scans)
+            ]
+            deduplicator.print_report()
+        packed = concat_packed([table for table, _ in scans])
+        if cache_key is not None:
+            self.cache.put_packed(cache_key, packed)
+        
+        report = packing_report(None, packed)
+        print(f"\n   Packed memory ({DATASETS[name]['label']}):")
+        for col, row in report.iterrows():
+            print(f"   {col:16s} {row['dtype']:>16s} -> {row['packed']:10s} "
+                  f"{row['bytes_before'] / 1024**2:8.2f} MB -> {row['bytes_after'] / 1024**2:8.2f} MB "
+                  f"({row['ratio']:.1f}x)")
+        return packed
+    
+    def load_enrolment_data(self, **scan):
+        """Load all enrolment CSV files and combine them"""
+        return self.load_dataset('enrolment', **scan)
     
-    def load_all_data(self):
-        """Load all three datasets"""
+    def load_demographic_update_data(self, **scan):
+        """Load all demographic update CSV files and combine them"""
+        return self.load_dataset('demographic', **scan)
+    
+    def load_biometric_update_data(self, **scan):
+        """Load all biometric update CSV files and combine them"""
+        return self.load_dataset('biometric', **scan)
+    
+    def load_all_data(self, names=None, columns=None, states=None, start=None, end=None, dedup=True):
+        """
+        Load several datasets now (default: all registered).
+        
+        Takes the same scan options as `dataset`; use `datasets` instead to get
+        lazy handles that load on first access.
+        """
         print("=" * 60)
         print("UIDAI Data Loader - Loading All Datasets")
         print("=" * 60)
         
-        enrolment = self.load_enrolment_data()
-        demographic = self.load_demographic_update_data()
-        biometric = self.load_biometric_update_data()
+        names = list(names or DATASETS)
+        scan = {'columns': columns, 'states': states, 'start': start, 'end': end, 'dedup': dedup}
+        
+        # In parallel mode the files of all (uncached) datasets share one
+        # process pool, each dataset scanned with its own validated options
+        scans = {}
+        if self.workers != 1 and names:
+            file_lists, options = {}, {}
+            for name in names:
+                files = self.dataset_files(name)
+                options[name] = scan_options(name, **scan)
+                key = self.cache_key(name, files, options[name])
+                if key is None or key not in self.cache:
+                    file_lists[name] = files
+            if file_lists:
+                scans = scan_dataset_files(
+                    file_lists, self.workers,
+                    dataset_options={name: options[name] for name in file_lists},
+                )
+        
+        loaded = {name: self.load_dataset(name, **scan, scans=scans.get(name)) for name in names}
         
         print("\n" + "=" * 60)
         print("All Data Loaded Successfully!")
         print("=" * 60)
         
-        return {
-            'enrolment': enrolment,
-            'demographic': demographic,
-            'biometric': biometric
-        }
+        return loaded
+    
+    def profile_dataset(self, name, chunksize=DEFAULT_CHUNKSIZE, k=DEFAULT_K, exact_outliers=False):
+        """
+        Numeric profile of one dataset without loading it.
+        
+        Each file is streamed in `chunksize`-row chunks into a mergeable
+        profile (in parallel with `workers`) and the per-file profiles are
+        merged, so memory stays constant however large the raw drop is.
+        Quartiles, IQR bounds and outlier counts are KLL sketch estimates
+        (error bounds in the summary, see profiling.ColumnSketches); rows
+        are not deduplicated.
+        
+        Args:
+            name: registered dataset name (see DATASETS)
+            chunksize: rows per chunk
+            k: sketch size (larger is more accurate, see sketches.rank_error)
+            exact_outliers: read the files a second time to count the values
+                outside the sketched bounds exactly
+        
+        Returns:
+            profiling.NumericProfile, or None when the dataset folder has no CSV files
+        """
+        if name not in DATASETS:
+            raise ValueError(f"Unknown dataset '{name}' (expected one of {list(DATASETS)})")
+        csv_files = self.dataset_files(name)
+        if not csv_files:
+            return None
+        sketches = sketch_dataset_files({name: csv_files}, self.workers, chunksize=chunksize, k=k)[name]
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged.merge(sketch)
+        profile = merged.profile()
+        
+        if exact_outliers:
+            bounds = {
+                col: (stats['lower_bound'], stats['upper_bound'])
+                for col, stats in profile.summary.iterrows()
+            }
+            per_file = count_dataset_outliers({name: csv_files}, bounds, self.workers, chunksize=chunksize)[name]
+            profile = with_exact_outliers(profile, {
+                col: sum(counts[col] for counts in per_file) for col in bounds
+            })
+        return profile
     
     def get_summary_stats(self, datasets):
         """Generate quick summary statistics for all datasets"""
@@ -226,9 +399,15 @@ class DataLoader:
                 print(f"  Unique pincodes: {df['pincode'].nunique() if 'pincode' in df.columns else 'N/A'}")
 
 
-def quick_load():
-    """Quick function to load all data with one call"""
-    loader = DataLoader()
+def quick_load(cache_dir=None):
+    """Quick function to load all data with one call
+
+    Args:
+        cache_dir: folder for the cleaned-dataset cache; a warm cache makes a
+            repeat call read one Arrow file per dataset instead of the CSVs.
+            With None, UIDAI_CACHE_DIR is used if set, otherwise nothing is cached
+    """
+    loader = DataLoader(cache_dir=cache_dir)
     datasets = loader.load_all_data()
     loader.get_summary_stats(datasets)
     return datasets
@@ -0,0 +1,199 @@
+"""
+Cleaned Dataset Cache for UIDAI Hackathon
+Keeps DataLoader's parsed, cleaned and deduplicated datasets on disk, so a
+session that loads the same raw files again reads one Arrow file instead of
+re-ingesting every CSV
+
+An entry is one Arrow IPC (Feather) file named after a key hashed from:
+
+  - the dataset name and scan options (columns, states, date range)
+  - every raw file's path, size and modification time
+  - CACHE_VERSION and the source of the modules that define the cleaning
+    (schema, normalization, dedup, ingestion) and the packed form (packing)
+
+so adding, replacing or touching a raw file, or editing a cleaning rule,
+gives a new key and the stale entry is simply never read again. Reading an
+entry marks it used (its mtime); when the cache outgrows its size cap
+(DEFAULT_CACHE_BYTES, 2 GB, unless given) the least recently used entries
+are deleted.
+
+The cache is opt-in: DataLoader only uses one when given a `cache_dir` or
+when the UIDAI_CACHE_DIR environment variable names a folder, e.g.
+
+    UIDAI_CACHE_DIR=data/cache python automated_eda.py
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from packing import PackedTable
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.arrow'
+# Schema metadata key recording which categoricals have object categories
+OBJECT_CATEGORIES_KEY = b'object_categories'
+# Schema metadata key of a packed entry: original dtypes and packed types
+PACKED_KEY = b'packed'
+DEFAULT_CACHE_BYTES = 2 * 1024 ** 3
+# Environment variable naming the cache folder of loaders given no cache_dir
+CACHE_DIR_ENV = 'UIDAI_CACHE_DIR'
+
+# Modules whose code decides what a cleaned (or packed) dataset contains
+CLEANING_MODULES = ('schema.py', 'normalization.py', 'dedup.py', 'ingestion.py', 'packing.py')
+
+
+def cleaning_rules_digest():
+    """SHA-256 over the source of CLEANING_MODULES"""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode())
+    src_dir = Path(__file__).resolve().parent
+    for module in CLEANING_MODULES:
+        digest.update(module.encode())
+        digest.update((src_dir / module).read_bytes())
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Size-capped LRU cache of cleaned DataFrames in a directory.
+
+    Entries are written to a temporary file and renamed into place, so a
+    concurrent reader never sees a partial one.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._rules = cleaning_rules_digest()
+
+    def key(self, name, files, scan):
+        """Cache key of one dataset read"""
+        files_state = []
+        for file in files:
+            stat = Path(file).stat()
+            files_state.append([str(Path(file).resolve()), stat.st_size, stat.st_mtime_ns])
+        description = {
+            'rules': self._rules,
+            'dataset': name,
+            'scan': scan,
+            'files': files_state,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+    def path(self, key):
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def __contains__(self, key):
+        return self.path(key).exists()
+
+    def _read(self, key):
+        """(frame, schema metadata) of the entry for `key`, or (None, None)"""
+        from pyarrow import feather
+
+        path = self.path(key)
+        try:
+            table = feather.read_table(path)
+        except (FileNotFoundError, OSError):
+            return None, None
+        df = table.to_pandas()
+        # Arrow reads dictionary values back as strings; restore categories
+        # that were plain objects, so the frame is exactly the one stored
+        metadata = table.schema.metadata or {}
+        for col in json.loads(metadata.get(OBJECT_CATEGORIES_KEY, b'[]')):
+            categories = pd.Index(df[col].cat.categories.to_numpy(dtype=object), dtype=object)
+            df[col] = pd.Categorical.from_codes(df[col].cat.codes, categories=categories)
+        # Mark as recently used (unless another process just evicted it)
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return df, metadata
+
+    def _write(self, key, df, metadata=None):
+        import pyarrow as pa
+        from pyarrow import feather
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        object_categories = [
+            col for col in df.columns
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and df[col].cat.categories.dtype == object
+        ]
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            **(metadata or {}),
+            OBJECT_CATEGORIES_KEY: json.dumps(object_categories).encode(),
+        })
+        feather.write_feather(table, tmp_path, compression='lz4')
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+        return path
+
+    def get(self, key):
+        """The cached frame for `key`, or None"""
+        return self._read(key)[0]
+
+    def put(self, key, df):
+        """Store a frame, then evict least recently used entries over the cap"""
+        return self._write(key, df)
+
+    def get_packed(self, key):
+        """The cached PackedTable for `key`, or None"""
+        df, metadata = self._read(key)
+        if df is None or PACKED_KEY not in metadata:
+            return None
+        packed = json.loads(metadata[PACKED_KEY])
+        # Categoricals are stored as they were; their dtype is the frame's
+        dtypes = {
+            col: df[col].dtype if dtype is None else pd.api.types.pandas_dtype(dtype)
+            for col, dtype in packed['dtypes'].items()
+        }
+        return PackedTable(df, dtypes, packed['packed_types'])
+
+    def put_packed(self, key, packed):
+        """Store a PackedTable in its packed form"""
+        dtypes = {
+            col: None if isinstance(dtype, pd.CategoricalDtype) else str(dtype)
+            for col, dtype in packed.dtypes.items()
+        }
+        metadata = {PACKED_KEY: json.dumps({'dtypes': dtypes, 'packed_types': packed.packed_types}).encode()}
+        return self._write(key, packed.frame, metadata)
+
+    def entries(self):
+        """(path, size, last used) of every entry, least recently used first"""
+        entries = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        """Total bytes of all entries"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits max_bytes
+
+        The entry for `keep` (the one just written) is never evicted.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self.path(keep):
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Delete every entry"""
+        for path, _, _ in self.entries():
+            path.unlink(missing_ok=True)
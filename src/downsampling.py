@@ -0,0 +1,151 @@
+"""
+Time-Series Downsampling for UIDAI Hackathon
+Reduces line traces to a pixel budget before they reach plotly, so per-pincode
+or per-district daily series over years stay light in the browser
+
+Two selectors, both returning indices into the original series (the plotted
+points are real observations, never averages):
+
+  minmax  the lowest and highest point of each of max_points / 2 equal
+          buckets, plus both ends. Every spike survives at bucket resolution.
+  lttb    Largest-Triangle-Three-Buckets (Steinarsson 2013): one point per
+          bucket, the one forming the largest triangle with the previous pick
+          and the next bucket's mean. Keeps the visual shape of the line;
+          isolated spikes are kept, but of two spikes in one bucket only one.
+
+Missing values are dropped per trace before selecting, so each trace of a
+figure keeps its own points. resampling_widget re-runs the selection for the
+visible x range on every zoom, so zooming in brings back full resolution.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DOWNSAMPLING_METHODS = ('minmax', 'lttb')
+DEFAULT_MAX_POINTS = 2000
+
+
+def _as_float(x):
+    """x values as float64 offsets from the first one (datetimes in ns)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64) or np.issubdtype(x.dtype, np.timedelta64):
+        x = x.astype('datetime64[ns]').astype('int64')
+    x = x.astype('float64')
+    return x - x[0] if len(x) else x
+
+
+def minmax_indices(y, max_points):
+    """Indices of the min and max of each of max_points // 2 buckets, plus both ends"""
+    n = len(y)
+    buckets = max(1, max_points // 2)
+    if n <= max_points or n < 2:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype('int64')
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    picks = [0, n - 1]
+    for reduce in (np.minimum, np.maximum):
+        extreme = reduce.reduceat(y, edges[:-1])
+        hits = np.flatnonzero(y == extreme[bucket])
+        # First point of each bucket that reaches its extreme
+        _, first = np.unique(bucket[hits], return_index=True)
+        picks.append(hits[first])
+    return np.unique(np.concatenate([np.atleast_1d(p) for p in picks]))
+
+
+def lttb_indices(x, y, max_points):
+    """Largest-Triangle-Three-Buckets selection of max_points indices"""
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    # First and last points are always kept; the rest fill max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype('int64')
+    picks = np.empty(max_points, dtype='int64')
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        mean_x, mean_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs(
+            (x[previous] - mean_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (mean_y - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        picks[i + 1] = previous
+    return picks
+
+
+def downsample_indices(x, y, max_points=DEFAULT_MAX_POINTS, method='minmax'):
+    """
+    Indices of the points of one trace to plot.
+
+    Args:
+        x, y: the trace, sorted by x
+        max_points: pixel budget (a chart about 1000px wide needs ~2000)
+        method: 'minmax' or 'lttb'
+
+    Returns:
+        sorted int64 indices into x and y (missing y values are never picked)
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}' (expected one of {DOWNSAMPLING_METHODS})")
+    y = np.asarray(y, dtype='float64')
+    present = np.flatnonzero(~np.isnan(y))
+    if method == 'minmax':
+        picks = minmax_indices(y[present], max_points)
+    else:
+        picks = lttb_indices(np.asarray(x)[present], y[present], max_points)
+    return present[picks]
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method='minmax'):
+    """(x, y) of one trace reduced to about max_points points"""
+    x, y = np.asarray(x), np.asarray(y)
+    picks = downsample_indices(x, y, max_points, method)
+    return x[picks], y[picks]
+
+
+def visible_window(x, x_range):
+    """Slice of a sorted x array inside x_range (None = everything)"""
+    if x_range is None:
+        return slice(0, len(x))
+    x = np.asarray(x)
+    lo, hi = x_range
+    if np.issubdtype(x.dtype, np.datetime64):
+        # plotly reports date ranges as strings
+        lo, hi = (pd.Timestamp(bound).to_datetime64().astype(x.dtype) for bound in (lo, hi))
+    return slice(int(np.searchsorted(x, lo, side='left')), int(np.searchsorted(x, hi, side='right')))
+
+
+def resampling_widget(fig, series, max_points=DEFAULT_MAX_POINTS, method='minmax'):
+    """
+    Interactive copy of `fig` that re-downsamples the visible range on zoom.
+
+    Needs a notebook with plotly.graph_objects.FigureWidget support (anywidget).
+
+    Args:
+        fig: figure whose traces were downsampled from `series`
+        series: list of full-resolution (x, y) arrays, one per trace of `fig`
+
+    Returns:
+        FigureWidget; points within the zoomed x range are selected again
+        from the full data, so a narrow enough range shows every point
+    """
+    import plotly.graph_objects as go
+
+    widget = go.FigureWidget(fig)
+    series = [(np.asarray(x), np.asarray(y)) for x, y in series]
+
+    def on_zoom(layout, x_range):
+        with widget.batch_update():
+            for trace, (x, y) in zip(widget.data, series):
+                window = visible_window(x, None if x_range is None else list(x_range))
+                trace.x, trace.y = downsample(x[window], y[window], max_points, method)
+
+    widget.layout.xaxis.on_change(on_zoom, 'range')
+    return widget
@@ -0,0 +1,219 @@
+"""
+DuckDB Engine for UIDAI Hackathon
+Runs the preprocessing load, clean, dedup and aggregate steps out of core on
+DuckDB's multithreaded engine, for `preprocess.py --engine duckdb`
+
+The pandas pipeline in preprocess.py is the reference: every step here has
+the same semantics, and the base aggregates come back with the dtypes pandas
+produces, so the summary, cube and prefix-sum tables built from them (by the
+same pandas code) are byte-identical. `benchmarks/engine_parity.py` checks it.
+The datetime unit and category value type are taken from the pandas reader
+run on the first rows of each dataset, so they follow the installed pandas.
+
+  parse      read_csv with the raw schema (src/schema.py) and pandas' NA strings
+  clean      state/district cleaned once per distinct value with the Python
+             cleaners (src/normalization.py), joined back as a lookup table
+  dedup      GROUP BY all cleaned columns (= drop_duplicates on the rows)
+  aggregate  GROUP BY keys with sums and a row count (= PartialAggregate)
+
+Requires the optional `duckdb` package (pip install duckdb); it is not in
+the deployment requirements.txt because the dashboard never needs it.
+"""
+
+import pandas as pd
+
+from normalization import (
+    INVALID_LOCATION_PATTERN, clean_district_name, clean_state_name, normalize_locations,
+)
+from schema import (
+    DATE_FORMAT, LOCATION_COLUMNS, NA_STRINGS, RAW_SCHEMAS, read_raw_csv, resolve_schema,
+)
+
+
+ENGINES = ('pandas', 'duckdb')
+
+SQL_TYPES = {'category': 'VARCHAR', 'UInt32': 'UINTEGER'}
+
+LOCATION_CLEANERS = {'state': clean_state_name, 'district': clean_district_name}
+
+# Rows of a dataset's first file read with pandas for the reference dtypes
+REFERENCE_ROWS = 1000
+
+# Derived columns as preprocess.prepare_chunk adds them: the sum of these
+# NA-filled counts
+DERIVED_COLUMNS = {
+    'enrolment': {'total_enroll': ['age_0_5', 'age_5_17', 'age_18_greater']},
+    'biometric': {'bio_child': ['bio_age_5_17']},
+}
+
+# Datasets whose counts are NA-filled before aggregating (the others skip NAs
+# in the sums, which gives the same totals)
+FILLED_DATASETS = ('enrolment', 'biometric')
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBEngine:
+    """
+    Loads raw datasets into a DuckDB connection and aggregates them.
+
+    Each dataset is parsed, cleaned and deduplicated once by `load`, into a
+    table of distinct rows that DuckDB spills to disk past `memory_limit`;
+    `aggregate` then groups that table for any set of keys and measures.
+    """
+
+    def __init__(self, memory_limit=None, threads=None, temp_dir=None):
+        import duckdb
+
+        self.con = duckdb.connect()
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = {_literal(memory_limit)}")
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        if temp_dir:
+            self.con.execute(f"SET temp_directory = {_literal(temp_dir)}")
+        # Row order of the pandas pipeline is irrelevant to the aggregates
+        self.con.execute("SET preserve_insertion_order = false")
+        self.nullable = {}
+        self.reference = {}
+
+    def load(self, name, files):
+        """
+        Parse, clean and deduplicate the raw files of one dataset.
+
+        Raises ValueError if a file's header does not match the dataset's
+        schema, as the pandas reader does.
+
+        Returns:
+            dict with 'rows_read' (after dropping invalid locations, as the
+            pandas pipeline counts them) and 'rows_kept' (distinct rows)
+        """
+        for file in files:
+            resolve_schema(file, name)
+        dtypes = RAW_SCHEMAS[name]
+        # The pandas reader on a few rows gives the reference dtypes of the
+        # cleaned date and location columns
+        sample = next(read_raw_csv(files[0], name, chunksize=REFERENCE_ROWS))
+        self.reference[name] = normalize_locations(sample).dtypes
+        numeric = [col for col, dtype in dtypes.items() if dtype == 'UInt32']
+        counts = [col for col in numeric if col not in LOCATION_COLUMNS]
+        raw = (
+            "read_csv(["
+            + ", ".join(_literal(file) for file in files)
+            + "], header = true, auto_detect = false, delim = ',', quote = '\"', columns = {"
+            + ", ".join(f"{_literal(col)}: {_literal(SQL_TYPES[dtype])}" for col, dtype in dtypes.items())
+            + "}, nullstr = [" + ", ".join(map(_literal, NA_STRINGS)) + "])"
+        )
+
+        # One scan for the distinct names and for which columns have blanks
+        # (pandas keeps a count column nullable, UInt32, if any file has one)
+        row = self.con.execute(
+            "SELECT list(DISTINCT state), list(DISTINCT district), "
+            + ", ".join(f"bool_or({_quote(col)} IS NULL)" for col in numeric)
+            + f" FROM {raw}"
+        ).fetchone()
+        self.nullable[name] = {col: bool(flag) for col, flag in zip(numeric, row[2:])}
+
+        for col, values in zip(LOCATION_CLEANERS, row[:2]):
+            self.con.register(f"{name}_{col}_map", self._location_map(values, LOCATION_CLEANERS[col]))
+
+        if name in FILLED_DATASETS:
+            values = [f"coalesce(r.{_quote(col)}, 0) AS {_quote(col)}" for col in counts]
+        else:
+            values = [f"r.{_quote(col)}" for col in counts]
+
+        self.con.execute(f"""
+            CREATE OR REPLACE TABLE {_quote(name)} AS
+            SELECT
+                try_strptime(r.date, {_literal(DATE_FORMAT)}) AS date,
+                s.clean AS state,
+                d.clean AS district,
+                r.pincode,
+                {", ".join(values)},
+                count(*) AS copies
+            FROM {raw} AS r
+            LEFT JOIN {name}_state_map AS s ON r.state = s.raw
+            LEFT JOIN {name}_district_map AS d ON r.district = d.raw
+            WHERE coalesce(s.valid, true) AND coalesce(d.valid, true)
+            GROUP BY ALL
+        """)
+        rows_read, rows_kept = self.con.execute(
+            f"SELECT coalesce(sum(copies), 0), count(*) FROM {_quote(name)}"
+        ).fetchone()
+        return {'rows_read': int(rows_read), 'rows_kept': int(rows_kept)}
+
+    @staticmethod
+    def _location_map(values, cleaner):
+        """Raw -> cleaned name lookup with the normalize_column validity rule"""
+        raw = pd.Series([value for value in values if value is not None], dtype=object)
+        cleaned = raw.map(cleaner)
+        return pd.DataFrame({
+            'raw': raw,
+            'clean': cleaned,
+            'valid': ~cleaned.astype(str).str.match(INVALID_LOCATION_PATTERN),
+        })
+
+    def aggregate(self, name, keys, value_cols):
+        """
+        Base aggregate of a loaded dataset, as aggregation.aggregate_frame
+        returns it for the pandas frame: one row per key combination (missing
+        keys kept, sorted with missing last), value sums and a 'rows' count.
+        """
+        keys, value_cols = list(keys), list(value_cols)
+        derived = DERIVED_COLUMNS.get(name, {})
+        columns = [_quote(key) for key in keys]
+        for col in value_cols:
+            expression = " + ".join(map(_quote, derived.get(col, [col])))
+            columns.append(f"coalesce(sum({expression}), 0)::UBIGINT AS {_quote(col)}")
+        columns.append("count(*) AS rows")
+        group = ", ".join(map(_quote, keys))
+        result = self.con.execute(
+            f"SELECT {', '.join(columns)} FROM {_quote(name)} "
+            f"GROUP BY {group} ORDER BY {', '.join(f'{_quote(key)} NULLS LAST' for key in keys)}"
+        ).df()
+        # Sorted categories of the reference's value type, as normalize_column
+        # and union_categoricals build them
+        reference = self.reference[name]
+        for col in LOCATION_CLEANERS:
+            if col in result.columns:
+                values = result[col].to_numpy(dtype=object)
+                category_dtype = reference[col].categories.dtype
+                categories = pd.Index(result[col].dropna().unique(), dtype=category_dtype).sort_values()
+                result[col] = pd.Categorical(values, categories=categories)
+        return result.astype(self._dtypes(name, keys + value_cols))
+
+    def _dtypes(self, name, columns):
+        """pandas dtypes of the aggregate columns in the reference pipeline"""
+        nullable = self.nullable[name]
+        reference = self.reference[name]
+        derived = DERIVED_COLUMNS.get(name, {})
+
+        def count_dtype(col):
+            return 'UInt32' if nullable.get(col) else 'uint32'
+
+        dtypes = {'rows': 'int64'}
+        for col in columns:
+            if col in LOCATION_CLEANERS:
+                continue
+            if col == 'date':
+                dtypes[col] = reference['date']
+            elif col in derived:
+                # A row sum of uint32 columns widens to uint64, but stays
+                # UInt32 once any of them is nullable
+                inputs = derived[col]
+                if len(inputs) == 1:
+                    dtypes[col] = count_dtype(inputs[0])
+                else:
+                    dtypes[col] = 'UInt32' if any(nullable.get(c) for c in inputs) else 'uint64'
+            else:
+                dtypes[col] = count_dtype(col)
+        return dtypes
+
+    def close(self):
+        self.con.close()
@@ -9,14 +9,46 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from profiling import numeric_profile
+from coverage import reporting_coverage
+
 
 class EDAAnalyzer:
     """Automated EDA tools for quick insights"""
     
-    def __init__(self, df, dataset_name="Dataset"):
+    def __init__(self, df, dataset_name="Dataset", profile=None):
+        """
+        Args:
+            df: frame to analyze; may be None when `profile` is given, in
+                which case only numeric_summary and detect_outliers apply
+            dataset_name: name used in the report headers
+            profile: precomputed profiling.NumericProfile, e.g. a sketched
+                one from DataLoader.profile_dataset for data too large to load
+        """
         self.df = df
         self.name = dataset_name
         self.insights = []
+        self._profile = profile
+    
+    @property
+    def profile(self):
+        """Numeric profile of the frame (see profiling.py), computed on first use
+
+        Null/zero counts, describe() statistics, IQR outliers and correlations
+        all come from this one pass; call refresh_profile() after changing
+        numeric columns of the frame.
+        """
+        if self._profile is None:
+            self._profile = numeric_profile(self.df)
+        return self._profile
+    
+    @property
+    def rows(self):
+        return self.profile.rows if self.df is None else len(self.df)
+    
+    def refresh_profile(self):
+        """Drop the cached numeric profile"""
+        self._profile = None
         
     def basic_info(self):
         """Print basic dataset information"""
@@ -34,7 +66,12 @@ class EDAAnalyzer:
         print(f" MISSING DATA ANALYSIS - {self.name}")
         print(f"{'='*60}")
         
-        missing = self.df.isnull().sum()
+        # Numeric null counts come from the profile; only the other columns are scanned
+        nulls = self.profile.summary['nulls']
+        missing = pd.Series({
+            col: int(nulls[col]) if col in nulls.index else int(self.df[col].isnull().sum())
+            for col in self.df.columns
+        }, dtype='int64')
         missing_pct = (missing / len(self.df)) * 100
         
         missing_df = pd.DataFrame({
@@ -59,18 +96,18 @@ class EDAAnalyzer:
         print(f" NUMERIC SUMMARY - {self.name}")
         print(f"{'='*60}")
         
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        summary = self.profile.summary
         
-        if len(numeric_cols) == 0:
+        if len(summary) == 0:
             print("No numeric columns found.")
             return
         
-        print(self.df[numeric_cols].describe())
+        print(self.profile.describe())
         
         # Check for zeros
-        for col in numeric_cols:
-            zero_count = (self.df[col] == 0).sum()
-            zero_pct = (zero_count / len(self.df)) * 100
+        for col in summary.index:
+            zero_count = summary.at[col, 'zeros']
+            zero_pct = (zero_count / self.rows) * 100
             if zero_pct > 50:
                 print(f"\n {col}: {zero_pct:.1f}% zeros!")
                 self.insights.append(f"{col} has {zero_pct:.1f}% zeros")
@@ -99,21 +136,29 @@ class EDAAnalyzer:
         print(f" TEMPORAL ANALYSIS - {self.name}")
         print(f"{'='*60}")
         
-        self.df[date_col] = pd.to_datetime(self.df[date_col], errors='coerce')
+        # Day offsets are computed on a parsed copy; self.df is left as is
+        overall = reporting_coverage(self.df, date_col=date_col)
+        if len(overall) == 0:
+            print("No valid dates found.")
+            return
+        overall = overall.iloc[0]
         
-        print(f"Date range: {self.df[date_col].min()} to {self.df[date_col].max()}")
-        print(f"Total days: {(self.df[date_col].max() - self.df[date_col].min()).days}")
+        print(f"Date range: {overall['first_date']} to {overall['last_date']}")
+        print(f"Total days: {overall['span_days'] - 1}")
         
         # Check for gaps
-        date_counts = self.df[date_col].value_counts().sort_index()
-        date_range = pd.date_range(start=self.df[date_col].min(), 
-                                   end=self.df[date_col].max(), 
-                                   freq='D')
-        missing_dates = set(date_range) - set(date_counts.index)
-        
-        if missing_dates:
-            print(f"\n Missing dates: {len(missing_dates)} days")
-            self.insights.append(f"Missing {len(missing_dates)} dates in time series")
+        if overall['missing_days']:
+            print(f"\n Missing dates: {overall['missing_days']} days")
+            self.insights.append(f"Missing {overall['missing_days']} dates in time series")
+        
+        # Per state: which went silent for a stretch, and for how long
+        if 'state' in self.df.columns:
+            states = reporting_coverage(self.df, ['state'], date_col=date_col)
+            silent = states[states['missing_days'] > 0]
+            if len(silent):
+                worst = silent.loc[silent['longest_gap_days'].idxmax()]
+                print(f" States with reporting gaps: {len(silent)} of {len(states)} "
+                      f"(longest: {worst['longest_gap_days']} days, {worst['state']})")
     
     def detect_outliers(self, numeric_cols=None):
         """Detect outliers using IQR method"""
@@ -121,24 +166,27 @@ class EDAAnalyzer:
         print(f" OUTLIER DETECTION - {self.name}")
         print(f"{'='*60}")
         
-        if numeric_cols is None:
-            numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        profile = self.profile
+        if numeric_cols is not None and not set(numeric_cols) <= set(profile.columns):
+            profile = numeric_profile(self.df, numeric_cols)
+        summary = profile.summary.loc[list(profile.columns if numeric_cols is None else numeric_cols)]
         
-        for col in numeric_cols:
-            Q1 = self.df[col].quantile(0.25)
-            Q3 = self.df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = self.df[(self.df[col] < lower_bound) | (self.df[col] > upper_bound)]
-            outlier_pct = (len(outliers) / len(self.df)) * 100
+        for col, stats in summary.iterrows():
+            outlier_count = int(stats['outliers'])
+            outlier_pct = (outlier_count / self.rows) * 100
             
             if outlier_pct > 0:
-                print(f"{col}: {len(outliers):,} outliers ({outlier_pct:.2f}%)")
-                print(f"  Range: [{self.df[col].min()}, {self.df[col].max()}]")
-                print(f"  Outlier bounds: < {lower_bound:.2f} or > {upper_bound:.2f}")
+                if profile.sketched and stats['outliers_error'] > 0:
+                    # Sketch estimates: quartile ranks within rank_error,
+                    # count within outliers_error rows (99% confidence)
+                    print(f"{col}: ~{outlier_count:,} outliers ({outlier_pct:.2f}%, "
+                          f"±{int(stats['outliers_error']):,} rows)")
+                else:
+                    print(f"{col}: {outlier_count:,} outliers ({outlier_pct:.2f}%)")
+                print(f"  Range: [{stats['min']:.15g}, {stats['max']:.15g}]")
+                print(f"  Outlier bounds: < {stats['lower_bound']:.2f} or > {stats['upper_bound']:.2f}")
+                if profile.sketched:
+                    print(f"  Bounds from sketched quartiles (rank error ±{stats['rank_error']:.2%})")
     
     def geographic_coverage(self):
         """Analyze geographic coverage"""
@@ -157,10 +205,15 @@ class EDAAnalyzer:
         if 'pincode' in self.df.columns:
             print(f"Pincodes: {self.df['pincode'].nunique()}")
             
-            # Check for invalid pincodes
-            invalid_pins = self.df[self.df['pincode'].astype(str).str.len() != 6]
-            if len(invalid_pins) > 0:
-                print(f"\n Invalid pincodes: {len(invalid_pins):,} records")
+            # Check for invalid pincodes (not 6 digits); integer codes are
+            # range-checked instead of formatting every row as a string
+            pincode = self.df['pincode']
+            if pd.api.types.is_integer_dtype(pincode):
+                invalid_pins = len(pincode) - int(pincode.between(100000, 999999).sum())
+            else:
+                invalid_pins = int((pincode.astype(str).str.len() != 6).sum())
+            if invalid_pins > 0:
+                print(f"\n Invalid pincodes: {invalid_pins:,} records")
     
     def age_distribution_analysis(self):
         """Analyze age group distributions"""
@@ -173,9 +226,14 @@ class EDAAnalyzer:
         print(f" AGE DISTRIBUTION - {self.name}")
         print(f"{'='*60}")
         
-        for col in age_cols:
-            total = self.df[col].sum()
-            print(f"{col}: {total:,} ({(total / self.df[age_cols].sum().sum() * 100):.1f}% of total)")
+        summary = self.profile.summary
+        totals = {
+            col: summary.at[col, 'sum'] if col in summary.index else self.df[col].sum()
+            for col in age_cols
+        }
+        grand_total = sum(totals.values())
+        for col, total in totals.items():
+            print(f"{col}: {total:,.0f} ({(total / grand_total * 100):.1f}% of total)")
     
     def correlation_analysis(self):
         """Analyze correlations between numeric columns"""
@@ -183,14 +241,12 @@ class EDAAnalyzer:
         print(f" CORRELATION ANALYSIS - {self.name}")
         print(f"{'='*60}")
         
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        corr_matrix = self.profile.corr
         
-        if len(numeric_cols) < 2:
+        if len(corr_matrix.columns) < 2:
             print("Not enough numeric columns for correlation.")
             return
         
-        corr_matrix = self.df[numeric_cols].corr()
-        
         # Find high correlations (excluding self-correlation)
         high_corr = []
         for i in range(len(corr_matrix.columns)):
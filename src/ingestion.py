@@ -0,0 +1,228 @@
+"""
+Raw File Ingestion Utilities for UIDAI Hackathon
+Parses and cleans api_data_aadhar_*.csv files, optionally in a process pool
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from normalization import normalize_locations
+from schema import read_raw_blocks, read_raw_csv
+from dedup import row_fingerprints
+from packing import concat_packed, pack_frame
+from profiling import count_raw_file_outliers, sketch_raw_file
+
+
+# Columns every scan parses: cleaning drops rows by their state/district
+CLEANED_COLUMNS = ('state', 'district')
+
+
+def list_raw_files(folder_path):
+    """Return the CSV files of a dataset folder in a stable (sorted) order"""
+    return sorted(folder_path.glob('*.csv'))
+
+
+def resolve_workers(workers):
+    """Translate a worker setting into a process count (0 or None = all cores)"""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def read_raw_file(file, dataset=None):
+    """Parse one raw CSV with its declared schema and clean state/district names
+
+    Raises ValueError if the header does not match the dataset's schema.
+    """
+    return normalize_locations(read_raw_csv(file, dataset))
+
+
+def scan_raw_blocks(file, dataset=None, columns=None, states=None, start=None, end=None, dedup=True):
+    """
+    Read one raw file block by block (schema.read_raw_blocks) with filters
+    and projection applied to each block.
+
+    Each block is filtered to [`start`, `end`] (before its names are
+    cleaned) and to `states`, fingerprinted and narrowed to `columns`
+    before the next one is read, so the whole file is never held at full
+    width. Deduplication needs whole rows: with `dedup` every column is
+    parsed for the fingerprints; without it only `columns`, the filter
+    columns and the cleaned state/district are parsed (usecols) and no
+    fingerprints are taken.
+
+    Yields:
+        (block, fingerprints) - fingerprints are None without `dedup`
+    """
+    usecols = None
+    if not dedup and columns is not None:
+        usecols = {*columns, *CLEANED_COLUMNS}
+        if start is not None or end is not None:
+            usecols.add('date')
+
+    for chunk in read_raw_blocks(file, dataset, usecols=usecols):
+        if start is not None:
+            chunk = chunk[chunk['date'] >= pd.Timestamp(start)]
+        if end is not None:
+            chunk = chunk[chunk['date'] <= pd.Timestamp(end)]
+        chunk = normalize_locations(chunk)
+        if states is not None:
+            chunk = chunk[chunk['state'].isin(states)]
+        fingerprints = row_fingerprints(chunk) if dedup else None
+        if columns is not None:
+            chunk = chunk[list(columns)]
+        yield chunk, fingerprints
+
+
+def scan_raw_file(file, dataset=None, columns=None, states=None, start=None, end=None, dedup=True):
+    """
+    Read one raw file with filters and projection applied inside the scan.
+
+    Without filters or projection the file is parsed whole; otherwise block
+    by block with `scan_raw_blocks`.
+
+    Returns:
+        (frame, fingerprints) - fingerprints (None without `dedup`) feed
+        RowDeduplicator.drop_duplicates
+    """
+    if columns is None and states is None and start is None and end is None:
+        df = read_raw_file(file, dataset)
+        return df, row_fingerprints(df) if dedup else None
+
+    blocks = list(scan_raw_blocks(file, dataset, columns, states, start, end, dedup))
+    df = combine_frames([block for block, _ in blocks])
+    return df, np.concatenate([fingerprints for _, fingerprints in blocks]) if dedup else None
+
+
+def pack_raw_file(file, dataset=None, **scan_options):
+    """
+    Scan one raw file into the packed form, packing each block as it is
+    read (see `scan_raw_blocks`), so neither the file nor the dataset is
+    ever held unpacked and a worker sends back packed data.
+
+    Returns:
+        (PackedTable, fingerprints)
+    """
+    packs, fingerprints = [], []
+    for block, block_fingerprints in scan_raw_blocks(file, dataset, **scan_options):
+        packs.append(pack_frame(block))
+        fingerprints.append(block_fingerprints)
+    dedup = scan_options.get('dedup', True)
+    return concat_packed(packs), np.concatenate(fingerprints) if dedup else None
+
+
+def read_raw_files(files, workers=1, dataset=None):
+    """Read a list of files, returning cleaned frames in the same order as `files`"""
+    return _read_files({dataset: files}, workers)[dataset]
+
+
+def read_dataset_files(file_lists, workers=1):
+    """
+    Read the files of several datasets at once.
+
+    Every file of every dataset is submitted to one process pool, so the three
+    datasets load concurrently and the wall time is bounded by the largest file
+    rather than the sum. Results are gathered per dataset in the order the
+    files were given, which keeps the combined output deterministic.
+
+    Args:
+        file_lists: dict of dataset name (a key of schema.RAW_SCHEMAS) -> list of CSV paths
+        workers: number of processes (1 = read serially in this process)
+
+    Returns:
+        dict of dataset name -> list of cleaned DataFrames
+    """
+    return _read_files(file_lists, workers)
+
+
+def scan_dataset_files(file_lists, workers=1, dataset_options=None, **scan_options):
+    """Like `read_dataset_files`, but each file goes through `scan_raw_file`
+
+    Args:
+        dataset_options: dict of dataset name -> scan options for that
+            dataset's files, on top of `scan_options` shared by all
+
+    Returns:
+        dict of dataset name -> list of (frame, fingerprints)
+    """
+    return _read_files(file_lists, workers, reader=scan_raw_file,
+                       dataset_options=dataset_options, **scan_options)
+
+
+def pack_dataset_files(file_lists, workers=1, dataset_options=None, **scan_options):
+    """Like `scan_dataset_files`, but each file is packed as soon as it is
+    scanned, so at most one file per process is ever held unpacked
+
+    Returns:
+        dict of dataset name -> list of (PackedTable, fingerprints)
+    """
+    return _read_files(file_lists, workers, reader=pack_raw_file,
+                       dataset_options=dataset_options, **scan_options)
+
+
+def sketch_dataset_files(file_lists, workers=1, **sketch_options):
+    """Like `read_dataset_files`, but each file is streamed into a mergeable
+    profile by `profiling.sketch_raw_file`, so no file is ever held in memory
+
+    Returns:
+        dict of dataset name -> list of ColumnSketches
+    """
+    return _read_files(file_lists, workers, reader=sketch_raw_file, **sketch_options)
+
+
+def count_dataset_outliers(file_lists, bounds, workers=1, **options):
+    """Exact outlier counts per file for given bounds (see `profiling.count_raw_file_outliers`)
+
+    Returns:
+        dict of dataset name -> list of {column: count}
+    """
+    return _read_files(file_lists, workers, reader=count_raw_file_outliers, bounds=bounds, **options)
+
+
+def _read_files(file_lists, workers, reader=read_raw_file, dataset_options=None, **options):
+    workers = resolve_workers(workers)
+    total_files = sum(len(files) for files in file_lists.values())
+    options = {
+        name: {**options, **(dataset_options or {}).get(name, {})}
+        for name in file_lists
+    }
+
+    if workers == 1 or total_files <= 1:
+        return {
+            name: [reader(f, name, **options[name]) for f in files]
+            for name, files in file_lists.items()
+        }
+
+    # Largest files first so a big file never starts last and stretches the tail
+    jobs = [(name, i, f) for name, files in file_lists.items() for i, f in enumerate(files)]
+    jobs.sort(key=lambda job: job[2].stat().st_size, reverse=True)
+
+    results = {name: [None] * len(files) for name, files in file_lists.items()}
+    with ProcessPoolExecutor(max_workers=min(workers, total_files)) as pool:
+        futures = [(name, i, pool.submit(reader, f, name, **options[name])) for name, i, f in jobs]
+        for name, i, future in futures:
+            results[name][i] = future.result()
+
+    return results
+
+
+def combine_frames(frames):
+    """Concatenate per-file frames, merging categorical columns onto one category set"""
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    categorical_cols = [
+        col for col in frames[0].columns
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype)
+    ]
+    combined = pd.concat(frames, ignore_index=True)
+
+    for col in categorical_cols:
+        if all(col in df.columns for df in frames):
+            merged = union_categoricals([df[col] for df in frames], sort_categories=True)
+            combined[col] = pd.Categorical(merged)
+
+    return combined
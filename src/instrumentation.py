@@ -0,0 +1,173 @@
+"""
+Stage Instrumentation for UIDAI Hackathon
+Records wall time, throughput, bytes read and peak memory of pipeline stages,
+for metadata.json and a trace viewable in chrome://tracing or Perfetto
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Seconds between RSS samples taken while a stage runs
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size so far, in MB (None where the platform has no getrusage).
+
+    Args:
+        children: report the largest finished child process (e.g. a parse
+            worker) instead of this process
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(peak * scale / 1024**2, 1)
+
+
+def current_rss_mb():
+    """Resident set size right now, in MB (None where /proc/self/statm is missing)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / 1024**2, 1)
+
+
+class RssSampler:
+    """
+    Highest RSS of this process between start() and stop().
+
+    A daemon thread samples current_rss_mb() every `interval` seconds. A
+    spike shorter than the interval, or inside a call that holds the GIL
+    throughout, can fall between samples, so the result is a lower bound
+    of the true peak. `peak` stays None where current RSS is not available.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._sample()
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling; returns the peak in MB (None if unavailable)"""
+        if self._thread is not None:
+            self._done.set()
+            self._thread.join()
+            self._thread = None
+        self._sample()
+        return self.peak
+
+
+class StageTracer:
+    """
+    Collects one record per timed stage.
+
+    Each record has the stage name, start offset and wall time in seconds,
+    rows and bytes read when known (with rows/s and MB/s), and the peak RSS
+    while the stage ran ('peak_rss_mb', sampled by RssSampler). Where the
+    current RSS cannot be read (no /proc), the record holds the process's
+    peak RSS since it started instead ('process_peak_rss_mb', which only
+    grows, so the stage where it jumps is the one that allocated).
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows=None, bytes_read=None, **info):
+        """
+        Time the enclosed block as stage `name`.
+
+        The yielded record can be updated inside the block, e.g.
+        record['rows'] = len(df) once the row count is known.
+        """
+        record = {'stage': name, 'rows': rows, 'bytes_read': bytes_read, **info}
+        sampler = RssSampler().start()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            stage_peak = sampler.stop()
+            record['start_s'] = round(start - self._origin, 4)
+            record['seconds'] = round(seconds, 4)
+            if record['rows'] is not None and seconds > 0:
+                record['rows_per_sec'] = round(record['rows'] / seconds)
+            if record['bytes_read'] and seconds > 0:
+                record['mb_per_sec'] = round(record['bytes_read'] / 1024**2 / seconds, 1)
+            if stage_peak is not None:
+                record['peak_rss_mb'] = stage_peak
+            else:
+                record['process_peak_rss_mb'] = peak_rss_mb()
+            self.stages.append({key: value for key, value in record.items() if value is not None})
+
+    def summary(self):
+        """Totals and all stage records, for metadata.json
+
+        The top-level peaks are for the whole process (and its finished
+        children) since it started.
+        """
+        return {
+            'total_seconds': round(time.perf_counter() - self._origin, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_children_mb': peak_rss_mb(children=True),
+            'stages': self.stages,
+        }
+
+    def write_trace(self, path):
+        """Write the stages in Chrome trace-event format (one complete event per stage)"""
+        pid = os.getpid()
+        events = [
+            {
+                'name': record['stage'],
+                'cat': record['stage'].split(':')[0],
+                'ph': 'X',
+                'ts': round(record['start_s'] * 1e6),
+                'dur': round(record['seconds'] * 1e6),
+                'pid': pid,
+                'tid': 0,
+                'args': {k: v for k, v in record.items() if k not in ('stage', 'start_s', 'seconds')},
+            }
+            for record in self.stages
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def print_report(self, top=10):
+        """Print the slowest stages"""
+        print(f"\n   ⏱️  Slowest stages (of {len(self.stages)}):")
+        for record in sorted(self.stages, key=lambda r: r['seconds'], reverse=True)[:top]:
+            rate = f"{record['rows_per_sec']:>12,} rows/s" if 'rows_per_sec' in record else ' ' * 19
+            peak = record.get('peak_rss_mb', record.get('process_peak_rss_mb', 0))
+            print(f"   {record['stage'][:44]:44s} {record['seconds']:8.3f}s {rate}  "
+                  f"peak {peak:,.0f} MB")
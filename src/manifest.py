@@ -0,0 +1,78 @@
+"""
+Raw File Manifest for UIDAI Hackathon
+Tracks which raw CSVs have been processed (size, mtime, content hash)
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_signature(path, previous=None):
+    """
+    Size, mtime and content hash of a raw file.
+
+    The hash is only recomputed when size or mtime differ from `previous`,
+    so an unchanged multi-GB drop costs one stat() call.
+    """
+    stat = Path(path).stat()
+    signature = {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime:
+        signature['sha256'] = previous['sha256']
+    else:
+        signature['sha256'] = content_hash(path)
+    return signature
+
+
+def load_manifest(path):
+    """Load the manifest, or an empty one if missing or from another version"""
+    path = Path(path)
+    if path.exists():
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    return {'version': MANIFEST_VERSION, 'datasets': {}}
+
+
+def save_manifest(path, manifest):
+    """Write the manifest as JSON"""
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def plan_dataset(files, entries):
+    """
+    Compare the raw files of one dataset against its manifest entries.
+
+    Args:
+        files: current raw files (sorted)
+        entries: dict of file name -> recorded entry (with 'size', 'mtime', 'sha256')
+
+    Returns:
+        (new_files, rebuild, signatures) - files not yet processed, whether a
+        previously processed file changed or disappeared (which invalidates
+        cross-file deduplication, so the dataset must be rebuilt), and the
+        current signature of every file.
+    """
+    signatures = {f.name: file_signature(f, entries.get(f.name)) for f in files}
+
+    rebuild = any(
+        name not in signatures or signatures[name]['sha256'] != entry['sha256']
+        for name, entry in entries.items()
+    )
+    new_files = [f for f in files if rebuild or f.name not in entries]
+    return new_files, rebuild, signatures
@@ -0,0 +1,119 @@
+"""
+Location Normalization Utilities for UIDAI Hackathon
+Cleans state/district columns once per distinct value instead of once per row
+"""
+
+import pandas as pd
+import numpy as np
+
+
+STATE_REPLACEMENTS = {
+    'Orissa': 'Odisha',
+    'Pondicherry': 'Puducherry',
+    'West  Bengal': 'West Bengal',
+    'West Bangal': 'West Bengal',
+    'Westbengal': 'West Bengal',
+    'West Bengal': 'West Bengal',
+    'Andaman And Nicobar Islands': 'Andaman And Nicobar Islands',
+    'Andaman & Nicobar Islands': 'Andaman And Nicobar Islands',
+    # Merge Dadra And Nagar Haveli (old UT) with new merged UT
+    'Dadra And Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Dadra & Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Dadra & Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Daman & Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Jammu And Kashmir': 'Jammu And Kashmir',
+    'Jammu & Kashmir': 'Jammu And Kashmir',
+}
+
+# Values matching this pattern are bad data (e.g. a pincode in the state column)
+INVALID_LOCATION_PATTERN = r'^\d+$'
+
+
+def clean_state_name(state):
+    """Standardize state/UT names to handle variations in formatting"""
+    if pd.isna(state):
+        return state
+    state = str(state).strip()
+    # First, convert to lowercase and then title case for consistency
+    state = state.lower().title()
+    # Fix multiple spaces
+    state = ' '.join(state.split())
+    # Replace ampersand with "And"
+    state = state.replace('&', 'And').replace(' & ', ' And ')
+    return STATE_REPLACEMENTS.get(state, state)
+
+
+def clean_district_name(district):
+    """Standardize district names (trim and collapse whitespace, incl. non-breaking spaces)"""
+    if pd.isna(district):
+        return district
+    return ' '.join(str(district).split())
+
+
+def normalize_column(series, cleaner):
+    """
+    Clean a string column by visiting each distinct value once.
+
+    The column is factorized, `cleaner` runs over the unique values only and
+    the results are mapped back through the integer codes.
+
+    Returns:
+        (categorical, valid) - a Categorical with sorted categories and a
+        boolean row mask that is False where the cleaned value is invalid.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    cleaned = pd.Index([cleaner(value) for value in uniques], dtype=object)
+
+    # Collapse spellings that clean to the same name onto one sorted category.
+    # Categories take pandas' default string dtype, the one union_categoricals
+    # gives when per-file or per-chunk frames are merged
+    categories = pd.Index(cleaned.unique(), dtype=str).sort_values()
+    clean_codes = categories.get_indexer(cleaned)
+    unique_valid = ~cleaned.astype(str).str.match(INVALID_LOCATION_PATTERN)
+
+    missing = codes < 0
+    safe_codes = np.where(missing, 0, codes)
+    if len(uniques):
+        row_codes = np.where(missing, -1, clean_codes[safe_codes])
+        valid = np.where(missing, True, np.asarray(unique_valid)[safe_codes])
+    else:
+        row_codes = codes
+        valid = np.ones(len(codes), dtype=bool)
+
+    categorical = pd.Categorical.from_codes(row_codes, categories=categories)
+    return categorical, valid
+
+
+def normalize_locations(df, columns=None):
+    """
+    Normalize state/district columns of a raw frame in place of the per-row
+    `apply(clean_state_name)` + regex filter.
+
+    Rows whose state or district cleans to a numeric-only value are dropped
+    and the columns are returned as categoricals.
+    """
+    if columns is None:
+        columns = {'state': clean_state_name, 'district': clean_district_name}
+
+    keep = np.ones(len(df), dtype=bool)
+    normalized = {}
+    for col, cleaner in columns.items():
+        if col not in df.columns:
+            continue
+        categorical, valid = normalize_column(df[col], cleaner)
+        normalized[col] = categorical
+        keep &= valid
+
+    if not normalized:
+        return df
+
+    if not keep.all():
+        df = df[keep]
+        normalized = {
+            col: values[keep].remove_unused_categories()
+            for col, values in normalized.items()
+        }
+    return df.assign(**normalized)
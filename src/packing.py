@@ -0,0 +1,211 @@
+"""
+Packed Fact Tables for UIDAI Hackathon
+Compact in-memory form of the raw enrolment/update tables, so more history
+fits in the same RAM
+
+Each column is stored in the narrowest type that holds it exactly:
+
+  date             uint16 days since PACK_EPOCH (PACK_MISSING_DAY for NaT),
+                   2 bytes instead of 8
+  state, district  categorical codes (int8/int16) over one category list
+  pincode, counts  the smallest unsigned integer type that fits the column's
+                   maximum (uint8/16/32), nullable types kept nullable
+
+Narrowing is checked: a value that does not fit the chosen or requested
+type raises OverflowError instead of wrapping. `unpack` restores the
+original dtypes, so unpack(pack_frame(df)) equals df.
+
+Tables packed separately (DataLoader.load_packed packs each raw file as it
+is read, so a dataset is never held unpacked) are joined by concat_packed.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+PACK_EPOCH = np.datetime64('2000-01-01', 'D')
+# uint16 offsets cover 2000-01-01 to 2179-06-05; the top value marks NaT
+PACK_MISSING_DAY = np.iinfo(np.uint16).max
+UNSIGNED_TYPES = ('uint8', 'uint16', 'uint32', 'uint64')
+SIGNED_TYPES = ('int8', 'int16', 'int32', 'int64')
+
+
+def smallest_int_type(low, high):
+    """Narrowest numpy integer type holding every value in [low, high]"""
+    candidates = UNSIGNED_TYPES if low >= 0 else SIGNED_TYPES
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    raise OverflowError(f"Values {low}..{high} do not fit in a 64-bit integer")
+
+
+def check_fits(values, dtype, column):
+    """Raise OverflowError if `values` (ignoring NA) fall outside integer `dtype`"""
+    info = np.iinfo(dtype)
+    low, high = values.min(), values.max()
+    if pd.notna(low) and (low < info.min or high > info.max):
+        raise OverflowError(f"Column '{column}' has values {low}..{high}, outside {dtype}")
+
+
+def _nullable(dtype):
+    """pandas nullable counterpart of a numpy integer type name ('uint16' -> 'UInt16')"""
+    return 'UInt' + dtype[4:] if dtype.startswith('uint') else 'Int' + dtype[3:]
+
+
+class PackedTable:
+    """
+    A frame packed column by column.
+
+    Attributes:
+        frame: the packed columns
+        dtypes: original dtype of every column, used by `unpack`
+        packed_types: numpy type each integer/date column is stored as
+    """
+
+    def __init__(self, frame, dtypes, packed_types):
+        self.frame = frame
+        self.dtypes = dtypes
+        self.packed_types = packed_types
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def columns(self):
+        return list(self.frame.columns)
+
+    def memory_usage(self):
+        """Bytes held, including category lists"""
+        return int(self.frame.memory_usage(deep=True, index=False).sum())
+
+    def unpack(self, columns=None):
+        """The original frame (or `columns` of it), with the original dtypes"""
+        columns = self.columns if columns is None else list(columns)
+        unpacked = {}
+        for col in columns:
+            values = self.frame[col]
+            dtype = self.dtypes[col]
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                days = values.to_numpy()
+                dates = (PACK_EPOCH + days.astype('int64')).astype(dtype)
+                dates[days == PACK_MISSING_DAY] = np.datetime64('NaT')
+                unpacked[col] = dates
+            else:
+                unpacked[col] = values.astype(dtype)
+        return pd.DataFrame(unpacked, index=self.frame.index)
+
+
+def pack_frame(df, packed_types=None):
+    """
+    Pack a raw fact table.
+
+    Args:
+        df: frame with date, location and count columns
+        packed_types: column -> integer type to use instead of the narrowest
+            one (e.g. the `packed_types` of an earlier pack, so chunks packed
+            separately line up); values that do not fit raise OverflowError
+
+    Returns:
+        PackedTable
+    """
+    packed_types = dict(packed_types or {})
+    columns, dtypes, chosen = {}, {}, {}
+    for col in df.columns:
+        values = df[col]
+        dtypes[col] = values.dtype
+        if pd.api.types.is_datetime64_any_dtype(values):
+            days = values.to_numpy(dtype='datetime64[D]')
+            missing = np.isnat(days)
+            if (days[~missing] != values.to_numpy()[~missing]).any():
+                raise ValueError(f"Column '{col}' has times of day; only whole days can be packed")
+            offsets = (days - PACK_EPOCH).astype('int64')
+            offsets[missing] = 0
+            if len(offsets) and (offsets.min() < 0 or offsets.max() >= PACK_MISSING_DAY):
+                raise OverflowError(
+                    f"Column '{col}' has dates outside {PACK_EPOCH} + 0..{PACK_MISSING_DAY - 1} days"
+                )
+            offsets[missing] = PACK_MISSING_DAY
+            columns[col] = offsets.astype('uint16')
+            chosen[col] = 'uint16'
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            columns[col] = values
+        elif pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if col in packed_types:
+                dtype = packed_types[col]
+                check_fits(values, dtype, col)
+            elif values.notna().any():
+                dtype = smallest_int_type(values.min(), values.max())
+            else:
+                dtype = 'uint8'
+            nullable = isinstance(values.dtype, pd.api.extensions.ExtensionDtype)
+            columns[col] = values.astype(_nullable(dtype) if nullable else dtype)
+            chosen[col] = dtype
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            columns[col] = values.astype('category')
+        else:
+            columns[col] = values
+    return PackedTable(pd.DataFrame(columns, index=df.index), dtypes, chosen)
+
+
+def concat_packed(tables):
+    """
+    Join tables packed separately into one PackedTable.
+
+    Integer columns widen to the largest type any table chose, categoricals
+    are merged onto one sorted category list (as ingestion.combine_frames
+    merges per-file frames) and the original dtypes become the ones
+    concatenating the unpacked frames gives, so
+    concat_packed(packs).unpack() equals combine_frames(frames).
+    """
+    if len(tables) == 1:
+        table = tables[0]
+        return PackedTable(table.frame.reset_index(drop=True), table.dtypes, table.packed_types)
+
+    frame = pd.concat([table.frame for table in tables], ignore_index=True)
+    dtypes, packed_types = {}, {}
+    for col in frame.columns:
+        parts = [table.frame[col] for table in tables]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            frame[col] = pd.Categorical(union_categoricals(parts, sort_categories=True))
+        originals = [table.dtypes[col] for table in tables]
+        if isinstance(originals[0], pd.CategoricalDtype):
+            dtypes[col] = frame[col].dtype
+        else:
+            dtypes[col] = pd.concat([pd.Series([], dtype=dtype) for dtype in originals]).dtype
+        if col in tables[0].packed_types:
+            packed_types[col] = str(frame[col].dtype).lower()
+    return PackedTable(frame, dtypes, packed_types)
+
+
+def packing_report(df, packed):
+    """
+    Memory per column before and after packing.
+
+    With `df` None the unpacked sizes are measured one column at a time, so
+    the whole table is never unpacked at once.
+
+    Returns:
+        frame indexed by column with 'dtype', 'packed', 'bytes_before',
+        'bytes_after' and 'ratio', plus a 'total' row
+    """
+    if df is not None:
+        before = df.memory_usage(deep=True, index=False)
+        dtypes = df.dtypes.astype(str)
+    else:
+        before = pd.Series({
+            col: int(packed.unpack([col])[col].memory_usage(deep=True, index=False))
+            for col in packed.columns
+        })
+        dtypes = pd.Series({col: str(dtype) for col, dtype in packed.dtypes.items()})
+    after = packed.frame.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': dtypes,
+        'packed': packed.frame.dtypes.astype(str),
+        'bytes_before': before,
+        'bytes_after': after,
+    })
+    report.loc['total'] = ['', '', before.sum(), after.sum()]
+    report['ratio'] = report['bytes_before'] / report['bytes_after']
+    return report
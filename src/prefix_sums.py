@@ -0,0 +1,138 @@
+"""
+Prefix-Sum Time Arrays for UIDAI Hackathon
+Per-state and per-district running totals by day, so the total over any
+date window is one array subtraction per entity
+
+preprocess.py writes one table per level (prefix_state, prefix_district):
+one row per (entity, measure) and one column per calendar day (YYYY-MM-DD)
+holding the cumulative count up to and including that day. Days without
+data repeat the previous total, so any window of the covered range works.
+Only cube rows count (cube.build_cube drops rows with a missing state,
+district, pincode or date), so window totals can fall short of all-time
+totals that include those rows. Totals are stored as int32 (int64 only if a total outgrows it), which
+halves the widest tables the dashboard bundle carries.
+"""
+
+import numpy as np
+import pandas as pd
+
+from cube import CUBE_LEVELS
+
+
+# Windowed measures: output name -> cube columns summed into it
+PREFIX_MEASURES = {
+    'total_enroll': ['age_0_5', 'age_5_17', 'age_18_greater'],
+    'children_enroll': ['age_0_5', 'age_5_17'],
+    'bio_child': ['bio_age_5_17'],
+}
+PREFIX_LEVELS = ['state', 'district']
+# Stored type of the running totals; wider totals keep int64
+PREFIX_DTYPE = 'int32'
+
+
+def prefix_table_name(level):
+    """Processed table holding the running totals of one level, e.g. 'prefix_state'"""
+    if level not in PREFIX_LEVELS:
+        raise ValueError(f"Unknown prefix-sum level '{level}' (expected one of {PREFIX_LEVELS})")
+    return f"prefix_{level}"
+
+
+def prefix_keys(level):
+    """Entity key columns of a prefix_<level> table (districts are keyed by state too)"""
+    if level not in PREFIX_LEVELS:
+        raise ValueError(f"Unknown prefix-sum level '{level}' (expected one of {PREFIX_LEVELS})")
+    return CUBE_LEVELS[:CUBE_LEVELS.index(level) + 1]
+
+
+def build_prefix_table(fact, level):
+    """
+    Running daily totals of the PREFIX_MEASURES for one hierarchy level.
+
+    Args:
+        fact: cube fact table (see cube.build_cube); rows it dropped for a
+            missing key are not in any total
+        level: 'state' or 'district' (districts are keyed by state too)
+
+    Returns:
+        frame with the level keys, 'measure', and one cumulative column per
+        calendar day from the first to the last date in `fact`, as
+        PREFIX_DTYPE when every total fits it, int64 otherwise
+    """
+    keys = prefix_keys(level)
+    days = pd.date_range(fact['date'].min(), fact['date'].max(), freq='D')
+
+    values = pd.DataFrame({
+        name: fact[columns].astype('int64').sum(axis=1)
+        for name, columns in PREFIX_MEASURES.items()
+    })
+    daily = pd.concat([fact[keys + ['date']], values], axis=1).groupby(
+        keys + ['date'], observed=True, sort=True
+    ).sum()
+
+    tables = []
+    for name in PREFIX_MEASURES:
+        grid = daily[name].unstack('date', fill_value=0).reindex(columns=days, fill_value=0)
+        cumulative = pd.DataFrame(
+            np.cumsum(grid.to_numpy(dtype='int64'), axis=1),
+            index=grid.index,
+            columns=days.strftime('%Y-%m-%d'),
+        )
+        tables.append(cumulative.assign(measure=name).set_index('measure', append=True))
+
+    table = pd.concat(tables)
+    info = np.iinfo(PREFIX_DTYPE)
+    if table.empty or (table.min().min() >= info.min and table.max().max() <= info.max):
+        table = table.astype(PREFIX_DTYPE)
+    return table.reset_index()
+
+
+class PrefixSums:
+    """
+    Window totals from a prefix_<level> table.
+
+    The running totals are held as one (entities x days + 1) int64 array per
+    measure, with a leading zero column, so the total over [start, end] is
+    cum[:, end] - cum[:, start - 1] for every entity at once and changing
+    the window never rescans rows.
+
+    Args:
+        table: a prefix_<level> table (see build_prefix_table)
+        level: its level; every column other than the level's keys and
+            'measure' is a day column
+    """
+
+    def __init__(self, table, level):
+        self.keys = prefix_keys(level)
+        day_columns = [col for col in table.columns if col not in self.keys and col != 'measure']
+        self.dates = pd.to_datetime(day_columns, format='%Y-%m-%d')
+
+        first = table[table['measure'] == table['measure'].iloc[0]]
+        self.entities = first[self.keys].astype(str).reset_index(drop=True)
+
+        self._cum = {}
+        for name, rows in table.groupby('measure', sort=False):
+            values = rows[day_columns].to_numpy(dtype='int64')
+            self._cum[name] = np.hstack([np.zeros((len(values), 1), dtype='int64'), values])
+
+    @property
+    def measures(self):
+        return list(self._cum)
+
+    def window(self, start=None, end=None, measures=None):
+        """
+        Totals per entity over the inclusive date range [start, end].
+
+        Dates outside the covered range are clipped to it.
+
+        Returns:
+            frame with the entity keys followed by one column per measure
+        """
+        lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side='left'))
+        hi = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side='right'))
+        hi = max(hi, lo)
+
+        totals = self.entities.copy()
+        for name in measures or self.measures:
+            cum = self._cum[name]
+            totals[name] = cum[:, hi] - cum[:, lo]
+        return totals
@@ -0,0 +1,173 @@
+"""
+Processed Data Store for UIDAI Hackathon
+Reads and writes the summary tables in a typed columnar format (Parquet),
+plus a single-file bundle of the tables the dashboard reads
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+
+TABLE_FORMAT = 'parquet'
+PARQUET_COMPRESSION = 'zstd'
+
+BUNDLE_FILE = 'dashboard.bundle'
+BUNDLE_MAGIC = b'UIDAIBND'
+BUNDLE_ALIGNMENT = 64
+BUNDLE_COMPRESSION = 'zstd'
+
+
+def table_path(data_dir, name, fmt=TABLE_FORMAT):
+    """Path of a processed table, e.g. data/processed/state_compliance.parquet"""
+    suffix = 'csv' if fmt == 'csv' else fmt
+    return Path(data_dir) / f"{name}.{suffix}"
+
+
+def write_table(df, data_dir, name, csv=False):
+    """
+    Write one processed table as Parquet (categoricals and compact ints are kept).
+
+    Args:
+        df: table to write
+        data_dir: processed data directory
+        name: table name without extension
+        csv: also export a gzip-compressed CSV copy
+
+    Returns:
+        list of written paths
+    """
+    path = table_path(data_dir, name)
+    df.to_parquet(path, index=False, engine='pyarrow', compression=PARQUET_COMPRESSION)
+    written = [path]
+
+    if csv:
+        csv_path = table_path(data_dir, name, fmt='csv')
+        df.to_csv(csv_path, index=False, compression='gzip')
+        written.append(csv_path)
+
+    return written
+
+
+def read_table(data_dir, name, columns=None):
+    """
+    Read one processed table, loading only `columns` when given.
+
+    The Parquet file is memory-mapped and decoded once. Older outputs that
+    only have the gzip CSV are still readable, parsed once as gzip.
+    """
+    if columns is not None:
+        columns = list(columns)
+
+    path = table_path(data_dir, name)
+    if path.exists():
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    csv_path = table_path(data_dir, name, fmt='csv')
+    if csv_path.exists():
+        return pd.read_csv(csv_path, usecols=columns, compression='gzip')
+
+    raise FileNotFoundError(f"Processed table not found: {path}")
+
+
+def write_bundle(tables, data_dir, name=BUNDLE_FILE):
+    """
+    Write several tables into one indexed file.
+
+    Layout: BUNDLE_MAGIC, the index length (8 bytes, little-endian), a JSON
+    index of table name -> [offset, length], then one Arrow IPC stream per
+    table (buffers BUNDLE_COMPRESSION-compressed), each 64-byte aligned and
+    read straight from a memory map. The file is replaced atomically, so a reader holding the old
+    one keeps a consistent view.
+
+    Args:
+        tables: list of (table name, DataFrame)
+        data_dir: processed data directory
+        name: bundle file name
+
+    Returns:
+        path of the bundle
+    """
+    import pyarrow as pa
+
+    blobs = []
+    for table_name, df in tables:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=BUNDLE_COMPRESSION)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        blobs.append((table_name, sink.getvalue()))
+
+    index = {}
+    offset = 0
+    for table_name, blob in blobs:
+        index[table_name] = [offset, blob.size]
+        offset += _aligned(blob.size)
+
+    header = json.dumps(index).encode()
+    header += b' ' * (_aligned(len(BUNDLE_MAGIC) + 8 + len(header)) - len(BUNDLE_MAGIC) - 8 - len(header))
+
+    path = Path(data_dir) / name
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for _, blob in blobs:
+            f.write(blob)
+            f.write(b'\0' * (_aligned(blob.size) - blob.size))
+    os.replace(tmp_path, path)
+    return path
+
+
+def _aligned(size):
+    return -(-size // BUNDLE_ALIGNMENT) * BUNDLE_ALIGNMENT
+
+
+class TableBundle:
+    """
+    Read-only view of a bundle written by `write_bundle`.
+
+    The file is opened and memory-mapped once; reading a table decompresses
+    and decodes only its own Arrow stream.
+    """
+
+    def __init__(self, path):
+        import pyarrow as pa
+
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Processed bundle not found: {self.path}")
+
+        buffer = pa.memory_map(str(self.path), 'r').read_buffer()
+        magic_size = len(BUNDLE_MAGIC)
+        if buffer.size < magic_size + 8 or buffer[:magic_size].to_pybytes() != BUNDLE_MAGIC:
+            raise ValueError(f"Not a processed table bundle: {self.path}")
+
+        header_size = int.from_bytes(buffer[magic_size:magic_size + 8].to_pybytes(), 'little')
+        data_start = magic_size + 8 + header_size
+        self.index = json.loads(buffer[magic_size + 8:data_start].to_pybytes())
+        self._data = buffer.slice(data_start)
+
+    @property
+    def names(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, name, columns=None):
+        """One table of the bundle, loading only `columns` when given"""
+        import pyarrow as pa
+
+        if name not in self.index:
+            raise FileNotFoundError(f"Table '{name}' not in bundle {self.path}")
+        offset, length = self.index[name]
+        table = pa.ipc.open_stream(self._data.slice(offset, length)).read_all()
+        if columns is not None:
+            table = table.select(list(columns))
+        return table.to_pandas()
@@ -0,0 +1,332 @@
+"""
+Numeric Profiling Kernel for UIDAI Hackathon
+Computes every per-column statistic EDAAnalyzer reports from one pass over
+the numeric block of a frame
+
+The numeric columns are copied once into a column-major float64 matrix (NaN
+for missing). Null and zero counts, sums, IQR outlier counts and the
+correlation matrix are vectorized over that matrix; quantiles, min and max
+come from one sort per column. This replaces one pandas call (and one scan)
+per statistic per column.
+
+For data that does not fit in memory, ColumnSketches builds a mergeable
+profile per chunk or file (exact counts and moments, KLL sketches for the
+quartiles, see sketches.py) and sketch_raw_file streams one raw file into it.
+"""
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from sketches import DEFAULT_K, KLLSketch
+from streaming import DEFAULT_CHUNKSIZE, iter_clean_chunks
+
+
+PROFILE_QUANTILES = (0.25, 0.5, 0.75)
+IQR_WHISKER = 1.5
+
+
+class NumericProfile:
+    """
+    Statistics of the numeric columns of one frame.
+
+    Attributes:
+        rows: number of rows profiled
+        summary: frame indexed by column with count, nulls, zeros, sum, mean,
+            std, min, 25%, 50%, 75%, max, lower/upper IQR bounds and outliers.
+            Sketched profiles also have 'rank_error' (normalized rank error
+            of the quartiles) and 'outliers_error' (bound on the outlier
+            count error, in rows)
+        corr: Pearson correlation matrix over pairwise complete rows, as
+            DataFrame.corr() computes it (None for sketched profiles)
+    """
+
+    def __init__(self, rows, summary, corr):
+        self.rows = rows
+        self.summary = summary
+        self.corr = corr
+
+    @property
+    def columns(self):
+        return list(self.summary.index)
+
+    @property
+    def sketched(self):
+        """True if the quartiles and outlier counts are sketch estimates"""
+        return 'rank_error' in self.summary.columns
+
+    def describe(self):
+        """The DataFrame.describe() table for the profiled columns"""
+        stats = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return self.summary[stats].T
+
+
+def numeric_profile(df, columns=None, whisker=IQR_WHISKER):
+    """
+    Profile the numeric columns of `df` (or `columns`) in one pass.
+
+    Quantiles use linear interpolation and std has one degree of freedom,
+    matching Series.quantile() and describe(); values outside
+    [Q1 - whisker * IQR, Q3 + whisker * IQR] count as outliers.
+
+    Returns:
+        NumericProfile
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns = list(columns)
+    n = len(df)
+
+    # Column-major, so every per-column reduction reads contiguous memory
+    values = np.empty((n, len(columns)), dtype='float64', order='F')
+    for i, col in enumerate(columns):
+        values[:, i] = df[col].to_numpy(dtype='float64', na_value=np.nan)
+
+    present = ~np.isnan(values)
+    count = present.sum(axis=0)
+    has_nulls = bool((count < n).any())
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        filled = np.where(present, values, 0.0) if has_nulls else values
+        total = filled.sum(axis=0)
+        mean = total / count
+
+        low, q1, median, q3, high = np.array([
+            _sorted_stats(values[:, i], present[:, i] if has_nulls else None)
+            for i in range(len(columns))
+        ]).reshape(len(columns), len(PROFILE_QUANTILES) + 2).T
+        iqr = q3 - q1
+        lower, upper = q1 - whisker * iqr, q3 + whisker * iqr
+        # NaN compares False on both sides, so missing values are never outliers
+        outliers = ((values < lower) | (values > upper)).sum(axis=0)
+        zeros = (values == 0).sum(axis=0)
+
+        # Centered cross products over pairwise complete rows give the
+        # variances and all correlations from one matrix product
+        centered = np.where(present, values - mean, 0.0) if has_nulls else values - mean
+        if has_nulls:
+            mask = present.astype('float64')
+            pairs = mask.T @ mask
+            sums = centered.T @ mask                      # sums[i, j]: x_i over rows where j is present
+            squares = (centered ** 2).T @ mask
+            cross = centered.T @ centered - sums * sums.T / pairs
+            var_i = squares - sums ** 2 / pairs
+            corr = cross / np.sqrt(var_i * var_i.T)
+            corr[pairs < 2] = np.nan
+        else:
+            cross = centered.T @ centered
+            corr = cross / np.sqrt(np.outer(np.diag(cross), np.diag(cross)))
+            if n < 2:
+                corr[:] = np.nan
+        var = np.diag(cross) / (count - 1)
+        std = np.where(count > 1, np.sqrt(var), np.nan)
+        np.fill_diagonal(corr, np.where(np.diag(cross) > 0, 1.0, np.nan))
+
+    summary = pd.DataFrame({
+        'count': count.astype('float64'),
+        'nulls': n - count,
+        'zeros': zeros,
+        'sum': total,
+        'mean': mean,
+        'std': std,
+        'min': low,
+        '25%': q1,
+        '50%': median,
+        '75%': q3,
+        'max': high,
+        'lower_bound': lower,
+        'upper_bound': upper,
+        'outliers': outliers,
+    }, index=pd.Index(columns))
+    corr = pd.DataFrame(np.clip(corr, -1.0, 1.0), index=columns, columns=columns)
+    return NumericProfile(n, summary, corr)
+
+
+def _sorted_stats(column, present=None):
+    """min, PROFILE_QUANTILES and max of one column from a single sort
+
+    Quantiles interpolate linearly between order statistics the way
+    numpy.quantile does, so they equal Series.quantile() exactly.
+    """
+    ordered = np.sort(column if present is None else column[present])
+    m = len(ordered)
+    if m == 0:
+        return [np.nan] * (len(PROFILE_QUANTILES) + 2)
+    stats = [ordered[0]]
+    for q in PROFILE_QUANTILES:
+        position = (m - 1) * q
+        lo = int(np.floor(position))
+        hi = min(lo + 1, m - 1)
+        t = position - lo
+        a, b = ordered[lo], ordered[hi]
+        stats.append(a + (b - a) * t if t < 0.5 else b - (b - a) * (1 - t))
+    stats.append(ordered[-1])
+    return stats
+
+
+class ColumnSketches:
+    """
+    Mergeable numeric profile of data seen in chunks or files.
+
+    Counts, nulls, zeros, sums, min/max, mean and std are exact (moments are
+    combined with Chan's parallel update). Quartiles come from one KLLSketch
+    per column, so IQR bounds are approximate: each quartile's rank is within
+    rank_error * count of the exact one (99% confidence), and the outlier
+    count, read from the same sketch, is within 2 * rank_error * count of
+    the exact count outside the reported bounds. Memory is a few thousand
+    floats per column regardless of input size.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = k
+        self.seed = seed
+        self.rows = 0
+        self.stats = {}
+
+    def _new_column(self):
+        seed = None if self.seed is None else [self.seed, len(self.stats)]
+        return {
+            'count': 0, 'nulls': 0, 'zeros': 0, 'sum': 0.0, 'mean': 0.0, 'm2': 0.0,
+            'min': np.inf, 'max': -np.inf, 'sketch': KLLSketch(self.k, seed),
+        }
+
+    def update(self, df, columns=None):
+        """Fold the numeric columns of one chunk into the profile"""
+        if columns is None:
+            columns = df.select_dtypes(include=[np.number]).columns
+        self.rows += len(df)
+        for col in columns:
+            values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+            present = values[~np.isnan(values)]
+            stats = self.stats.setdefault(col, self._new_column())
+            stats['nulls'] += len(values) - len(present)
+            if len(present) == 0:
+                continue
+            mean = present.mean()
+            chunk = {
+                'count': len(present), 'mean': mean, 'm2': ((present - mean) ** 2).sum(),
+                'sum': present.sum(), 'zeros': int((present == 0).sum()),
+                'min': present.min(), 'max': present.max(),
+            }
+            _merge_moments(stats, chunk)
+            stats['sketch'].update(present)
+        return self
+
+    def merge(self, other):
+        """Fold in the profile of a disjoint chunk or file"""
+        self.rows += other.rows
+        for col, theirs in other.stats.items():
+            stats = self.stats.setdefault(col, self._new_column())
+            stats['nulls'] += theirs['nulls']
+            if theirs['count']:
+                _merge_moments(stats, theirs)
+                stats['sketch'].merge(theirs['sketch'])
+        return self
+
+    def profile(self, whisker=IQR_WHISKER):
+        """
+        NumericProfile of everything seen so far (without correlations).
+
+        Returns:
+            NumericProfile whose summary also has 'rank_error' and
+            'outliers_error' columns
+        """
+        rows = {}
+        for col, stats in self.stats.items():
+            sketch, count = stats['sketch'], stats['count']
+            q1, median, q3 = sketch.quantile(PROFILE_QUANTILES)
+            lower, upper = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+            outliers = sketch.rank(lower) + count - sketch.rank(upper, inclusive=True) if count else 0
+            rows[col] = {
+                'count': float(count),
+                'nulls': stats['nulls'],
+                'zeros': stats['zeros'],
+                'sum': stats['sum'],
+                'mean': stats['mean'] if count else np.nan,
+                'std': np.sqrt(stats['m2'] / (count - 1)) if count > 1 else np.nan,
+                'min': stats['min'] if count else np.nan,
+                '25%': q1,
+                '50%': median,
+                '75%': q3,
+                'max': stats['max'] if count else np.nan,
+                'lower_bound': lower,
+                'upper_bound': upper,
+                'outliers': outliers,
+                'rank_error': sketch.rank_error,
+                'outliers_error': int(np.ceil(2 * sketch.rank_error * count)),
+            }
+        summary = pd.DataFrame.from_dict(rows, orient='index')
+        return NumericProfile(self.rows, summary, None)
+
+
+def with_exact_outliers(profile, counts):
+    """
+    Replace a sketched profile's outlier estimates with exact counts.
+
+    Args:
+        profile: sketched NumericProfile
+        counts: dict of column -> number of values outside the profile's
+            bounds (see count_raw_file_outliers), summed over all files
+
+    Returns:
+        NumericProfile with exact 'outliers' and an 'outliers_error' of 0
+    """
+    summary = profile.summary.copy()
+    for col, count in counts.items():
+        summary.at[col, 'outliers'] = count
+        summary.at[col, 'outliers_error'] = 0
+    return NumericProfile(profile.rows, summary, profile.corr)
+
+
+def _merge_moments(stats, other):
+    """Combine count/mean/m2 (Chan et al.) and the exact extremes and totals"""
+    n_a, n_b = stats['count'], other['count']
+    n = n_a + n_b
+    delta = other['mean'] - stats['mean']
+    stats['mean'] += delta * n_b / n
+    stats['m2'] += other['m2'] + delta ** 2 * n_a * n_b / n
+    stats['count'] = n
+    stats['sum'] += other['sum']
+    stats['zeros'] += other['zeros']
+    stats['min'] = min(stats['min'], other['min'])
+    stats['max'] = max(stats['max'], other['max'])
+
+
+def sketch_raw_file(file, dataset=None, chunksize=DEFAULT_CHUNKSIZE, k=DEFAULT_K):
+    """
+    Profile one raw CSV in chunks of `chunksize` rows (constant memory).
+
+    Rows are cleaned as when loading (invalid locations dropped) but not
+    deduplicated, which needs every row of the dataset. The sketch seed is
+    derived from the file name, so profiles are reproducible.
+
+    Returns:
+        ColumnSketches
+    """
+    sketches = ColumnSketches(k, seed=zlib.crc32(file.name.encode()))
+    for _, chunk in iter_clean_chunks([file], chunksize, dataset=dataset):
+        sketches.update(chunk)
+    return sketches
+
+
+def count_raw_file_outliers(file, dataset=None, bounds=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Exact count of values outside given IQR bounds in one raw CSV, in chunks.
+
+    A second pass after sketching: the bounds stay approximate, but the
+    count of values outside them is exact, where the sketch's own estimate
+    has the same absolute error in the sparse tails as anywhere else.
+
+    Args:
+        bounds: dict of column -> (lower, upper)
+
+    Returns:
+        dict of column -> count
+    """
+    counts = dict.fromkeys(bounds, 0)
+    for _, chunk in iter_clean_chunks([file], chunksize, dataset=dataset):
+        for col, (lower, upper) in bounds.items():
+            values = chunk[col].to_numpy(dtype='float64', na_value=np.nan)
+            counts[col] += int(((values < lower) | (values > upper)).sum())
+    return counts
@@ -0,0 +1,175 @@
+"""
+Raw File Schemas for UIDAI Hackathon
+Declared columns and dtypes of the api_data_aadhar_*.csv files, and the
+typed read path built on them
+"""
+
+import pandas as pd
+
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# pandas.read_csv's default NA strings, so every reader sees the same blanks
+NA_STRINGS = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+]
+
+# Bytes of CSV per block in read_raw_blocks; raw rows are about 55 bytes
+BLOCK_BYTES = 16 * 1024 ** 2
+RAW_ROW_BYTES = 55
+
+# Columns shared by all three datasets. The date is read as a category so the
+# DD-MM-YYYY strings are parsed once per distinct day, not once per row.
+LOCATION_COLUMNS = {
+    'date': 'category',
+    'state': 'category',
+    'district': 'category',
+    'pincode': 'UInt32',
+}
+
+RAW_SCHEMAS = {
+    'enrolment': {
+        **LOCATION_COLUMNS,
+        'age_0_5': 'UInt32',
+        'age_5_17': 'UInt32',
+        'age_18_greater': 'UInt32',
+    },
+    'demographic': {
+        **LOCATION_COLUMNS,
+        'demo_age_5_17': 'UInt32',
+        'demo_age_17_': 'UInt32',
+    },
+    'biometric': {
+        **LOCATION_COLUMNS,
+        'bio_age_5_17': 'UInt32',
+        'bio_age_17_': 'UInt32',
+    },
+}
+
+
+def read_header(file):
+    """Column names from the first line of a CSV"""
+    return list(pd.read_csv(file, nrows=0).columns)
+
+
+def resolve_schema(file, dataset=None):
+    """
+    Return (dataset, dtypes) for a raw file, validating its header.
+
+    With `dataset` given, the header must match that schema exactly; otherwise
+    the schema is picked by header. Raises ValueError on any mismatch.
+    """
+    header = read_header(file)
+
+    if dataset is not None:
+        if dataset not in RAW_SCHEMAS:
+            raise ValueError(f"Unknown dataset '{dataset}' (expected one of {list(RAW_SCHEMAS)})")
+        expected = list(RAW_SCHEMAS[dataset])
+        if header != expected:
+            missing = [col for col in expected if col not in header]
+            extra = [col for col in header if col not in expected]
+            raise ValueError(
+                f"Unexpected header in {file} for dataset '{dataset}': "
+                f"missing {missing}, unexpected {extra} (expected {expected}, got {header})"
+            )
+        return dataset, RAW_SCHEMAS[dataset]
+
+    for name, dtypes in RAW_SCHEMAS.items():
+        if header == list(dtypes):
+            return name, dtypes
+    raise ValueError(f"Unexpected header in {file}: {header} matches no raw dataset schema")
+
+
+def parse_dates(values):
+    """Parse a categorical DD-MM-YYYY column by converting its categories only"""
+    values = values.astype('category')
+    categories = pd.to_datetime(values.cat.categories, format=DATE_FORMAT, errors='coerce')
+    # Code -1 (missing) picks the trailing NaT
+    lookup = categories.append(pd.DatetimeIndex([pd.NaT]))
+    return pd.Series(lookup[values.cat.codes.to_numpy()], index=values.index, name=values.name)
+
+
+def read_raw_csv(file, dataset=None, chunksize=None, usecols=None):
+    """
+    Read a raw CSV with its declared schema.
+
+    Whole files use the multithreaded pyarrow parser (falling back to the C
+    parser if pyarrow is missing); chunked reads use the C parser with the
+    same dtypes. Dates come back as datetime64. With `usecols` only those
+    columns are parsed (in file order); the header is still validated.
+
+    Returns:
+        DataFrame, or an iterator of DataFrames when `chunksize` is given
+    """
+    dataset, dtypes = resolve_schema(file, dataset)
+    if usecols is not None:
+        usecols = [col for col in dtypes if col in set(usecols)]
+        dtypes = {col: dtypes[col] for col in usecols}
+
+    if chunksize is not None:
+        chunks = pd.read_csv(file, dtype=dtypes, usecols=usecols, chunksize=chunksize)
+        return (_finish(chunk) for chunk in chunks)
+
+    try:
+        df = pd.read_csv(file, dtype=dtypes, usecols=usecols, engine='pyarrow')
+    except ImportError:
+        df = pd.read_csv(file, dtype=dtypes, usecols=usecols)
+    return _finish(df)
+
+
+def read_raw_blocks(file, dataset=None, usecols=None, block_bytes=BLOCK_BYTES):
+    """
+    Read a raw CSV block by block with its declared schema.
+
+    Uses pyarrow's streaming CSV reader, which parses about as fast as the
+    whole-file read while holding one `block_bytes` block at a time (the C
+    parser, in about as many rows per chunk, if pyarrow is missing). Blocks
+    come back with the same dtypes as `read_raw_csv`.
+
+    Yields:
+        DataFrame per block
+    """
+    dataset, dtypes = resolve_schema(file, dataset)
+    if usecols is not None:
+        usecols = [col for col in dtypes if col in set(usecols)]
+        dtypes = {col: dtypes[col] for col in usecols}
+
+    try:
+        import pyarrow as pa
+        from pyarrow import csv
+    except ImportError:
+        yield from read_raw_csv(file, dataset, chunksize=block_bytes // RAW_ROW_BYTES, usecols=usecols)
+        return
+
+    arrow_types = {
+        col: pa.dictionary(pa.int32(), pa.string()) if dtype == 'category' else pa.uint32()
+        for col, dtype in dtypes.items()
+    }
+    reader = csv.open_csv(
+        file,
+        read_options=csv.ReadOptions(block_size=block_bytes),
+        convert_options=csv.ConvertOptions(
+            column_types=arrow_types,
+            include_columns=list(dtypes),
+            null_values=NA_STRINGS,
+            strings_can_be_null=True,
+        ),
+    )
+    # Counts as nullable UInt32, as read_raw_csv reads them
+    nullable = {pa.uint32(): pd.UInt32Dtype()}
+    for batch in reader:
+        yield _finish(batch.to_pandas(types_mapper=nullable.get))
+
+
+def _finish(df):
+    if 'date' in df.columns:
+        df['date'] = parse_dates(df['date'])
+
+    # Counts are read as nullable UInt32 so a blank cell cannot fail the parse;
+    # columns without blanks become plain numpy uint32
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.UInt32Dtype) and not df[col].hasnans:
+            df[col] = df[col].to_numpy(dtype='uint32')
+    return df
@@ -0,0 +1,97 @@
+"""
+State Models for UIDAI Hackathon
+Fits the Advanced Analytics clustering and compliance regressions once, when
+the processed tables are built, and stores the results for the dashboard
+
+Artifacts (next to the processed tables):
+    state_clusters.parquet   state features and KMeans cluster label
+    state_models.json        correlation matrix, R^2 scores, regression
+                             coefficients and random-forest feature importances
+"""
+
+import json
+from pathlib import Path
+
+from processed_store import read_table, write_table
+
+
+CLUSTER_FEATURES = ['total_enroll', 'compliance_ratio', 'urban_pct']
+REGRESSION_FEATURES = ['total_enroll', 'num_districts', 'urban_pct']
+N_CLUSTERS = 4
+RANDOM_STATE = 42
+
+CLUSTERS_TABLE = 'state_clusters'
+MODELS_FILE = 'state_models.json'
+
+
+def fit_state_models(state_metrics):
+    """
+    Cluster states and fit the compliance regressions on state_metrics_full.
+
+    Args:
+        state_metrics: state_metrics_full table
+
+    Returns:
+        (clusters, summary) - state features with a 'cluster' column, and a
+        JSON-ready dict of the model results; None if there are fewer
+        states than clusters
+    """
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.cluster import KMeans
+    from sklearn.linear_model import LinearRegression
+    from sklearn.ensemble import RandomForestRegressor
+
+    if len(state_metrics) < N_CLUSTERS:
+        return None
+
+    cluster_data = state_metrics[CLUSTER_FEATURES].astype('float64')
+    kmeans = KMeans(n_clusters=N_CLUSTERS, random_state=RANDOM_STATE, n_init=10)
+    labels = kmeans.fit_predict(StandardScaler().fit_transform(cluster_data))
+
+    clusters = state_metrics[['state'] + CLUSTER_FEATURES].reset_index(drop=True)
+    clusters['cluster'] = labels.astype('int8')
+
+    X = state_metrics[REGRESSION_FEATURES].to_numpy(dtype='float64')
+    y = state_metrics['compliance_ratio'].to_numpy(dtype='float64')
+    lr_model = LinearRegression().fit(X, y)
+    rf_model = RandomForestRegressor(n_estimators=100, random_state=RANDOM_STATE).fit(X, y)
+
+    summary = {
+        'n_states': len(state_metrics),
+        'n_clusters': N_CLUSTERS,
+        'correlation': cluster_data.corr().to_dict(),
+        'linear_regression': {
+            'r2': float(lr_model.score(X, y)),
+            'coefficients': dict(zip(REGRESSION_FEATURES, map(float, lr_model.coef_))),
+            'intercept': float(lr_model.intercept_),
+        },
+        'random_forest': {
+            'r2': float(rf_model.score(X, y)),
+            'feature_importances': dict(zip(REGRESSION_FEATURES, map(float, rf_model.feature_importances_))),
+        },
+    }
+    return clusters, summary
+
+
+def save_state_models(data_dir, clusters, summary):
+    """Write the clusters table and the model summary; returns the written paths"""
+    written = write_table(clusters, data_dir, CLUSTERS_TABLE)
+    path = Path(data_dir) / MODELS_FILE
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return written + [path]
+
+
+def load_state_models(data_dir):
+    """
+    Read the stored model results.
+
+    Returns:
+        (clusters, summary); raises FileNotFoundError if they were not built
+    """
+    path = Path(data_dir) / MODELS_FILE
+    if not path.exists():
+        raise FileNotFoundError(f"State models not found: {path}")
+    with open(path) as f:
+        summary = json.load(f)
+    return read_table(data_dir, CLUSTERS_TABLE), summary
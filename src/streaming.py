@@ -0,0 +1,19 @@
+"""
+Streaming Utilities for UIDAI Hackathon
+Reads raw CSVs in bounded-size chunks (fold them with aggregation.PartialAggregate)
+"""
+
+import pandas as pd
+
+from normalization import normalize_locations
+from schema import read_raw_csv
+
+
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def iter_clean_chunks(files, chunksize=DEFAULT_CHUNKSIZE, dataset=None):
+    """Yield (file, chunk) read with the raw schema, state/district names cleaned"""
+    for file in files:
+        for chunk in read_raw_csv(file, dataset, chunksize=chunksize):
+            yield file, normalize_locations(chunk)
@@ -1,15 +1,35 @@
 """
 Visualization Utilities for UIDAI Hackathon
 Reusable functions for creating charts and maps
+
+Figures are saved through FigureExporter (or save_figure for a single one):
+PNGs are rendered in one batched Kaleido session, a figure whose spec hash is
+unchanged since it was last saved is not written again, and with
+shared_plotlyjs=True the HTML files share one plotly.js bundle per output
+folder instead of embedding ~3.5MB each.
 """
 
+import hashlib
+import importlib.util
+import json
+import os
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
 from plotly.subplots import make_subplots
+# Relative inside the `src` package, top-level when src/ is on sys.path
+try:
+    from .downsampling import downsample, resampling_widget
+except ImportError:
+    from downsampling import downsample, resampling_widget
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -17,23 +37,65 @@ warnings.filterwarnings('ignore')
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
+FIGURES_DIR = '../outputs/figures'
+PNG_SIZE = (1200, 600)
+
+# Spec hashes of saved figures, one small JSON file per figure, so parallel
+# chart jobs never write the same file
+SPEC_DIR = '.specs'
+
+# What PNG export raises without Kaleido (or the Chrome that Kaleido >= 1.0
+# drives): RuntimeError from plotly >= 6, ValueError from older releases
+PNG_EXPORT_ERRORS = (RuntimeError, ValueError)
+
 
 class VisualizationTools:
-    """Collection of visualization functions"""
+    """Collection of visualization functions
+    
+    The line charts take an optional `max_points` pixel budget: each trace is
+    downsampled to about that many points ('minmax' keeps every bucket's
+    extremes, 'lttb' the visual shape; see downsampling.py), and with
+    `zoom=True` a FigureWidget is returned that restores full resolution
+    for the zoomed range.
+    
+    The bar, heatmap, age and seasonal charts only sum over the frame they
+    get, so they accept a chart_data.ChartData table (one row per group)
+    as well as raw rows, and draw the same chart from it.
+    """
     
     @staticmethod
-    def plot_time_series(df, date_col='date', value_cols=None, title='Time Series'):
-        """Plot time series for one or more columns"""
+    def _line(x, y, max_points=None, method='minmax'):
+        """Points of one trace to plot, and its full-resolution (x, y)"""
+        if not max_points:
+            return x, y, None
+        full = (np.asarray(x), y.to_numpy(dtype='float64', na_value=np.nan))
+        return (*downsample(*full, max_points, method), full)
+    
+    @staticmethod
+    def plot_time_series(df, date_col='date', value_cols=None, title='Time Series',
+                         max_points=None, method='minmax', zoom=False):
+        """Plot time series for one or more columns
+        
+        Args:
+            max_points: downsample each trace to about this many points (None = all)
+            method: 'minmax' or 'lttb'
+            zoom: return a FigureWidget that resamples on zoom (needs anywidget)
+        """
         if value_cols is None:
             value_cols = [col for col in df.columns if col != date_col]
+        if max_points:
+            df = df.sort_values(date_col)
         
         fig = go.Figure()
+        series = []
         
         for col in value_cols:
             if col in df.columns and col != date_col:
+                x, y, full = VisualizationTools._line(df[date_col], df[col], max_points, method)
+                series.append(full)
                 fig.add_trace(go.Scatter(
-                    x=df[date_col],
-                    y=df[col],
+                    x=x,
+                    y=y,
                     mode='lines',
                     name=col
                 ))
@@ -46,6 +108,8 @@ class VisualizationTools:
             template='plotly_white'
         )
         
+        if zoom and max_points:
+            return resampling_widget(fig, series, max_points, method)
         return fig
     
     @staticmethod
@@ -120,24 +184,31 @@ class VisualizationTools:
         return fig
     
     @staticmethod
-    def plot_trend_with_ma(df, date_col='date', value_col='total', window=7):
-        """Plot time series with moving average"""
+    def plot_trend_with_ma(df, date_col='date', value_col='total', window=7,
+                           max_points=None, method='minmax', zoom=False):
+        """Plot time series with moving average
+        
+        The average is taken over every point; `max_points`, `method` and
+        `zoom` then work as in plot_time_series.
+        """
         df_sorted = df.sort_values(date_col)
         df_sorted['MA'] = df_sorted[value_col].rolling(window=window).mean()
         
         fig = go.Figure()
+        x, y, actual = VisualizationTools._line(df_sorted[date_col], df_sorted[value_col], max_points, method)
         
         fig.add_trace(go.Scatter(
-            x=df_sorted[date_col],
-            y=df_sorted[value_col],
+            x=x,
+            y=y,
             mode='lines',
             name='Actual',
             line=dict(color='lightblue', width=1)
         ))
         
+        x, y, average = VisualizationTools._line(df_sorted[date_col], df_sorted['MA'], max_points, method)
         fig.add_trace(go.Scatter(
-            x=df_sorted[date_col],
-            y=df_sorted['MA'],
+            x=x,
+            y=y,
             mode='lines',
             name=f'{window}-day MA',
             line=dict(color='red', width=2)
@@ -151,6 +222,8 @@ class VisualizationTools:
             hovermode='x unified'
         )
         
+        if zoom and max_points:
+            return resampling_widget(fig, [actual, average], max_points, method)
         return fig
     
     @staticmethod
@@ -190,11 +263,12 @@ class VisualizationTools:
     @staticmethod
     def plot_seasonal_pattern(df, date_col='date', value_col='total'):
         """Plot seasonal patterns (monthly aggregation)"""
-        df_copy = df.copy()
-        df_copy['month'] = pd.to_datetime(df_copy[date_col]).dt.month
-        df_copy['year'] = pd.to_datetime(df_copy[date_col]).dt.year
+        # Dates are parsed once and grouped on directly; df is not copied
+        dates = pd.to_datetime(df[date_col])
         
-        monthly = df_copy.groupby(['year', 'month'])[value_col].sum().reset_index()
+        monthly = df.groupby(
+            [dates.dt.year.rename('year'), dates.dt.month.rename('month')]
+        )[value_col].sum().reset_index()
         monthly['month_name'] = pd.to_datetime(monthly['month'], format='%m').dt.strftime('%b')
         
         fig = px.line(
@@ -237,20 +311,160 @@ class VisualizationTools:
         return fig
 
 
-def save_figure(fig, filename, output_dir='../outputs/figures'):
-    """Save plotly figure as HTML and PNG"""
-    from pathlib import Path
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+def plotlyjs_bundle(output_path):
+    """
+    Write plotly.js once into `output_path` and return its file name.
+
+    The name carries the plotly version, so HTML saved by another version
+    keeps the bundle it was written against. The bundle is written to a
+    temporary file and renamed, so concurrent writers never leave a partial one.
+    """
+    name = f"plotly-{plotly.__version__}.min.js"
+    bundle = output_path / name
+    if not bundle.exists():
+        partial = output_path / f"{name}.{os.getpid()}.tmp"
+        partial.write_text(get_plotlyjs(), encoding='utf-8')
+        os.replace(partial, bundle)
+    return name
+
+
+def png_export_available():
+    """Whether Kaleido, which plotly needs to render PNGs, is installed"""
+    return importlib.util.find_spec('kaleido') is not None
+
+
+class FigureExporter:
+    """
+    Save many figures as HTML and PNG with the export costs paid once.
+    
+    `add` writes a figure's HTML right away and queues its PNG; `flush`
+    renders every queued PNG in one Kaleido session and records the spec
+    hashes. Used as a context manager, it flushes on exit. Figures whose
+    spec hash (the figure JSON plus the export settings) matches the one
+    recorded for that file name are skipped, as long as the output files
+    still exist.
+    """
+    
+    def __init__(self, output_dir=FIGURES_DIR, shared_plotlyjs=False, png=True, png_size=PNG_SIZE):
+        """
+        Args:
+            output_dir: folder for the HTML and PNG files
+            shared_plotlyjs: reference one plotly.js bundle in `output_dir`
+                instead of embedding the whole library in every HTML file
+                (the HTML then only opens next to the bundle)
+            png: also export PNGs (needs kaleido; without it the exporter
+                works as with png=False, so unchanged figures are still skipped)
+            png_size: PNG (width, height) in pixels
+        """
+        self.output_path = Path(output_dir)
+        self.shared_plotlyjs = shared_plotlyjs
+        self.png = png and png_export_available()
+        if png and not self.png:
+            print("   Note: PNG export unavailable (kaleido not installed). Saving HTML only.")
+        self.png_size = png_size
+        self.pending = []
+        self.records = {}
+        self.saved = []
+        self.skipped = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.flush()
+    
+    def _spec_file(self, filename):
+        return self.output_path / SPEC_DIR / f"{filename}.json"
+    
+    def _spec_hash(self, fig):
+        settings = [plotly.__version__, self.shared_plotlyjs, list(self.png_size)]
+        digest = hashlib.sha256(fig.to_json().encode())
+        digest.update(json.dumps(settings).encode())
+        return digest.hexdigest()
     
-    # Save as HTML
-    fig.write_html(str(output_path / f"{filename}.html"))
+    def _recorded(self, filename):
+        """Spec hash and outputs recorded for `filename`, if any"""
+        spec_file = self._spec_file(filename)
+        if spec_file.exists():
+            return json.loads(spec_file.read_text())
+        return {'spec': None, 'outputs': []}
+    
+    def _record(self, filename, spec, outputs):
+        spec_file = self._spec_file(filename)
+        spec_file.parent.mkdir(parents=True, exist_ok=True)
+        spec_file.write_text(json.dumps({'spec': spec, 'outputs': sorted(outputs)}))
+    
+    def add(self, fig, filename):
+        """
+        Save `fig` as `filename`.html now and queue `filename`.png.
+        
+        Returns:
+            False if the figure was unchanged and nothing was written
+        """
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        spec = self._spec_hash(fig)
+        recorded = self._recorded(filename)
+        unchanged = recorded['spec'] == spec
+        html_path = self.output_path / f"{filename}.html"
+        png_path = self.output_path / f"{filename}.png"
+        html_done = unchanged and 'html' in recorded['outputs'] and html_path.exists()
+        png_done = unchanged and 'png' in recorded['outputs'] and png_path.exists()
+        
+        if not html_done:
+            plotlyjs = plotlyjs_bundle(self.output_path) if self.shared_plotlyjs else True
+            fig.write_html(str(html_path), include_plotlyjs=plotlyjs)
+        if self.png and not png_done:
+            self.pending.append((fig, filename, png_path))
+        
+        changed = not (html_done and (png_done or not self.png))
+        if changed:
+            # Recorded by flush(), with the PNG once it is rendered
+            self.records[filename] = (spec, {'html', 'png'} if png_done else {'html'})
+        (self.saved if changed else self.skipped).append(filename)
+        return changed
+    
+    def _write_pngs(self, pending):
+        """Render queued PNGs; returns False if they could not be rendered"""
+        width, height = self.png_size
+        figs = [fig for fig, *_ in pending]
+        paths = [str(path) for *_, path in pending]
+        batch_error = None
+        if hasattr(pio, 'write_images'):
+            try:
+                pio.write_images(figs, paths, width=width, height=height)
+                return True
+            except PNG_EXPORT_ERRORS as e:
+                batch_error = str(e).strip().splitlines()[0]
+        try:
+            for fig, path in zip(figs, paths):
+                fig.write_image(path, width=width, height=height)
+        except PNG_EXPORT_ERRORS as e:
+            print(f"   Note: PNG export failed ({str(e).strip().splitlines()[0]}). HTML saved successfully.")
+            return False
+        if batch_error is not None:
+            # Kaleido before 1.0 has no batched export; one call per figure still works
+            print(f"   Note: batched PNG export failed ({batch_error}), "
+                  f"exported {len(figs)} figures one by one")
+        return True
+    
+    def flush(self):
+        """Render every queued PNG in one batch, then record the spec hashes"""
+        pending, self.pending = self.pending, []
+        if pending and self._write_pngs(pending):
+            for _, filename, _ in pending:
+                self.records[filename][1].add('png')
+        records, self.records = self.records, {}
+        for filename, (spec, outputs) in records.items():
+            self._record(filename, spec, outputs)
+
+
+def save_figure(fig, filename, output_dir=FIGURES_DIR, shared_plotlyjs=False):
+    """Save plotly figure as HTML and PNG (see FigureExporter to save many at once)
     
-    # Save as PNG
-    try:
-        fig.write_image(str(output_path / f"{filename}.png"), width=1200, height=600)
-    except:
-        print(f"   Note: PNG export requires kaleido. HTML saved successfully.")
+    The HTML embeds plotly.js unless `shared_plotlyjs` is set.
+    """
+    with FigureExporter(output_dir, shared_plotlyjs=shared_plotlyjs) as exporter:
+        exporter.add(fig, filename)
 
 
 if __name__ == "__main__":